@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Vercel serves the WSGI `app` of each file under api/; the project root holds the real app
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from wsgi import app  # noqa: E402,F401
@@ -1,12 +1,40 @@
 import os
+import asyncio
+import functools
+import hmac
+import importlib.util
 import json
 import random
-import requests
+import secrets
 import time
+from concurrent.futures import Future, ThreadPoolExecutor
 from datetime import datetime
-from flask import Flask, render_template, request, jsonify, redirect, url_for, session, flash
-from firebase_admin import credentials, initialize_app, firestore, get_app
+import click
+from flask import Flask, Response, abort, copy_current_request_context, render_template, request, jsonify, redirect, url_for, session, flash, stream_with_context
 from dotenv import load_dotenv
+# firebase_admin and requests are heavy (grpc, google-cloud, urllib3) and are imported on first use
+from services.lazy import Lazy
+from services.firebase import create_async_firestore_client, create_firestore_client
+from services.event_loop import EventLoopThread
+from services.order_numbers import OrderNumberAllocator
+from services.delivery_quotes import DeliveryQuoteCache
+from services.notifications import TelegramNotifier
+from services import catalog_data
+from services.catalog import CatalogIndex
+from services.product_cache import ProductCache
+from services.cart_store import create_cart_store, line_key
+from services.pricing import price_cart
+from services.static_assets import StaticAssets
+from services.responsive_images import ResponsiveImages
+from services.web_fonts import WebFonts
+from services.page_cache import PageCache, cached_page
+from services.template_cache import TemplateCache
+from services.metrics import RequestMetrics
+from services.firestore_accounting import FirestoreAccounting
+from services.write_journal import WriteJournal
+from services.order_tracking import OrderTracker, index_fields
+from services.review_stats import ReviewStats
+from services.order_export import FORMATS as EXPORT_FORMATS, format_orders, iter_orders, parse_day
 
 # Load environment variables from .env file (for local development)
 load_dotenv()
@@ -20,24 +48,80 @@ class Config:
     # This will hold the raw JSON string from the environment variable (Vercel)
     # or a JSON string loaded from the local file (Development)
     FIREBASE_SERVICE_ACCOUNT_JSON = os.environ.get('FIREBASE_SERVICE_ACCOUNT_JSON')
+    # Local service-account file, read (on first Firestore use) only when the env var is not set
+    FIREBASE_SERVICE_ACCOUNT_FILE = os.environ.get('FIREBASE_SERVICE_ACCOUNT_FILE')
     GOOGLE_API_KEY = os.environ.get('GOOGLE_API_KEY')
+    # Point GOOGLE_MAPS_API_BASE at a local Distance Matrix stub for load tests
+    GOOGLE_MAPS_API_BASE = os.environ.get('GOOGLE_MAPS_API_BASE', 'https://maps.googleapis.com')
     VAT_RATE = 0.15 # 15% VAT rate
+    # How many order numbers each worker reserves per Firestore transaction
+    ORDER_NUMBER_BLOCK_SIZE = int(os.environ.get('ORDER_NUMBER_BLOCK_SIZE', 10))
+    # Delivery quote cache: distances from the Boksburg store rarely change
+    DELIVERY_QUOTE_CACHE_SIZE = int(os.environ.get('DELIVERY_QUOTE_CACHE_SIZE', 1024))
+    DELIVERY_QUOTE_TTL = int(os.environ.get('DELIVERY_QUOTE_TTL', 7 * 24 * 3600))  # 7 days
+    DELIVERY_QUOTE_CACHE_PATH = os.environ.get('DELIVERY_QUOTE_CACHE_PATH')  # Optional SQLite file, e.g. /tmp/delivery_quotes.db
+    # Telegram notifications are sent by a background worker; point TELEGRAM_API_BASE at a local stub for tests
+    TELEGRAM_API_BASE = os.environ.get('TELEGRAM_API_BASE', 'https://api.telegram.org')
+    TELEGRAM_MIN_INTERVAL = float(os.environ['TELEGRAM_MIN_INTERVAL']) if os.environ.get('TELEGRAM_MIN_INTERVAL') else None  # None = per-chat default
+    TELEGRAM_DIGEST_THRESHOLD = int(os.environ.get('TELEGRAM_DIGEST_THRESHOLD', 5))
+    TELEGRAM_SYNCHRONOUS = os.environ.get('TELEGRAM_SYNCHRONOUS', '0') != '0'  # Send inside the request instead
+    # Outbound HTTP (Telegram, Google): separate connect/read timeouts and per-host circuit breakers
+    HTTP_CONNECT_TIMEOUT = float(os.environ.get('HTTP_CONNECT_TIMEOUT', 3.05))
+    HTTP_READ_TIMEOUT = float(os.environ.get('HTTP_READ_TIMEOUT', 5))
+    HTTP_CIRCUIT_FAILURE_THRESHOLD = int(os.environ.get('HTTP_CIRCUIT_FAILURE_THRESHOLD', 5))
+    HTTP_CIRCUIT_RESET_TIMEOUT = float(os.environ.get('HTTP_CIRCUIT_RESET_TIMEOUT', 30))
+    # Threads for upstream calls a request makes side by side (checkout's delivery quote); 0 = one after another
+    UPSTREAM_WORKERS = int(os.environ.get('UPSTREAM_WORKERS', 8))
+    # Checkout as an async view on one event loop per worker: the quote (httpx) and order number (Firestore's
+    # AsyncClient) are awaited side by side and in-flight checkouts share the loop. Needs requirements-async.txt;
+    # on by default under asgi.py. ASGI_THREADS caps the requests asgi.py runs at once (they mostly wait on the loop).
+    ASYNC_CHECKOUT = os.environ.get('ASYNC_CHECKOUT', '0') == '1'
+    ASGI_THREADS = int(os.environ.get('ASGI_THREADS', 64))
+    ASYNC_HTTP_MAX_CONNECTIONS = int(os.environ.get('ASYNC_HTTP_MAX_CONNECTIONS', 100))
+    # Live catalog from Firestore 'products' (snapshot listener); the poll interval is used only when the listener is unavailable
+    PRODUCT_CACHE_ENABLED = os.environ.get('PRODUCT_CACHE_ENABLED', '1') != '0'
+    PRODUCT_CACHE_POLL_INTERVAL = float(os.environ.get('PRODUCT_CACHE_POLL_INTERVAL', 60))
+    # Carts: memory:// (dev), cookie:// (signed session cookie), sqlite:///path/to/carts.db or redis://host:6379/0
+    CART_STORE_URL = os.environ.get('CART_STORE_URL', 'memory://')
+    CART_IDLE_TTL = int(os.environ.get('CART_IDLE_TTL', 2 * 24 * 3600))  # Idle carts expire after 2 days
+    # Rendered-HTML cache with ETags for pages that only change on deploy or catalog change
+    PAGE_CACHE_ENABLED = os.environ.get('PAGE_CACHE_ENABLED', '1') != '0'
+    PAGE_CACHE_MAX_ENTRIES = int(os.environ.get('PAGE_CACHE_MAX_ENTRIES', 256))
+    # Jinja bytecode built by build_templates.py (default: jinja_cache/ next to app.py)
+    JINJA_BYTECODE_CACHE_DIR = os.environ.get('JINJA_BYTECODE_CACHE_DIR')
+    # Load every template in create_app() instead of on the first request that renders it
+    PRECOMPILE_TEMPLATES = os.environ.get('PRECOMPILE_TEMPLATES', '0') == '1'
+    # Per-route latency and Firestore/upstream/render spans at /metrics (Prometheus text format)
+    METRICS_ENABLED = os.environ.get('METRICS_ENABLED', '1') != '0'
+    METRICS_TOKEN = os.environ.get('METRICS_TOKEN')  # /metrics requires "Authorization: Bearer <token>"; 404 while unset
+    # Firestore documents a request may read; FIRESTORE_READ_BUDGETS overrides per URL rule, e.g. {"/products": 0}
+    FIRESTORE_READ_BUDGET = int(os.environ['FIRESTORE_READ_BUDGET']) if os.environ.get('FIRESTORE_READ_BUDGET') else None
+    FIRESTORE_READ_BUDGETS = os.environ.get('FIRESTORE_READ_BUDGETS')
+    FIRESTORE_ENFORCE_READ_BUDGET = os.environ.get('FIRESTORE_ENFORCE_READ_BUDGET', '0') == '1'  # Test mode: over budget raises
+    FIRESTORE_LOG_USAGE = os.environ.get('FIRESTORE_LOG_USAGE', '0') == '1'  # One log line per request that used Firestore
+    # Orders, reviews and contact requests can be journaled locally (SQLite WAL) and written to Firestore in batches.
+    # Off unless WRITE_JOURNAL_PATH names storage that outlives the instance: on Vercel /tmp is discarded with the
+    # instance and background threads freeze after the response, so there every write goes straight to Firestore.
+    WRITE_JOURNAL_PATH = os.environ.get('WRITE_JOURNAL_PATH')
+    WRITE_JOURNAL_ENABLED = bool(WRITE_JOURNAL_PATH) and os.environ.get('WRITE_JOURNAL_ENABLED', '1') != '0'
+    WRITE_JOURNAL_BATCH_SIZE = int(os.environ.get('WRITE_JOURNAL_BATCH_SIZE', 100))
+    WRITE_JOURNAL_GROUP_WINDOW = float(os.environ.get('WRITE_JOURNAL_GROUP_WINDOW', 0.02))  # Seconds appends wait to share a batch
+    WRITE_JOURNAL_MAX_ATTEMPTS = int(os.environ.get('WRITE_JOURNAL_MAX_ATTEMPTS', 10))  # Rejections before a write is dead-lettered
+    WRITE_JOURNAL_SYNCHRONOUS = os.environ.get('WRITE_JOURNAL_SYNCHRONOUS', 'FULL')  # FULL = fsync per append; NORMAL = faster, not power-safe
+    ORDER_TRACKING_CACHE_TTL = int(os.environ.get('ORDER_TRACKING_CACHE_TTL', 30))  # Seconds a tracking lookup is reused
+    REVIEW_STATS_TTL = int(os.environ.get('REVIEW_STATS_TTL', 300))  # Seconds a rating summary is served from memory
+    REVIEW_STATS_LATEST = int(os.environ.get('REVIEW_STATS_LATEST', 5))  # Latest reviews kept in each aggregate
+    # /admin/orders/export is disabled until a token is set; send it as "Authorization: Bearer <token>"
+    ORDER_EXPORT_TOKEN = os.environ.get('ORDER_EXPORT_TOKEN')
+    ORDER_EXPORT_PAGE_SIZE = int(os.environ.get('ORDER_EXPORT_PAGE_SIZE', 500))  # Orders read per Firestore query
 
 class DevelopmentConfig(Config):
     """Development configuration."""
     DEBUG = True
     FLASK_ENV = 'development'
-    # Fallback for local development: if env var isn't set, try to load from local file
-    if not os.environ.get('FIREBASE_SERVICE_ACCOUNT_JSON'):
-        firebase_admin_sdk_path = os.path.join(os.path.dirname(__file__), 'freshmo-14493-firebase-adminsdk-fbsvc-cd258e541d.json')
-        if os.path.exists(firebase_admin_sdk_path):
-            with open(firebase_admin_sdk_path, 'r') as f:
-                # For local development, load the JSON file and then dump it to a string.
-                # This ensures FIREBASE_SERVICE_ACCOUNT_JSON is always a string,
-                # consistent with how Vercel environment variables are handled.
-                Config.FIREBASE_SERVICE_ACCOUNT_JSON = json.dumps(json.load(f))
-        else:
-            print("WARNING: 'freshmo-14493-firebase-adminsdk-fbsvc-cd258e541d.json' not found. Firebase will only be initialized if FIREBASE_SERVICE_ACCOUNT_JSON env var is set.")
+    # Fallback for local development: if env var isn't set, the Firebase key file is loaded on first Firestore use
+    FIREBASE_SERVICE_ACCOUNT_FILE = os.environ.get('FIREBASE_SERVICE_ACCOUNT_FILE') or os.path.join(
+        os.path.dirname(__file__), 'freshmo-14493-firebase-adminsdk-fbsvc-cd258e541d.json')
 
 
 class ProductionConfig(Config):
@@ -45,10 +129,70 @@ class ProductionConfig(Config):
     DEBUG = False
     FLASK_ENV = 'production'
     # Ensure SECRET_KEY and FIREBASE_SERVICE_ACCOUNT_JSON are set in production environment variables
+    # Carts are server-side in Redis whenever the deployment has one: CART_STORE_URL, else the REDIS_URL or
+    # KV_URL a Vercel Redis/KV integration sets (install requirements-redis.txt). The signed session cookie
+    # (cookie://) is only the fallback for deployments without a shared store, since serverless instances
+    # share nothing. memory:// is refused at startup: each instance would see a different cart.
+    CART_STORE_URL = os.environ.get('CART_STORE_URL') or os.environ.get('REDIS_URL') or os.environ.get('KV_URL') or 'cookie://'
+    # Vercel (which sets VERCEL=1) freezes threads after the response, so queued Telegram alerts could be lost:
+    # send them inside the request there
+    TELEGRAM_SYNCHRONOUS = os.environ.get('TELEGRAM_SYNCHRONOUS', '1' if os.environ.get('VERCEL') else '0') != '0'
+
+class FreshmoFlask(Flask):
+    """
+    Flask app whose Firestore client (app.db) and outbound HTTP client (app.http) are built on first use.
+    Cold starts that serve pages like /about never import firebase_admin/grpc or requests.
+    Assigning app.db / app.http replaces the lazily built object (benchmarks assign fakes).
+    Either way app.db goes through app.firestore_accounting, so every read and write is counted.
+    app.async_db and app.async_http are their AsyncClient and httpx counterparts for the async checkout.
+    """
+
+    def async_to_sync(self, func):
+        """
+        Runs async views on app.event_loop, shared by every request of this worker, instead of on a new
+        loop per call (asgiref's way, which Flask uses by default). The async clients belong to one loop,
+        so this is what lets every checkout share their connections; asgiref is not needed.
+        """
+        return functools.partial(self.event_loop.run, func)
+
+    @property
+    def db(self):
+        return self.lazy_db.get()
+
+    @db.setter
+    def db(self, value):
+        accounting = getattr(self, 'firestore_accounting', None)
+        self.lazy_db.set(accounting.wrap(value) if accounting else value)
+
+    @property
+    def http(self):
+        return self.lazy_http.get()
+
+    @http.setter
+    def http(self, value):
+        self.lazy_http.set(value)
+
+    @property
+    def async_db(self):
+        return self.lazy_async_db.get()
+
+    @async_db.setter
+    def async_db(self, value):
+        accounting = getattr(self, 'firestore_accounting', None)
+        self.lazy_async_db.set(accounting.wrap_async(value) if accounting else value)
+
+    @property
+    def async_http(self):
+        return self.lazy_async_http.get()
+
+    @async_http.setter
+    def async_http(self, value):
+        self.lazy_async_http.set(value)
+
 
 # --- Application Factory Function ---
 def create_app():
-    app = Flask(__name__, static_folder='static', template_folder='templates')
+    app = FreshmoFlask(__name__, static_folder='static', template_folder='templates')
 
     # Load configuration based on environment
     env = os.environ.get('FLASK_ENV', 'development')
@@ -69,6 +213,22 @@ def create_app():
             return value
 
     app.jinja_env.filters['floatformat'] = floatformat
+
+    # --- Metrics ---
+    # Times every request and the spans below; installed before templates are loaded so renders are timed too
+    RequestMetrics(app)
+    # Counts Firestore reads/writes/round trips per request and route, flags unbounded queries, applies read budgets
+    FirestoreAccounting(app)
+
+    # --- Static Assets ---
+    # Resolves url_for('static', ...) to fingerprinted, precompressed files when build_static.py has been run
+    StaticAssets(app)
+    # Adds the responsive_image() template helper (srcset/sizes over the derivatives built by build_images.py)
+    ResponsiveImages(app)
+    # Adds font_links() (self-hosted subsetted Inter, or Google Fonts) and icon() (inline SVG sprite)
+    WebFonts(app)
+    # Loads templates from prebuilt bytecode and, with PRECOMPILE_TEMPLATES, compiles them all at startup
+    TemplateCache(app)
     
     # --- Context Processor ---
     # This makes the 'current_year' variable available to all templates.
@@ -78,61 +238,104 @@ def create_app():
         return {'current_year': datetime.now().year}
 
     # --- Firebase Initialization (Corrected for Vercel Environment Variables) ---
-    firebase_config_json_string = app.config.get('FIREBASE_SERVICE_ACCOUNT_JSON') # Get the raw JSON string
-    app.db = None # Initialize app.db to None by default
+    # Deferred until a request first uses app.db; app.db is None if Firebase is not configured or fails.
+    def connect_firestore():
+        with app.metrics.span('firestore.connect'):
+            return app.firestore_accounting.wrap(create_firestore_client(
+                app.name,
+                app.config.get('FIREBASE_SERVICE_ACCOUNT_JSON'),
+                app.config.get('FIREBASE_SERVICE_ACCOUNT_FILE')
+            ))
+
+    app.lazy_db = Lazy(connect_firestore)
+
+    # --- Outbound HTTP Client ---
+    # One pooled keep-alive session per upstream host, shared by Telegram and Google calls
+    def create_http_client():
+        from services.http_client import OutboundClient  # Pulls in requests/urllib3
+        return OutboundClient(
+            connect_timeout=app.config.get('HTTP_CONNECT_TIMEOUT', 3.05),
+            read_timeout=app.config.get('HTTP_READ_TIMEOUT', 5),
+            failure_threshold=app.config.get('HTTP_CIRCUIT_FAILURE_THRESHOLD', 5),
+            reset_timeout=app.config.get('HTTP_CIRCUIT_RESET_TIMEOUT', 30)
+        )
 
-    if firebase_config_json_string:
-        try:
-            # Parse the JSON string into a Python dictionary
-            firebase_credentials_dict = json.loads(firebase_config_json_string)
+    app.lazy_http = Lazy(create_http_client)
 
-            # Check if a Firebase app with this name already exists
-            try:
-                # Use a specific name for your Firebase app to avoid conflicts, e.g., 'freshmo_app'
-                # Pass the Flask app's name, which is 'app' by default, as the name argument
-                firebase_app = get_app(name=app.name)
-            except ValueError:
-                # If not, initialize it using the dictionary credentials
-                firebase_app = initialize_app(credentials.Certificate(firebase_credentials_dict), name=app.name)
-                print("Firebase Admin SDK initialized successfully for Flask app instance.")
-            
-            # Obtain the Firestore client using the app instance
-            app.db = firestore.client(app=firebase_app)
-            print("Firestore client obtained successfully.")
-
-        except json.JSONDecodeError as e:
-            print(f"ERROR: FIREBASE_SERVICE_ACCOUNT_JSON environment variable is not valid JSON. Details: {e}")
-            # Firebase will not be initialized, app.db remains None
+    # --- Upstream Call Pool ---
+    # Independent upstream calls of one request overlap instead of adding up. Threads start on first use;
+    # app.upstream = None (UPSTREAM_WORKERS=0) runs them in the request thread, one after another.
+    upstream_workers = app.config.get('UPSTREAM_WORKERS', 8)
+    app.upstream = ThreadPoolExecutor(max_workers=upstream_workers, thread_name_prefix='upstream') if upstream_workers > 0 else None
+
+    def call_in_background(fn, *args):
+        """
+        Starts fn(*args) on app.upstream and returns its Future. It runs inside a copy of the current
+        request context, so its spans and Firestore usage are still counted against this route.
+        """
+        if app.upstream is not None:
+            return app.upstream.submit(copy_current_request_context(fn), *args)
+        future = Future()
+        try:
+            future.set_result(fn(*args))
         except Exception as e:
-            print(f"Unexpected error during Firebase initialization. Details: {str(e)}")
-            # Firebase will not be initialized, app.db remains None
-    else:
-        print("WARNING: No FIREBASE_SERVICE_ACCOUNT_JSON environment variable found. Firebase will not be available.")
-        # app.db is already None
+            future.set_exception(e)
+        return future
+
+    # --- Async Checkout ---
+    # Async views run on this loop (FreshmoFlask.async_to_sync); its thread starts with the first one.
+    # The async clients are built on it, on first use, like app.db and app.http.
+    app.event_loop = EventLoopThread()
+    if app.config.get('ASYNC_CHECKOUT') and importlib.util.find_spec('httpx') is None:
+        raise RuntimeError("ASYNC_CHECKOUT needs httpx; install it with: pip install -r requirements-async.txt")
+
+    def connect_async_firestore():
+        with app.metrics.span('firestore.connect'):
+            return app.firestore_accounting.wrap_async(create_async_firestore_client(
+                app.config.get('FIREBASE_SERVICE_ACCOUNT_JSON'),
+                app.config.get('FIREBASE_SERVICE_ACCOUNT_FILE')
+            ))
+
+    def create_async_http_client():
+        from services.async_http_client import AsyncOutboundClient  # Pulls in httpx
+        return AsyncOutboundClient(
+            app.http,  # Shares its circuit breakers and /metrics histograms
+            connect_timeout=app.config.get('HTTP_CONNECT_TIMEOUT', 3.05),
+            read_timeout=app.config.get('HTTP_READ_TIMEOUT', 5),
+            max_connections=app.config.get('ASYNC_HTTP_MAX_CONNECTIONS', 100)
+        )
 
+    app.lazy_async_db = Lazy(connect_async_firestore)
+    app.lazy_async_http = Lazy(create_async_http_client)
 
     # --- Telegram Notification Setup ---
     TELEGRAM_BOT_TOKEN = os.environ.get('TELEGRAM_BOT_TOKEN')
     TELEGRAM_CHAT_ID = os.environ.get('TELEGRAM_CHAT_ID')
-    TELEGRAM_API_URL = f"https://api.telegram.org/bot{TELEGRAM_BOT_TOKEN}/sendMessage" if TELEGRAM_BOT_TOKEN else None
+    TELEGRAM_API_URL = f"{app.config.get('TELEGRAM_API_BASE')}/bot{TELEGRAM_BOT_TOKEN}/sendMessage" if TELEGRAM_BOT_TOKEN else None
+
+    # Messages are queued and delivered by a background worker (retries, rate limiting, digests),
+    # so a slow or failing Telegram never holds up the request. With TELEGRAM_SYNCHRONOUS (default on
+    # Vercel) they are sent inside the request instead, with one quick retry so a Telegram outage
+    # cannot run the function into its time limit.
+    synchronous = app.config.get('TELEGRAM_SYNCHRONOUS', False)
+    app.telegram_notifier = TelegramNotifier(
+        TELEGRAM_API_URL,
+        TELEGRAM_CHAT_ID,
+        min_interval=app.config.get('TELEGRAM_MIN_INTERVAL'),
+        digest_threshold=app.config.get('TELEGRAM_DIGEST_THRESHOLD', 5),
+        http_client=lambda: app.http,  # Resolved on first send
+        synchronous=synchronous,
+        **({'max_retries': 1, 'backoff_max': 1.0} if synchronous else {})
+    ) if all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID]) else None
 
     # New: Generic Telegram message sender
     def send_general_telegram_message(message_text, parse_mode='Markdown'):
-        if not all([TELEGRAM_BOT_TOKEN, TELEGRAM_CHAT_ID, TELEGRAM_API_URL]):
+        if not app.telegram_notifier:
             print("Telegram bot not configured. Skipping notification. 😞")
             return
+        app.telegram_notifier.enqueue(message_text, parse_mode=parse_mode)
 
-        payload = {
-            'chat_id': TELEGRAM_CHAT_ID,
-            'text': message_text,
-            'parse_mode': parse_mode
-        }
-        try:
-            response = requests.post(TELEGRAM_API_URL, json=payload, timeout=5)
-            response.raise_for_status()
-            print("Telegram notification sent successfully! 🎉")
-        except requests.exceptions.RequestException as e:
-            print(f"Failed to send Telegram notification: {e} 😢")
+    app.send_general_telegram_message = send_general_telegram_message # Used by the blueprints for contact/track-order messages
 
     # The next two functions will use this general sender
     
@@ -176,115 +379,316 @@ def create_app():
 
     # --- Google Maps API Setup ---
     GOOGLE_API_KEY = app.config.get('GOOGLE_API_KEY')
-    GOOGLE_DISTANCE_MATRIX_URL = "https://maps.googleapis.com/maps/api/distancematrix/json"
+    GOOGLE_DISTANCE_MATRIX_URL = app.config.get('GOOGLE_MAPS_API_BASE', 'https://maps.googleapis.com').rstrip('/') + "/maps/api/distancematrix/json"
+
+    # Quotes are cached by normalized address so repeat customers skip the Distance Matrix call
+    app.delivery_quotes = DeliveryQuoteCache(
+        max_entries=app.config.get('DELIVERY_QUOTE_CACHE_SIZE', 1024),
+        ttl_seconds=app.config.get('DELIVERY_QUOTE_TTL', 7 * 24 * 3600),
+        db_path=app.config.get('DELIVERY_QUOTE_CACHE_PATH')
+    )
 
     # --- VAT Rate ---
     VAT_RATE = app.config.get('VAT_RATE', 0.15) # Default to 15% if not in config
 
-    # --- Products and Colors (Moved inside create_app) ---
-    PRODUCTS = [
-        # Mouthwash Sachets
-        {'id': 'sm-single', 'name': 'Strawberry Mint Single Sachet', 'category': 'Mouthwash Sachets', 'price_excl_vat': 9.00, 'type': 'single', 'image_url': 'strawberry_mint_single_sachet.jpg'},
-        {'id': 'sm-box', 'name': 'Strawberry Mint Box (30 Sachets)', 'category': 'Mouthwash Sachets', 'price_excl_vat': 210.00, 'type': 'box', 'image_url': 'strawberry_mint_box.jpg'},
-        {'id': 'sm-bulk', 'name': 'Strawberry Mint Bulk Box (10 Boxes)', 'category': 'Mouthwash Sachets', 'price_excl_vat': 1800.00, 'type': 'bulk_box', 'image_url': 'strawberry_mint_bulk_box.jpg'},
+    # --- Products and Colors ---
+    # services/catalog_data.py is shared with populate_firestore.py, so the shop and Firestore sell the same catalog
+    PRODUCTS = catalog_data.PRODUCTS
+    TOOTHBRUSH_COLORS = catalog_data.TOOTHBRUSH_COLORS
+
+    # --- Catalog Index ---
+    # Frozen products, per-category sort order and VAT prices are computed once here.
+    # rebuild_catalog swaps in a new index in one assignment, so requests never see a half-built catalog.
+    def rebuild_catalog(products):
+        app.catalog = CatalogIndex(products, VAT_RATE, toothbrush_colors=TOOTHBRUSH_COLORS)
+        return app.catalog
+
+    rebuild_catalog(PRODUCTS)
+    app.rebuild_catalog = rebuild_catalog
+
+    # --- Live Catalog ---
+    # The bundled catalog above serves until Firestore's 'products' collection (kept in step by
+    # populate_firestore.py) has loaded on a background thread; after that a snapshot listener rebuilds
+    # app.catalog whenever a product changes. CatalogIndex.version is a content hash, so every worker
+    # serving the same products sends the same page ETags.
+    def catalog_from_firestore(products):
+        usable = [product for product in products if all(product.get(field) is not None for field in ('name', 'category', 'price_excl_vat'))]
+        if len(usable) < len(products):
+            print(f"Skipping {len(products) - len(usable)} Firestore products without a name, category or price. ⚠️")
+        if not usable:
+            print("Firestore has no usable products; keeping the current catalog. ⚠️")
+            return
+        try:
+            rebuild_catalog(usable)
+            print(f"Catalog rebuilt from Firestore: {len(usable)} products (version {app.catalog.version}). ✅")
+        except Exception as e:
+            print(f"Could not build the catalog from Firestore, keeping the current one: {e} 😢")
 
-        # Oral Care Accessories
-        {'id': 'bamboo-toothbrush', 'name': 'Biodegradable Bamboo Toothbrush', 'category': 'Oral Care Accessories', 'price_excl_vat': 45.00, 'colors': ['green', 'orange', 'purple', 'grey', 'blue'], 'image_url': 'biodegradable_bamboo_toothbrush.jpg'},
-        {'id': 'bamboo-toothbrush-box', 'name': 'Biodegradable Bamboo Toothbrush Box (10 Pcs)', 'category': 'Oral Care Accessories', 'price_excl_vat': 350.00, 'colors': ['green', 'orange', 'purple', 'grey', 'blue'], 'image_url': 'biodegradable_bamboo_toothbrush_box.jpg'},
+    app.product_cache = ProductCache(
+        lambda: app.db,
+        poll_interval=app.config.get('PRODUCT_CACHE_POLL_INTERVAL', 60),
+        on_change=catalog_from_firestore
+    ) if app.config.get('PRODUCT_CACHE_ENABLED', True) else None
 
-        # Combos
-        {'id': 'freshness-combo', 'name': 'Freshness Combo (Box + Toothbrush)', 'category': 'Combos', 'price_excl_vat': 225.00, 'toothbrush_colors': ['green', 'orange', 'purple', 'grey', 'blue'], 'image_url': 'freshness_combo.jpg'}
-    ]
+    # Pages that read app.catalog; the rest (home, about, ...) never touch Firestore
+    CATALOG_ENDPOINTS = {'menus', 'show_menu_category', 'add_to_cart', 'view_cart', 'update_cart', 'checkout', 'rate_us'}
 
-    # List of available toothbrush colors for dropdowns
-    TOOTHBRUSH_COLORS = ['green', 'orange', 'purple', 'grey', 'blue']
+    if app.product_cache:
+        @app.before_request
+        def start_product_cache():
+            if request.endpoint in CATALOG_ENDPOINTS:
+                app.product_cache.start()  # Returns at once; Firestore reads happen off the request
 
 
-    def calculate_delivery_charge(origin, destination):
+    STORE_ADDRESS = "27 Parakeet Street, Villa Lisa, Boksburg, 1459"
+
+    def delivery_quote_request(origin, destination):
+        """
+        Checks and cache lookup shared by both quote paths. Returns (charge, None) when no Distance Matrix
+        call is needed, else (None, params) for the call.
+        """
         if not GOOGLE_API_KEY:
             print("Google API key not configured. Please set GOOGLE_API_KEY in .env. 😞")
-            return 0.0
+            return 0.0, None
         if not origin:
-            print("Store address not configured. Using default: 27 Parakeet Street, Villa Lisa, Boksburg, 1459 🏠")
-            origin = "27 Parakeet Street, Villa Lisa, Boksburg, 1459"
+            print(f"Store address not configured. Using default: {STORE_ADDRESS} 🏠")
+            origin = STORE_ADDRESS
         if not destination:
             print("Destination address not provided. Skipping delivery charge calculation. 🚫")
-            return 0.0
+            return 0.0, None
+
+        cached_charge = app.delivery_quotes.get(origin, destination)
+        if cached_charge is not None:
+            print(f"Delivery charge served from cache: R{cached_charge:.2f} for {destination} 🚚")
+            return cached_charge, None
 
-        params = {
+        return None, {
             'origins': origin,
             'destinations': destination,
             'key': GOOGLE_API_KEY,
             'mode': 'driving'
         }
+
+    def delivery_charge_from(params, data):
+        """The charge for a Distance Matrix response; successful quotes are cached."""
+        origin, destination = params['origins'], params['destinations']
+        print(f"API Response: {json.dumps(data, indent=2)} 📡")  # Detailed logging
+        if data['status'] == 'OK' and data['rows'][0]['elements'][0]['status'] == 'OK':
+            distance_km = data['rows'][0]['elements'][0]['distance']['value'] / 1000.0
+            charge = distance_km * 6.0  # R6 per km
+            print(f"Delivery charge calculated: R{charge:.2f} for {distance_km:.2f} km from {origin} to {destination} 🚚")
+            # Only successful quotes are cached; errors fall through to a fresh lookup next time
+            app.delivery_quotes.set(origin, destination, round(charge, 2))
+            return round(charge, 2)
+        else:
+            print(f"Distance Matrix API error: {data.get('error_message', 'Unknown error')} | Status: {data['status']} | Element Status: {data['rows'][0]['elements'][0]['status']} 😢")
+            return 0.0
+
+    @app.metrics.timed('delivery_quote')
+    def calculate_delivery_charge(origin, destination):
+        charge, params = delivery_quote_request(origin, destination)
+        if params is None:
+            return charge
+
+        import requests  # Deferred with the HTTP client, off the cold-start path
+
         try:
-            response = requests.get(GOOGLE_DISTANCE_MATRIX_URL, params=params, timeout=5)
+            with app.metrics.span('google.distance_matrix'):
+                response = app.http.get(GOOGLE_DISTANCE_MATRIX_URL, params=params)
             response.raise_for_status()
-            data = response.json()
-            print(f"API Response: {json.dumps(data, indent=2)} 📡")  # Detailed logging
-            if data['status'] == 'OK' and data['rows'][0]['elements'][0]['status'] == 'OK':
-                distance_km = data['rows'][0]['elements'][0]['distance']['value'] / 1000.0
-                charge = distance_km * 6.0  # R6 per km
-                print(f"Delivery charge calculated: R{charge:.2f} for {distance_km:.2f} km from {origin} to {destination} 🚚")
-                return round(charge, 2)
-            else:
-                print(f"Distance Matrix API error: {data.get('error_message', 'Unknown error')} | Status: {data['status']} | Element Status: {data['rows'][0]['elements'][0]['status']} 😢")
-                return 0.0
+            return delivery_charge_from(params, response.json())
         except requests.exceptions.RequestException as e:
             print(f"Failed to calculate delivery charge: {e} 😞")
             return 0.0
 
-    def get_next_order_number():
-        if not app.db:
-            # In-memory order number simulation
-            if not hasattr(app, 'last_order_number'):
-                app.last_order_number = 0
-            app.last_order_number += 1
-            return f"{app.last_order_number:04d}"
+    async def calculate_delivery_charge_async(origin, destination):
+        """calculate_delivery_charge for the async checkout, through app.async_http."""
+        with app.metrics.span('delivery_quote'):
+            charge, params = delivery_quote_request(origin, destination)
+            if params is None:
+                return charge
+
+            import httpx
+            from services.http_client import CircuitOpenError
+
+            try:
+                with app.metrics.span('google.distance_matrix'):
+                    response = await app.async_http.get(GOOGLE_DISTANCE_MATRIX_URL, params=params)
+                response.raise_for_status()
+                return delivery_charge_from(params, response.json())
+            except (httpx.HTTPError, CircuitOpenError) as e:
+                print(f"Failed to calculate delivery charge: {e} 😞")
+                return 0.0
+
+    # --- Cart Store ---
+    # With a server-side store the session cookie only carries an opaque cart id; cookie:// keeps the lines in it.
+    if env == 'production' and (app.config.get('CART_STORE_URL') or '').startswith('memory://'):
+        raise RuntimeError("CART_STORE_URL=memory:// keeps carts in one process; use redis:// (or cookie://) in production")
+    if env == 'production' and app.config.get('CART_STORE_URL', '').startswith('cookie://'):
+        print("No Redis configured (CART_STORE_URL/REDIS_URL): carts fall back to the signed session cookie. ⚠️")
+    app.carts = create_cart_store(app.config.get('CART_STORE_URL'), idle_ttl=app.config.get('CART_IDLE_TTL', 2 * 24 * 3600))
+
+    def get_cart_id(create=False):
+        """Returns the session's cart id, creating one if asked. Migrates carts from older cookie sessions."""
+        cart_id = session.get('cart_id')
+        if not cart_id and (create or 'cart' in session):
+            cart_id = secrets.token_urlsafe(16)
+            session['cart_id'] = cart_id
+        if 'cart' in session:
+            for item in session.pop('cart'):
+                app.carts.put_line(cart_id, line_key(item['id'], item.get('color')), item)
+        return cart_id
+
+    def get_cart_items():
+        cart_id = get_cart_id()
+        return app.carts.get_items(cart_id) if cart_id else []
+
+    # --- Page Cache ---
+    # Static-content pages are rendered once per deploy/catalog version and revalidated with ETags.
+    # Anything personal on the page (flashed messages, a cart) means the page is rendered fresh.
+    def page_cache_bypass():
+        if session.get('_flashes') or session.get('cart'):
+            return True
+        cart_id = session.get('cart_id')
+        return bool(cart_id and app.carts.count(cart_id))
+
+    PageCache(app, bypass=page_cache_bypass)
+
+    # Counters from the caches and the Telegram worker, exported on /metrics next to the spans
+    app.metrics.register_stats('page_cache', app.page_cache.stats, counters=('hits', 'misses', 'not_modified', 'bypassed'))
+    app.metrics.register_stats('delivery_quotes', app.delivery_quotes.stats, counters=('hits', 'misses'))
+    if app.telegram_notifier:
+        app.metrics.register_stats('telegram', app.telegram_notifier.stats, counters=('sent', 'failed', 'retries', 'digests'))
+
+    # --- Order Numbers ---
+    # Numbers come from a Firestore counter document, leased in blocks per worker,
+    # instead of scanning the whole 'orders' collection on every checkout.
+    app.order_numbers = OrderNumberAllocator(lambda: app.db, block_size=app.config.get('ORDER_NUMBER_BLOCK_SIZE', 10),
+                                             get_async_db=lambda: app.async_db)
+
+    @app.metrics.timed('order_number')
+    def allocate_order_number():
+        return app.order_numbers.allocate()
+
+    async def allocate_order_number_async():
+        with app.metrics.span('order_number'):
+            return await app.order_numbers.allocate_async()
+
+    # --- Review Aggregates ---
+    # Per-product rating summaries in 'review_stats', updated in the same transaction as each review write
+    app.review_stats = ReviewStats(
+        lambda: app.db,
+        latest_limit=app.config.get('REVIEW_STATS_LATEST', 5),
+        ttl_seconds=app.config.get('REVIEW_STATS_TTL', 300)
+    )
+    app.metrics.register_stats('review_stats', app.review_stats.stats, counters=('hits', 'misses', 'committed'))
+
+    @app.cli.command('rebuild-review-stats')
+    def rebuild_review_stats():
+        """Recomputes every product's rating aggregate from the reviews collection."""
+        scanned, written = app.review_stats.rebuild()
+        print(f"Rebuilt {written} rating aggregates from {scanned} reviews. ✅")
+
+    # --- Write Journal ---
+    # With a persistent WRITE_JOURNAL_PATH, checkout acknowledges once the order is on local disk; a background
+    # committer batches it to Firestore and replays anything left unflushed when the app next starts.
+    # Without one (the default, and the only safe choice on serverless), append() writes to Firestore before returning.
+    app.journal = WriteJournal(
+        app.config.get('WRITE_JOURNAL_PATH') if app.config.get('WRITE_JOURNAL_ENABLED') else None,
+        lambda: app.db,
+        batch_size=app.config.get('WRITE_JOURNAL_BATCH_SIZE', 100),
+        group_window=app.config.get('WRITE_JOURNAL_GROUP_WINDOW', 0.02),
+        synchronous=app.config.get('WRITE_JOURNAL_SYNCHRONOUS', 'FULL'),
+        max_attempts=app.config.get('WRITE_JOURNAL_MAX_ATTEMPTS', 10),
+        committers={'reviews': app.review_stats.commit_reviews},
+        get_async_db=lambda: app.async_db
+    )
+    app.metrics.register_stats('journal', app.journal.stats, counters=('appended', 'flushed', 'batches', 'failed_batches', 'direct_writes'))
+
+    # --- Order Tracking ---
+    # Customers need both their order number and the phone they ordered with; numbers are sequential and guessable
+    app.order_tracker = OrderTracker(lambda: app.db, ttl_seconds=app.config.get('ORDER_TRACKING_CACHE_TTL', 30))
+    app.metrics.register_stats('order_tracking', app.order_tracker.stats, counters=('hits', 'misses'))
+
+    # --- Order Export ---
+    @app.cli.command('export-orders')
+    @click.option('--output', required=True, type=click.Path(dir_okay=False), help="File to write (appended to when resuming)")
+    @click.option('--format', 'fmt', type=click.Choice(sorted(EXPORT_FORMATS)), default='csv', show_default=True)
+    @click.option('--from', 'since', help="First day to include, YYYY-MM-DD")
+    @click.option('--to', 'until', help="Last day to include, YYYY-MM-DD")
+    @click.option('--status', help="Only orders with this status, e.g. Pending")
+    @click.option('--cursor-file', type=click.Path(dir_okay=False), help="Progress file (default: <output>.cursor)")
+    def export_orders_command(output, fmt, since, until, status, cursor_file):
+        """
+        Streams orders to a CSV or NDJSON file a page at a time. After every page the last order ID and
+        the file size are saved to the cursor file; running the same command again truncates any partly
+        written page and carries on from there, so an interrupted export resumes without duplicates and
+        a finished one picks up only the orders placed since.
+        """
+        cursor_file = cursor_file or f"{output}.cursor"
+        filters = {'format': fmt, 'from': since, 'to': until, 'status': status}
         try:
-            # Query Firestore for the highest existing order number
-            orders_ref = app.db.collection('orders')
-            # Fetch all documents to find the max order_number if direct max query is not supported or indexed
-            all_orders = orders_ref.stream()
-            max_order_number = 0
-            for order_doc in all_orders:
-                order_data = order_doc.to_dict()
-                if 'order_number' in order_data:
-                    try:
-                        max_order_number = max(max_order_number, int(order_data['order_number']))
-                    except ValueError:
-                        # Handle cases where order_number might not be a valid integer
-                        continue
-            return f"{max_order_number + 1:04d}"
-        except Exception as e:
-            print(f"Error generating order number from Firestore: {e} 😢. Falling back to in-memory simulation.")
-            # Fallback to in-memory simulation if Firestore query fails
-            if not hasattr(app, 'last_order_number'):
-                app.last_order_number = 0
-            app.last_order_number += 1
-            return f"{app.last_order_number:04d}"
+            since_day = parse_day(since, '--from') if since else None
+            until_day = parse_day(until, '--to') if until else None
+        except ValueError as e:
+            raise click.BadParameter(str(e))
+        progress = {}
+        if os.path.exists(cursor_file) and os.path.exists(output):
+            with open(cursor_file) as f:
+                progress = json.load(f)
+            if progress.get('filters') != filters:
+                raise click.UsageError(f"{cursor_file} belongs to an export with different options: {progress.get('filters')}")
+        if not app.db:
+            raise click.ClickException("Firestore is not available")
+
+        exported = 0
+        with open(output, 'r+' if progress else 'w', newline='', encoding='utf-8') as out:
+            out.seek(progress.get('bytes', 0))
+            out.truncate()  # Drop rows written after the last saved cursor
+
+            def save_cursor(last_id):
+                out.flush()
+                with open(f"{cursor_file}.tmp", 'w') as f:
+                    json.dump({'after': last_id, 'bytes': out.tell(), 'filters': filters}, f)
+                os.replace(f"{cursor_file}.tmp", cursor_file)
+
+            def counted(orders):
+                nonlocal exported
+                for order in orders:
+                    exported += 1
+                    yield order
+
+            orders = iter_orders(app.db, since_day, until_day, status, after=progress.get('after'),
+                                 page_size=app.config.get('ORDER_EXPORT_PAGE_SIZE', 500), on_page=save_cursor)
+            for chunk in format_orders(counted(orders), fmt, header=not progress):
+                out.write(chunk)
+        print(f"Exported {exported} orders to {output}{' (resumed)' if progress else ''}. Cursor saved in {cursor_file}. ✅")
 
     # --- Routes ---
     @app.route('/')
+    @cached_page()
     def home():
         return render_template('home.html')
 
     @app.route('/about')
+    @cached_page()
     def about():
         return render_template('about.html')
 
     @app.route('/faqs')
+    @cached_page()
     def faqs():
         return render_template('faqs.html')
 
     @app.route('/gallery')
+    @cached_page()
     def gallery():
         return render_template('gallery.html')
 
     @app.route('/rate-us', methods=['GET', 'POST'])
     def rate_us():
         if request.method == 'POST':
-            if not app.db:
+            if not (app.journal.available or app.db):
                 flash('Database not available. Failed to submit review. Please ensure Firebase is correctly set up. 😞', 'error')
                 return redirect(url_for('rate_us'))
 
@@ -297,11 +701,11 @@ def create_app():
                 'product': product,
                 'rating': rating,
                 'review': review,
-                'name': name,
-                'timestamp': firestore.SERVER_TIMESTAMP
+                'name': name
             }
             try:
-                app.db.collection('reviews').add(review_data)
+                with app.metrics.span('journal.reviews.append'):
+                    app.journal.append('reviews', review_data, server_timestamps=('timestamp',))
                 flash('Thank you for your review! Your feedback means the world to us! 🌟😊', 'success') # Added emoji
 
                 # Send Telegram notification for review
@@ -320,12 +724,19 @@ def create_app():
                 flash(f'Failed to submit review: {str(e)} 😢', 'error') # Added emoji
 
             return redirect(url_for('rate_us'))
-        return render_template('rate_us.html')
+
+        # One aggregate document each (or none while cached) instead of scanning every review
+        product = request.args.get('product', '').strip()
+        with app.metrics.span('review_stats.summary'):
+            overall = app.review_stats.summary()
+            product_summary = app.review_stats.summary(product) if product else None
+        return render_template('rate_us.html', overall=overall, product=product, product_summary=product_summary,
+                               product_names=[item.name for item in app.catalog.products])
 
     @app.route('/contact', methods=['GET', 'POST'])
     def contact():
         if request.method == 'POST':
-            if not app.db:
+            if not (app.journal.available or app.db):
                 flash('Database not available. Failed to send message. Please ensure Firebase is correctly set up. 😞', 'error')
                 return redirect(url_for('contact'))
 
@@ -338,11 +749,11 @@ def create_app():
                 'name': name,
                 'email': email,
                 'message': message,
-                'subject': subject, # Add subject to Firestore
-                'timestamp': firestore.SERVER_TIMESTAMP
+                'subject': subject # Add subject to Firestore
             }
             try:
-                app.db.collection('contact_requests').add(contact_request)
+                with app.metrics.span('journal.contact_requests.append'):
+                    app.journal.append('contact_requests', contact_request, server_timestamps=('timestamp',))
                 flash('Your message has been sent successfully! 🚀✉️', 'success') # Added emoji
 
                 # Send Telegram notification for contact form
@@ -364,51 +775,23 @@ def create_app():
         return render_template('contact.html')
 
     @app.route('/products')
+    @cached_page(version=lambda: app.catalog.version)
     def menus():
-        # Filter categories based on the updated PRODUCTS list
-        available_categories = sorted(list(set(product['category'] for product in PRODUCTS)))
-        
-        # Define descriptions for the categories
-        categories_data = {
-            'Mouthwash Sachets': {'description': 'Experience instant freshness with our convenient mouthwash sachets! 💧'},
-            'Oral Care Accessories': {'description': 'Enhance your oral hygiene routine with our eco-friendly accessories! 🦷'},
-            'Combos': {'description': 'Get the best of both worlds with our specially curated Freshmo combos! ✨'}
-        }
-        
-        # Create the categories dictionary to pass to the template, maintaining order
-        # Ensure only categories present in PRODUCTS are shown
-        ordered_categories = ['Mouthwash Sachets', 'Oral Care Accessories', 'Combos']
-        categories = {cat: categories_data[cat] for cat in ordered_categories if cat in available_categories}
-        
-        return render_template('menus.html', categories=categories)
+        # Categories and their descriptions are precomputed by the catalog index
+        return render_template('menus.html', categories=app.catalog.categories)
 
 
     @app.route('/products/<string:category_name>')
+    @cached_page(version=lambda: app.catalog.version)
     def show_menu_category(category_name):
         category_name_display = category_name.replace('_', ' ').title()
-        
-        # Filter products by category
-        items = [p for p in PRODUCTS if p['category'] == category_name_display]
-
-        # Custom sort order for Mouthwash Sachets
-        if category_name_display == 'Mouthwash Sachets':
-            order_map = {
-                'sm-single': 0,
-                'sm-box': 1,
-                'sm-bulk': 2
-            }
-            items = sorted(items, key=lambda x: order_map.get(x['id'], 999))
-        else:
-            # Default sort for other categories
-            items = sorted(items, key=lambda x: x.get('name', ''))
+        catalog = app.catalog # Read once so the whole request uses the same catalog version
 
-        # Pass toothbrush colors if applicable
-        toothbrush_colors = TOOTHBRUSH_COLORS if category_name_display in ['Oral Care Accessories', 'Combos'] else []
+        # Products come pre-sorted with VAT-inclusive prices already calculated
+        items = catalog.items_in(category_name_display)
 
-        # Calculate prices including VAT for display
-        for item in items:
-            item['price_incl_vat'] = round(item['price_excl_vat'] * (1 + VAT_RATE), 2)
-            item['vat_amount'] = round(item['price_incl_vat'] - item['price_excl_vat'], 2)
+        # Pass toothbrush colors if applicable
+        toothbrush_colors = catalog.colors_for(category_name_display)
 
         return render_template('menu_category.html', category_name=category_name_display, items=items, toothbrush_colors=toothbrush_colors)
 
@@ -416,217 +799,275 @@ def create_app():
     @app.route('/add-to-cart', methods=['POST'])
     def add_to_cart():
         item_id = request.form.get('item_id')
-        item_name = request.form.get('item_name')
-        # item_amount now refers to price_excl_vat
-        item_price_excl_vat = float(request.form.get('item_amount')) 
         quantity = int(request.form.get('quantity', 1))
         selected_color = request.form.get('color') # Get the selected color
 
-        # Calculate VAT and total inclusive price for the item
-        vat_amount_per_unit = round(item_price_excl_vat * VAT_RATE, 2)
-        price_incl_vat_per_unit = round(item_price_excl_vat + vat_amount_per_unit, 2)
-
-        if 'cart' not in session:
-            session['cart'] = []
-
-        cart_item = {
-            'id': item_id,
-            'name': item_name,
-            'price_excl_vat_per_unit': item_price_excl_vat,
-            'vat_amount_per_unit': vat_amount_per_unit,
-            'price_incl_vat_per_unit': price_incl_vat_per_unit,
-            'quantity': quantity,
-            'total_excl_vat': round(item_price_excl_vat * quantity, 2),
-            'total_vat_amount': round(vat_amount_per_unit * quantity, 2),
-            'total_incl_vat': round(price_incl_vat_per_unit * quantity, 2)
-        }
-        
-        if selected_color:
-            cart_item['color'] = selected_color
-            # For display in cart, append color to name
-            cart_item['name'] = f"{item_name} ({selected_color.capitalize()})" 
-
-        item_found = False
-        for item in session['cart']:
-            # Check for existing item with same ID AND same color if color is present
-            # This ensures adding a green toothbrush doesn't increment a blue one
-            if item['id'] == item_id and item.get('color') == selected_color:
-                item['quantity'] += quantity
-                item['total_excl_vat'] = round(item['price_excl_vat_per_unit'] * item['quantity'], 2)
-                item['total_vat_amount'] = round(item['vat_amount_per_unit'] * item['quantity'], 2)
-                item['total_incl_vat'] = round(item['price_incl_vat_per_unit'] * item['quantity'], 2)
-                item_found = True
-                break
-
-        if not item_found:
-            session['cart'].append(cart_item)
-
-        session.modified = True
-        flash(f"Added {quantity}x {cart_item['name']} to your cart! 🛍️🎉", 'success')
+        # Prices come from the catalog at display time, so only the product, colour and quantity are stored
+        product = app.catalog.get(item_id)
+        if product is None:
+            flash("Sorry, that product is no longer available. 😞", 'error')
+            return redirect(url_for('menus'))
+
+        cart_id = get_cart_id(create=True)
+
+        # Lines are keyed by ID AND color, so adding a green toothbrush doesn't increment a blue one
+        key = line_key(item_id, selected_color)
+        item = app.carts.get_line(cart_id, key)
+        if item:
+            item['quantity'] += quantity
+        else:
+            item = {'id': item_id, 'quantity': quantity}
+            if selected_color:
+                item['color'] = selected_color
+        app.carts.put_line(cart_id, key, item)
+
+        item_display_name = f"{product.name} ({selected_color.capitalize()})" if selected_color else product.name
+        flash(f"Added {quantity}x {item_display_name} to your cart! 🛍️🎉", 'success')
         return redirect(url_for('menus'))
 
     @app.route('/view-cart')
     def view_cart():
-        cart_items = session.get('cart', [])
-        
-        subtotal_excl_vat = sum(item['total_excl_vat'] for item in cart_items)
-        total_vat_amount = sum(item['total_vat_amount'] for item in cart_items)
-        grand_total_incl_vat = sum(item['total_incl_vat'] for item in cart_items)
+        totals = price_cart(get_cart_items(), app.catalog)
 
         return render_template('cart.html', 
-                               cart_items=cart_items, 
-                               subtotal_excl_vat=subtotal_excl_vat,
-                               total_vat_amount=total_vat_amount,
-                               grand_total_incl_vat=grand_total_incl_vat)
+                               cart_items=totals.lines, 
+                               subtotal_excl_vat=totals.subtotal_excl_vat,
+                               total_vat_amount=totals.total_vat_amount,
+                               grand_total_incl_vat=totals.grand_total_incl_vat)
 
     @app.route('/update-cart', methods=['POST'])
     def update_cart():
         item_id = request.form.get('item_id')
         new_quantity = int(request.form.get('quantity', 1))
-        # To correctly update, you might need to pass the color here as well if it's part of the item's unique key
-        # For now, it updates the first item matching the ID.
-
-        if 'cart' in session:
-            for item in session['cart']:
-                if item['id'] == item_id: # Consider adding 'and item.get('color') == request.form.get('color')' for color-specific updates
-                    if new_quantity > 0:
-                        item['quantity'] = new_quantity
-                        item['total_excl_vat'] = round(item['price_excl_vat_per_unit'] * item['quantity'], 2)
-                        item['total_vat_amount'] = round(item['vat_amount_per_unit'] * item['quantity'], 2)
-                        item['total_incl_vat'] = round(item['price_incl_vat_per_unit'] * item['quantity'], 2)
-                    else:
-                        session['cart'].remove(item)
-                    break
-            session.modified = True
+        key = line_key(item_id, request.form.get('color'))
+
+        cart_id = get_cart_id()
+        if cart_id:
+            item = app.carts.get_line(cart_id, key)
+            if item:
+                if new_quantity > 0:
+                    item['quantity'] = new_quantity
+                    app.carts.put_line(cart_id, key, item)
+                else:
+                    app.carts.remove_line(cart_id, key)
         return redirect(url_for('view_cart'))
 
     @app.route('/remove-from-cart', methods=['POST'])
     def remove_from_cart():
         item_id = request.form.get('item_id')
-        # To correctly remove, you might need to pass the color here as well if it's part of the item's unique key
-        # For now, it removes the first item matching the ID.
-        if 'cart' in session:
-            session['cart'] = [item for item in session['cart'] if item['id'] != item_id] # Consider adding 'or item.get('color') != request.form.get('color')' for color-specific removal
-            session.modified = True
+        cart_id = get_cart_id()
+        if cart_id:
+            app.carts.remove_line(cart_id, line_key(item_id, request.form.get('color')))
         return redirect(url_for('view_cart'))
 
     @app.route('/clear-cart')
     def clear_cart():
-        session.pop('cart', None)
+        cart_id = get_cart_id()
+        if cart_id:
+            app.carts.clear(cart_id)
         flash('Your cart is cleared. 🛒✅', 'success')
         return redirect(url_for('menus'))
 
-    @app.route('/checkout', methods=['GET', 'POST'])
+    # Fixed delivery costs including VAT; Courier Guy is subject to quotation, so no fixed charge
+    FIXED_DELIVERY_COSTS_INCL_VAT = {'PEP PAXI': 60.00, 'Aramex': 120.00, 'Courier Guy': 0.0}
+
+    def render_checkout(totals, remembered_customer):
+        return render_template('checkout.html',
+                               cart_items=totals.lines,
+                               subtotal_excl_vat=totals.subtotal_excl_vat,
+                               total_vat_amount=totals.total_vat_amount,
+                               delivery_charge=totals.delivery_charge,
+                               grand_total_incl_vat=totals.grand_total_incl_vat,
+                               remembered_customer=remembered_customer)
+
+    def checkout_form():
+        """Returns (customer_details, payment_method, special_note) from the posted checkout form."""
+        customer_details = {
+            'name': request.form.get('name'),
+            'phone': request.form.get('phone'),
+            'delivery_type': request.form.get('delivery_type'),
+            'address': request.form.get('address'),
+        }
+        return customer_details, request.form.get('payment_method'), request.form.get('special_note')
+
+    def courier_note_missing(customer_details, special_note):
+        if customer_details['delivery_type'] == 'Courier Guy' and not special_note:
+            # Encourage user to add note for Courier Guy. The page is rendered again rather than
+            # redirecting, to preserve form data if possible.
+            flash("Please add a special note for Courier Guy quotation details. 📝", "warning")
+            return True
+        return False
+
+    def new_order(order_number, customer_details, totals, payment_method, special_note):
+        order_data = {
+            'order_number': order_number,
+            'customer_details': customer_details,
+            'cart_items': list(totals.lines),
+            'subtotal_excl_vat': totals.subtotal_excl_vat,
+            'total_vat_amount': totals.total_vat_amount,
+            'delivery_charge': totals.delivery_charge,
+            'grand_total_incl_vat': totals.grand_total_incl_vat,
+            'payment_method': payment_method,
+            'special_note': special_note,
+            'status': 'Pending',
+            'timestamp': datetime.now().isoformat()
+        }
+        order_data.update(index_fields(order_data))
+        return order_data
+
+    def confirm_order(order_data):
+        """Everything after the order is saved: tracking cache, Telegram, emptying the cart, the session."""
+        app.order_tracker.remember(order_data)
+        with app.metrics.span('telegram.enqueue'):
+            send_telegram_notification(order_data['order_number'], order_data['cart_items'], order_data['customer_details'],
+                                       order_data['grand_total_incl_vat'], order_data['delivery_charge'], order_data['payment_method'],
+                                       order_data['special_note'], order_data['subtotal_excl_vat'], order_data['total_vat_amount'])
+        app.carts.clear(get_cart_id())
+
+        if request.form.get('remember'):
+            session['remembered_customer'] = order_data['customer_details']
+            session.modified = True
+        else:
+            session.pop('remembered_customer', None)
+
+        flash(f"Order #{order_data['order_number']} placed successfully! We will contact you shortly. 🎉🚚", 'success')
+        return redirect(url_for('home'))
+
     def checkout():
-        cart_items = session.get('cart', [])
-        if not cart_items:
+        # One pricing pass over the cart; delivery is added on top without re-pricing the lines
+        totals = price_cart(get_cart_items(), app.catalog)
+        if not totals.lines:
             flash("Your cart is empty. Please add items before checking out. 😞", "error")
             return redirect(url_for('menus'))
 
-        subtotal_excl_vat = sum(item['total_excl_vat'] for item in cart_items)
-        total_vat_amount = sum(item['total_vat_amount'] for item in cart_items)
-        
-        delivery_charge = 0.0
-        # Define fixed delivery costs including VAT
-        PEP_PAXI_COST_INCL_VAT = 60.00
-        ARAMEX_COST_INCL_VAT = 120.00
+        remembered_customer = session.get('remembered_customer', {})
 
-        # Initial total before delivery and other charges
-        grand_total_incl_vat = subtotal_excl_vat + total_vat_amount 
+        if request.method == 'POST':
+            customer_details, payment_method, special_note = checkout_form()
+            if courier_note_missing(customer_details, special_note):
+                return render_checkout(totals, remembered_customer)
+
+            delivery_charge = FIXED_DELIVERY_COSTS_INCL_VAT.get(customer_details['delivery_type'], 0.0)
+            delivery_quote = None
+            if customer_details['delivery_type'] == 'Delivery': # Google Maps based delivery
+                # Quoted while the order number is allocated below, so the Google and Firestore round trips overlap
+                delivery_quote = call_in_background(calculate_delivery_charge, STORE_ADDRESS, customer_details['address'])
+
+            order_number, leased = allocate_order_number()
+            if delivery_quote is not None:
+                with app.metrics.span('delivery_quote.wait'):
+                    delivery_charge = delivery_quote.result()
+            order_data = new_order(order_number, customer_details, totals.with_delivery(delivery_charge), payment_method, special_note)
+
+            try:
+                # Written to Firestore now, or with a persistent journal, durable locally and batched by its committer.
+                # Stored under its order number so /track-order is a single document read.
+                with app.metrics.span('journal.orders.append'):
+                    app.journal.append('orders', order_data, doc_id=app.order_tracker.document_id(order_number, leased))
+                return confirm_order(order_data)
+            except Exception as e:
+                flash(f"Order failed to place: {str(e)} 😢", 'error')
+                return redirect(url_for('checkout'))
+
+        # On GET request or if form validation fails, recalculate delivery charge
+        delivery_type = remembered_customer.get('delivery_type')
+        if delivery_type == 'Delivery':
+            totals = totals.with_delivery(calculate_delivery_charge(STORE_ADDRESS, remembered_customer.get('address', '')))
+        elif delivery_type:
+            totals = totals.with_delivery(FIXED_DELIVERY_COSTS_INCL_VAT.get(delivery_type, 0.0))
+        return render_checkout(totals, remembered_customer)
+
+    async def checkout_async():
+        """
+        checkout() as a coroutine on app.event_loop (ASYNC_CHECKOUT): the delivery quote and the order number
+        are awaited side by side, and while a checkout waits on Google or Firestore the loop serves the others.
+        Carts (Redis, SQLite), the journal and a synchronous Telegram send block, so they run on worker threads.
+        """
+        # to_thread carries the request context along, like call_in_background
+        totals = await asyncio.to_thread(lambda: price_cart(get_cart_items(), app.catalog))
+        if not totals.lines:
+            flash("Your cart is empty. Please add items before checking out. 😞", "error")
+            return redirect(url_for('menus'))
 
         remembered_customer = session.get('remembered_customer', {})
 
         if request.method == 'POST':
-            customer_details = {
-                'name': request.form.get('name'),
-                'phone': request.form.get('phone'),
-                'delivery_type': request.form.get('delivery_type'),
-                'address': request.form.get('address'),
-            }
-            payment_method = request.form.get('payment_method')
-            special_note = request.form.get('special_note')
-
-            selected_delivery_type = customer_details['delivery_type']
-            if selected_delivery_type == 'Delivery': # Google Maps based delivery
-                origin = "27 Parakeet Street, Villa Lisa, Boksburg, 1459"
-                delivery_charge = calculate_delivery_charge(origin, customer_details['address'])
-            elif selected_delivery_type == 'PEP PAXI':
-                delivery_charge = PEP_PAXI_COST_INCL_VAT
-            elif selected_delivery_type == 'Aramex':
-                delivery_charge = ARAMEX_COST_INCL_VAT
-            elif selected_delivery_type == 'Courier Guy':
-                delivery_charge = 0.0 # Subject to quotation, so no fixed charge here
-                if not special_note: # Encourage user to add note for Courier Guy
-                    flash("Please add a special note for Courier Guy quotation details. 📝", "warning")
-                    # It's better to render the page again with the existing data and flash message
-                    # rather than redirecting, to preserve form data if possible.
-                    return render_template('checkout.html', 
-                                           cart_items=cart_items, 
-                                           subtotal_excl_vat=subtotal_excl_vat,
-                                           total_vat_amount=total_vat_amount,
-                                           delivery_charge=delivery_charge, 
-                                           grand_total_incl_vat=grand_total_incl_vat, 
-                                           remembered_customer=remembered_customer)
-
-
-            grand_total_incl_vat = subtotal_excl_vat + total_vat_amount + delivery_charge
-
-            order_number = get_next_order_number()
-            order_data = {
-                'order_number': order_number,
-                'customer_details': customer_details,
-                'cart_items': cart_items,
-                'subtotal_excl_vat': subtotal_excl_vat,
-                'total_vat_amount': total_vat_amount,
-                'delivery_charge': delivery_charge,
-                'grand_total_incl_vat': grand_total_incl_vat,
-                'payment_method': payment_method,
-                'special_note': special_note,
-                'status': 'Pending',
-                'timestamp': datetime.now().isoformat()
-            }
+            customer_details, payment_method, special_note = checkout_form()
+            if courier_note_missing(customer_details, special_note):
+                return render_checkout(totals, remembered_customer)
+
+            if customer_details['delivery_type'] == 'Delivery':
+                delivery_charge, (order_number, leased) = await asyncio.gather(
+                    calculate_delivery_charge_async(STORE_ADDRESS, customer_details['address']),
+                    allocate_order_number_async())
+            else:
+                delivery_charge = FIXED_DELIVERY_COSTS_INCL_VAT.get(customer_details['delivery_type'], 0.0)
+                order_number, leased = await allocate_order_number_async()
+            order_data = new_order(order_number, customer_details, totals.with_delivery(delivery_charge), payment_method, special_note)
 
             try:
-                if app.db:
-                    app.db.collection('orders').add(order_data)
-                send_telegram_notification(order_number, cart_items, customer_details, grand_total_incl_vat, delivery_charge, payment_method, special_note, subtotal_excl_vat, total_vat_amount)
-                session.pop('cart', None)
-                session.modified = True
-
-                if request.form.get('remember'):
-                    session['remembered_customer'] = customer_details
-                    session.modified = True
-                else:
-                    session.pop('remembered_customer', None)
-
-                flash(f"Order #{order_number} placed successfully! We will contact you shortly. 🎉🚚", 'success')
-                return redirect(url_for('home'))
+                with app.metrics.span('journal.orders.append'):
+                    await app.journal.append_async('orders', order_data, doc_id=app.order_tracker.document_id(order_number, leased))
+                return await asyncio.to_thread(confirm_order, order_data)
             except Exception as e:
                 flash(f"Order failed to place: {str(e)} 😢", 'error')
                 return redirect(url_for('checkout'))
 
-        # On GET request or if form validation fails, recalculate delivery charge
-        if remembered_customer and remembered_customer.get('delivery_type'):
-            selected_delivery_type_on_get = remembered_customer.get('delivery_type')
-            if selected_delivery_type_on_get == 'Delivery':
-                origin = "27 Parakeet Street, Villa Lisa, Boksburg, 1459"
-                delivery_charge = calculate_delivery_charge(origin, remembered_customer.get('address', ''))
-            elif selected_delivery_type_on_get == 'PEP PAXI':
-                delivery_charge = PEP_PAXI_COST_INCL_VAT
-            elif selected_delivery_type_on_get == 'Aramex':
-                delivery_charge = ARAMEX_COST_INCL_VAT
-            elif selected_delivery_type_on_get == 'Courier Guy':
-                delivery_charge = 0.0 # No fixed charge, handled by quotation
-            
-            grand_total_incl_vat = subtotal_excl_vat + total_vat_amount + delivery_charge
-
-        return render_template('checkout.html', 
-                               cart_items=cart_items, 
-                               subtotal_excl_vat=subtotal_excl_vat,
-                               total_vat_amount=total_vat_amount,
-                               delivery_charge=delivery_charge, 
-                               grand_total_incl_vat=grand_total_incl_vat, 
-                               remembered_customer=remembered_customer)
+        delivery_type = remembered_customer.get('delivery_type')
+        if delivery_type == 'Delivery':
+            totals = totals.with_delivery(await calculate_delivery_charge_async(STORE_ADDRESS, remembered_customer.get('address', '')))
+        elif delivery_type:
+            totals = totals.with_delivery(FIXED_DELIVERY_COSTS_INCL_VAT.get(delivery_type, 0.0))
+        return render_checkout(totals, remembered_customer)
+
+    app.add_url_rule('/checkout', endpoint='checkout', view_func=checkout_async if app.config.get('ASYNC_CHECKOUT') else checkout,
+                     methods=['GET', 'POST'])
+
+    @app.route('/track-order')
+    def track_order():
+        order_number = request.args.get('order_number', '').strip()
+        phone = request.args.get('phone', '').strip()
+        orders, searched = [], bool(order_number or phone)
+        if searched and not (order_number and phone):
+            flash('Please enter both your order number and the phone number you ordered with. 📱', 'error')
+            return render_template('track_order.html', orders=orders, order_number=order_number, phone=phone)
+        try:
+            if searched:
+                with app.metrics.span('order_tracking.by_number'):
+                    order = app.order_tracker.find(order_number, phone)
+                orders = [order] if order else []
+        except Exception as e:
+            print(f"Order tracking lookup failed: {e} 😢")
+            flash('We could not look up your order right now. Please try again shortly. 😞', 'error')
+            searched = False
+        if searched and not orders:
+            flash("We couldn't find an order with those details. Please double-check them. 🔍", 'error')
+        return render_template('track_order.html', orders=orders, order_number=order_number, phone=phone)
+
+    @app.route('/admin/orders/export')
+    def export_orders():
+        token = app.config.get('ORDER_EXPORT_TOKEN')
+        if not token:
+            abort(404)
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {token}".encode()):
+            abort(401)
+        fmt = request.args.get('format', 'csv')
+        if fmt not in EXPORT_FORMATS:
+            return jsonify(error=f"format must be one of: {', '.join(sorted(EXPORT_FORMATS))}"), 400
+        if not app.db:
+            return jsonify(error="Firestore is not available"), 503
+        try:
+            since = parse_day(request.args['from'], 'from') if request.args.get('from') else None
+            until = parse_day(request.args['to'], 'to') if request.args.get('to') else None
+            orders = iter_orders(app.db, since, until, request.args.get('status'), after=request.args.get('after'),
+                                 page_size=app.config.get('ORDER_EXPORT_PAGE_SIZE', 500))
+        except ValueError as e:
+            return jsonify(error=str(e)), 400
+        # Rows are written as Firestore pages arrive; the whole export is never held in memory
+        filename = f"freshmo-orders-{datetime.now().strftime('%Y%m%d-%H%M%S')}.{fmt}"
+        return Response(stream_with_context(format_orders(orders, fmt)), content_type=EXPORT_FORMATS[fmt],
+                        headers={'Content-Disposition': f'attachment; filename="{filename}"', 'Cache-Control': 'no-store'})
 
     @app.errorhandler(404)
     def page_not_found(e):
@@ -0,0 +1,18 @@
+"""
+ASGI entry point, alongside wsgi.py, with the async checkout on:
+
+    pip install -r requirements.txt -r requirements-async.txt
+    uvicorn asgi:app --workers 4
+
+a2wsgi runs each request on one of ASGI_THREADS threads. The async checkout then awaits Google
+and Firestore on the worker's shared event loop, so those threads only wait while it does.
+"""
+import os
+
+os.environ.setdefault('ASYNC_CHECKOUT', '1')  # Config is read when app.py is imported
+
+from a2wsgi import WSGIMiddleware  # noqa: E402
+
+from wsgi import app as wsgi_app  # noqa: E402
+
+app = WSGIMiddleware(wsgi_app, workers=wsgi_app.config.get('ASGI_THREADS', 64))
@@ -0,0 +1,160 @@
+"""
+The sync checkout vs. the async checkout (ASYNC_CHECKOUT) under many in-flight checkouts.
+
+Each path is served the way asgi.py serves it, in a process of its own: uvicorn with a2wsgi and
+--threads request threads in front of the app. This process drives it over HTTP with --in-flight
+concurrent customers, each adding a product and checking out for delivery to a new address (no
+quote cache hit). Google is the local Distance Matrix stand-in from stub_servers.py, run here so
+it does not compete with the app for the GIL; Firestore is FakeFirestore in the app process
+(FakeAsyncFirestore over the same documents for the async path), each with its own latency per
+round trip. The write journal is off, so orders are created in Firestore inside the request, as
+on serverless.
+
+    sync   checkout(): the quote runs on the app.upstream pool (UPSTREAM_WORKERS threads, 8 by
+           default) while the request thread allocates the order number, so no more than that
+           many quotes are in flight at once
+    async  checkout_async() on app.event_loop: the quote (httpx) and the order number (AsyncClient)
+           are awaited side by side, and the upstream calls of every in-flight checkout share the
+           one loop instead of a pool thread each
+
+Flask still gives each request a thread while its view runs (a2wsgi's pool), so --threads caps
+the checkouts in flight on either path; on the async path those threads only wait on the loop.
+"threads" is the peak number of live threads in the app process.
+
+    python -m benchmarks.bench_async_checkout [--orders 160] [--in-flight 32] [--threads 32]
+    python -m benchmarks.bench_async_checkout --maps-latency 0.08 --firestore-latency 0.04 --block-size 1
+
+Requires requirements-async.txt (httpx, a2wsgi, uvicorn).
+"""
+import argparse
+import asyncio
+import itertools
+import json
+import os
+import socket
+import subprocess
+import sys
+import threading
+import time
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PATHS = ('sync', 'async')
+
+
+def sample_peak_threads(peak):
+    while True:
+        peak[0] = max(peak[0], threading.active_count())
+        time.sleep(0.005)
+
+
+def serve_path(args):
+    """App process: serves one path with uvicorn; prints its port, then its peak thread count when stdin closes."""
+    import uvicorn
+    from a2wsgi import WSGIMiddleware
+
+    from benchmarks.fake_firestore import FakeAsyncFirestore, FakeFirestore
+    from benchmarks.harness import create_offline_app, quiet
+
+    use_async = args.path == 'async'
+    db = FakeFirestore(latency=args.firestore_latency)
+    with quiet():
+        app = create_offline_app(db, GOOGLE_API_KEY='bench', GOOGLE_MAPS_API_BASE=args.maps_url, WRITE_JOURNAL_ENABLED='0',
+                                 ORDER_NUMBER_BLOCK_SIZE=args.block_size, ASYNC_CHECKOUT='1' if use_async else '0')
+    # Config is read when app.py is first imported; never run against the real Google API from .env
+    if app.config['GOOGLE_MAPS_API_BASE'] != args.maps_url or app.config['ASYNC_CHECKOUT'] != use_async:
+        sys.exit("app.py was imported before the stub was configured; run the benchmark in a fresh process")
+    app.async_db = FakeAsyncFirestore(db)
+
+    listener = socket.socket()
+    listener.bind(('127.0.0.1', 0))
+    print(json.dumps({'port': listener.getsockname()[1]}), flush=True)
+    peak = [0]
+    threading.Thread(target=sample_peak_threads, args=(peak,), daemon=True).start()
+    server = uvicorn.Server(uvicorn.Config(WSGIMiddleware(app, workers=args.threads), lifespan='off',
+                                           log_level='warning', access_log=False))
+
+    def stop_at_eof():
+        sys.stdin.read()
+        server.should_exit = True
+
+    threading.Thread(target=stop_at_eof, daemon=True).start()
+    with quiet():
+        server.run(sockets=[listener])
+    print(json.dumps({'peak_threads': peak[0]}), flush=True)
+
+
+async def run_customers(base_url, orders, in_flight, addresses):
+    """Places `orders` delivery orders from `in_flight` concurrent customers; returns checkout durations (ms), wall time, failures."""
+    import httpx
+
+    remaining = iter(range(orders))
+    durations, failures = [], []
+
+    async def customer():
+        async with httpx.AsyncClient(base_url=base_url, timeout=60) as client:
+            for _ in remaining:
+                await client.post('/add-to-cart', data={'item_id': 'sm-box', 'quantity': 1})
+                form = {'name': 'Bench', 'phone': '0712345678', 'delivery_type': 'Delivery',
+                        'address': f"{next(addresses)} Bench Street, Boksburg", 'payment_method': 'EFT', 'special_note': ''}
+                started = time.perf_counter()
+                response = await client.post('/checkout', data=form)
+                durations.append((time.perf_counter() - started) * 1000)
+                if response.status_code != 302 or response.headers.get('Location', '').rstrip('/') not in ('', '/'):
+                    failures.append(response.status_code)
+
+    started = time.perf_counter()
+    await asyncio.gather(*(customer() for _ in range(in_flight)))
+    return durations, time.perf_counter() - started, failures
+
+
+def measure_path(path, args, maps_url):
+    """Starts the app process for `path`, drives it, and returns its stats."""
+    from benchmarks.harness import summarize
+
+    forwarded = [f"--{name.replace('_', '-')}={value}" for name, value in vars(args).items() if value is not None]
+    server = subprocess.Popen([sys.executable, '-m', 'benchmarks.bench_async_checkout', f'--path={path}',
+                               f'--maps-url={maps_url}', *forwarded], cwd=REPO_ROOT,
+                              stdin=subprocess.PIPE, stdout=subprocess.PIPE, text=True)
+    try:
+        ready = server.stdout.readline()
+        if not ready:
+            sys.exit(f"the {path} app process exited before serving")
+        base_url = f"http://127.0.0.1:{json.loads(ready)['port']}"
+        addresses = itertools.count()  # Shared by warm-up and run, so every quote is a cache miss
+        asyncio.run(run_customers(base_url, args.in_flight, args.in_flight, addresses))  # Warm-up: pools, Lazy clients
+        durations, wall, failures = asyncio.run(run_customers(base_url, args.orders, args.in_flight, addresses))
+    finally:
+        output, _ = server.communicate(timeout=30)  # Closing stdin stops the server
+    stats = summarize(durations)
+    stats.update(json.loads(output.strip().splitlines()[-1]), orders_per_s=len(durations) / wall, failures=len(failures))
+    return stats
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=160)
+    parser.add_argument('--in-flight', type=int, default=32, help="Concurrent customers")
+    parser.add_argument('--threads', type=int, default=32, help="a2wsgi request threads (ASGI_THREADS)")
+    parser.add_argument('--block-size', type=int, default=10, help="ORDER_NUMBER_BLOCK_SIZE")
+    parser.add_argument('--maps-latency', type=float, default=0.2)
+    parser.add_argument('--firestore-latency', type=float, default=0.05)
+    parser.add_argument('--path', choices=PATHS, help=argparse.SUPPRESS)  # Set for the app processes
+    parser.add_argument('--maps-url', help=argparse.SUPPRESS)
+    args = parser.parse_args()
+    if args.path:
+        return serve_path(args)
+
+    from benchmarks.stub_servers import distance_matrix_stub
+
+    print(f"{args.in_flight} in flight, {args.threads} request threads, Google {args.maps_latency * 1000:.0f} ms, "
+          f"Firestore {args.firestore_latency * 1000:.0f} ms per round trip, block size {args.block_size}")
+    print(f"{'checkout':>9} | {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} | {'orders/s':>8} | {'threads':>7}")
+    with distance_matrix_stub(latency=args.maps_latency) as maps:
+        for path in PATHS:
+            stats = measure_path(path, args, maps.url)
+            print(f"{path:>9} | {stats['mean_ms']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} | "
+                  f"{stats['orders_per_s']:>8.1f} | {stats['peak_threads']:>7}" + (f"  ({stats['failures']} failed)" if stats['failures'] else ''))
+
+
+if __name__ == '__main__':
+    main()
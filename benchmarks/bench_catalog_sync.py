@@ -0,0 +1,94 @@
+"""
+Catalog sync cost: the old populate_firestore.py loop vs. the diff-based sync.
+
+The old loop reads each product with its own get() and then rewrites every product in a single
+batch, whether or not it changed (a batch over Firestore's 500-write limit is rejected, which the
+fake does not enforce, so it is flagged in the output instead). The sync reads the collection with
+one get_all(), writes only documents whose fields differ, and commits them in chunks of at most 500
+in parallel. Each catalog size is run twice: a first sync into an empty collection, then a re-sync
+after one product's price changed. Round trips pay --latency seconds on FakeFirestore.
+
+    python -m benchmarks.bench_catalog_sync [--products 6 600 1200] [--latency 0.01] [--workers 4]
+"""
+import argparse
+import time
+
+from benchmarks.fake_firestore import FakeFirestore
+from services import catalog_data
+from services.catalog_sync import FIRESTORE_MAX_BATCH, apply_sync, plan_sync
+
+
+class CountingFirestore(FakeFirestore):
+    def __init__(self, latency=0.0):
+        super().__init__(latency)
+        self.round_trips = 0
+
+    def _round_trip(self):
+        with self._lock:  # Batches commit from several threads
+            self.round_trips += 1
+        super()._round_trip()
+
+
+def catalog(size):
+    """The shop's catalog, padded with numbered copies of its products up to `size`."""
+    products = [dict(product) for product in catalog_data.PRODUCTS[:size]]
+    for i in range(len(products), size):
+        base = catalog_data.PRODUCTS[i % len(catalog_data.PRODUCTS)]
+        products.append(dict(base, id=f"{base['id']}-{i}", name=f"{base['name']} #{i}"))
+    return products
+
+
+def old_populate(db, products):
+    """populate_products() as it was: a get() per product, then one batch rewriting all of them."""
+    products_ref = db.collection('products')
+    batch = db.batch()
+    for product in products:
+        doc_ref = products_ref.document(product['id'])
+        if doc_ref.get().exists:
+            batch.update(doc_ref, product)
+        else:
+            batch.set(doc_ref, product)
+    size = len(batch)
+    batch.commit()
+    return size
+
+
+def new_sync(db, products, workers):
+    plan = plan_sync(db, products)
+    apply_sync(db, plan, workers=workers)
+    return plan.write_count
+
+
+def measure(db, fn):
+    reads, writes, round_trips = db.reads, db.writes, db.round_trips
+    started = time.perf_counter()
+    fn()
+    return (db.round_trips - round_trips, db.reads - reads, db.writes - writes,
+            (time.perf_counter() - started) * 1000)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--products', type=int, nargs='+', default=[6, 600, 1200])
+    parser.add_argument('--latency', type=float, default=0.01)
+    parser.add_argument('--workers', type=int, default=4)
+    args = parser.parse_args()
+
+    print(f"{'products':>8} {'run':>8} | {'old: trips':>10} {'reads':>6} {'writes':>6} {'ms':>8} | "
+          f"{'sync: trips':>11} {'reads':>6} {'writes':>6} {'ms':>8}")
+    for size in args.products:
+        products = catalog(size)
+        old_db, new_db = CountingFirestore(args.latency), CountingFirestore(args.latency)
+        for run in ('first', 're-sync'):
+            if run == 're-sync':
+                products[0] = dict(products[0], price_excl_vat=products[0]['price_excl_vat'] + 1)
+            batch_size = []
+            old = measure(old_db, lambda: batch_size.append(old_populate(old_db, products)))
+            new = measure(new_db, lambda: new_sync(new_db, products, args.workers))
+            flag = ' (batch > 500: rejected by Firestore)' if batch_size[0] > FIRESTORE_MAX_BATCH else ''
+            print(f"{size:>8} {run:>8} | {old[0]:>10} {old[1]:>6} {old[2]:>6} {old[3]:>8.0f} | "
+                  f"{new[0]:>11} {new[1]:>6} {new[2]:>6} {new[3]:>8.0f}{flag}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,94 @@
+"""
+Checkout latency with its upstream calls one after another vs. side by side.
+
+A delivery checkout waits on two upstreams: the Google Distance Matrix quote and, when the
+worker's lease of order numbers runs out, a Firestore transaction for the next block. With
+app.upstream = None (UPSTREAM_WORKERS=0) they run in sequence; with the upstream pool the quote
+is fetched while the number is allocated. Every checkout here uses a new address (no quote cache
+hit). Google is the local Distance Matrix stand-in from stub_servers.py and Firestore is
+FakeFirestore, each with its own --maps-latency / --firestore-latency per round trip.
+
+By default one checkout runs at a time with --block-size 1 (a transaction per order), which shows
+the per-request overlap. Allocations share one lock per worker, so with --threads > 1 and block
+size 1 concurrent checkouts queue on the allocator; use the production block size for that:
+
+    python -m benchmarks.bench_checkout_upstreams [--orders 20] [--maps-latency 0.08] [--firestore-latency 0.04]
+    python -m benchmarks.bench_checkout_upstreams --threads 8 --orders 80 --block-size 10
+"""
+import argparse
+import itertools
+import sys
+import threading
+import time
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import create_offline_app, quiet, summarize
+from benchmarks.stub_servers import distance_matrix_stub
+
+
+def run_checkouts(app, orders, threads, addresses):
+    """Places `orders` delivery orders from `threads` clients; returns POST /checkout durations (ms) and wall time."""
+    durations, failures, lock = [], [], threading.Lock()
+    per_thread = orders // threads
+
+    def customer():
+        client = app.test_client()
+        mine = []
+        for _ in range(per_thread):
+            client.post('/add-to-cart', data={'item_id': 'sm-box', 'quantity': 1})
+            form = {'name': 'Bench', 'phone': '0712345678', 'delivery_type': 'Delivery',
+                    'address': f"{next(addresses)} Bench Street, Boksburg", 'payment_method': 'EFT', 'special_note': ''}
+            started = time.perf_counter()
+            response = client.post('/checkout', data=form)
+            mine.append((time.perf_counter() - started) * 1000)
+            if response.headers.get('Location', '').rstrip('/') not in ('', '/') or response.status_code != 302:
+                failures.append(response.status_code)
+        with lock:
+            durations.extend(mine)
+
+    workers = [threading.Thread(target=customer) for _ in range(threads)]
+    started = time.perf_counter()
+    for worker in workers:
+        worker.start()
+    for worker in workers:
+        worker.join()
+    return durations, time.perf_counter() - started, failures
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, default=20)
+    parser.add_argument('--threads', type=int, default=1)
+    parser.add_argument('--block-size', type=int, default=1, help="ORDER_NUMBER_BLOCK_SIZE")
+    parser.add_argument('--maps-latency', type=float, default=0.08)
+    parser.add_argument('--firestore-latency', type=float, default=0.04)
+    args = parser.parse_args()
+
+    maps = distance_matrix_stub(latency=args.maps_latency).start()
+    try:
+        with quiet():
+            app = create_offline_app(FakeFirestore(latency=args.firestore_latency),
+                                     GOOGLE_API_KEY='bench', GOOGLE_MAPS_API_BASE=maps.url,
+                                     ORDER_NUMBER_BLOCK_SIZE=args.block_size)
+        # Config is read when app.py is first imported; never run against the real Google API from .env
+        if app.config['GOOGLE_MAPS_API_BASE'] != maps.url or app.config['ORDER_NUMBER_BLOCK_SIZE'] != args.block_size:
+            sys.exit("app.py was imported before the stub was configured; run the benchmark in a fresh process")
+        pool = app.upstream
+        addresses = itertools.count()  # next() is atomic, so threads never share an address
+
+        print(f"{'upstream calls':>15} | {'mean ms':>8} {'p50 ms':>8} {'p95 ms':>8} | {'orders/s':>8}")
+        for label, upstream in (('one by one', None), ('side by side', pool)):
+            app.upstream = upstream
+            with quiet():
+                run_checkouts(app, args.threads, args.threads, addresses)  # Warm-up: HTTP pool, Lazy clients
+                durations, wall, failures = run_checkouts(app, args.orders, args.threads, addresses)
+            stats = summarize(durations)
+            print(f"{label:>15} | {stats['mean_ms']:>8.1f} {stats['p50_ms']:>8.1f} {stats['p95_ms']:>8.1f} | "
+                  f"{len(durations) / wall:>8.1f}" + (f"  ({len(failures)} failed)" if failures else ''))
+        app.journal.flush(5)
+    finally:
+        maps.stop()
+
+
+if __name__ == '__main__':
+    main()
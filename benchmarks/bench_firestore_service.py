@@ -0,0 +1,81 @@
+"""
+FirestoreService product reads: payload size and latency before and after field masks,
+batched multi-get and the read-through cache.
+
+"before" reads the way the old service did: whole documents (long descriptions, feature lists),
+one get() per product. "after" uses LISTING_FIELDS, one get_all() for a set of IDs, and is run
+twice: cold, then warm from the cache. Payload is the JSON size of what the call returned, which
+tracks the bytes Firestore sends. Round trips pay --latency seconds on FakeFirestore.
+
+    python -m benchmarks.bench_firestore_service [--products 200] [--lookups 8] [--latency 0.02]
+"""
+import argparse
+import json
+import time
+
+from benchmarks.fake_firestore import FakeFirestore
+from services.firestore_services import LISTING_FIELDS, FirestoreService
+
+DESCRIPTION = ("Our signature alcohol-free strawberry mint mouthwash in single-use sachets. Perfect for daily "
+               "freshness and combating bad breath on the go. ") * 3
+FEATURES = ["Alcohol-free", "SABS Tested", "2-year shelf life", "Trademarked", "Formulated by Prof. David Katerere",
+            "Freshness on the Go", "Combats plaque and bad breath", "Promotes healthy gums"]
+
+
+def seeded_db(product_count, latency):
+    db = FakeFirestore(latency=latency)
+    db.load('products', {f"product-{i:04d}": {
+        'name': f"Strawberry Mint Box #{i}", 'category': 'Mouthwash Sachets', 'price_excl_vat': 210.0,
+        'image_url': 'strawberry_mint_box.jpg', 'description': DESCRIPTION, 'features': FEATURES,
+        'stock_quantity': 500, 'brand': 'Freshmo Brands', 'is_available': True,
+    } for i in range(product_count)})
+    return db
+
+
+def old_listing(db):
+    return [dict(doc.to_dict(), id=doc.id) for doc in db.collection('products').stream()]
+
+
+def old_lookup(db, product_ids):
+    products = {}
+    for product_id in product_ids:
+        doc = db.collection('products').document(product_id).get()
+        if doc.exists:
+            products[product_id] = dict(doc.to_dict(), id=doc.id)
+    return products
+
+
+def measure(fn):
+    started = time.perf_counter()
+    result = fn()
+    return len(json.dumps(result, default=str)), (time.perf_counter() - started) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--products', type=int, default=200)
+    parser.add_argument('--lookups', type=int, default=8, help="Products looked up by ID (e.g. a cart)")
+    parser.add_argument('--latency', type=float, default=0.02)
+    args = parser.parse_args()
+
+    db = seeded_db(args.products, args.latency)
+    service = FirestoreService(db)
+    product_ids = [f"product-{i:04d}" for i in range(0, args.products, max(1, args.products // args.lookups))][:args.lookups]
+    rows = [
+        ('listing', 'before', lambda: old_listing(db)),
+        ('listing', 'after (cold)', lambda: service.get_products(fields=LISTING_FIELDS)),
+        ('listing', 'after (warm)', lambda: service.get_products(fields=LISTING_FIELDS)),
+        (f"{len(product_ids)} by ID", 'before', lambda: old_lookup(db, product_ids)),
+        (f"{len(product_ids)} by ID", 'after (cold)', lambda: service.get_products_by_ids(product_ids, fields=LISTING_FIELDS)),
+        (f"{len(product_ids)} by ID", 'after (warm)', lambda: service.get_products_by_ids(product_ids, fields=LISTING_FIELDS)),
+    ]
+    print(f"{'read':>10} {'path':>13} | {'payload (KB)':>12} {'ms':>8} {'doc reads':>9}")
+    for read, path, fn in rows:
+        reads = db.reads
+        payload, elapsed = measure(fn)
+        print(f"{read:>10} {path:>13} | {payload / 1024:>12.1f} {elapsed:>8.1f} {db.reads - reads:>9}")
+    print(f"cache: {service.cache.stats()}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+"""
+Order write latency: a direct Firestore add() per order vs. the write-behind journal.
+
+Each of --threads concurrent "checkouts" writes --orders orders. The direct path pays a Firestore
+round trip (--latency seconds on FakeFirestore) inside every request; the journal path pays one
+local SQLite insert and lets the committer group concurrent orders into shared batch commits.
+Reported per write: p50/p99 latency, and for the whole run the Firestore round trips it took.
+
+    python -m benchmarks.bench_journal [--latency 0.03] [--threads 8] [--orders 50]
+"""
+import argparse
+import os
+import tempfile
+import threading
+import time
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import quiet, summarize
+from services.write_journal import WriteJournal
+
+ORDER = {'order_number': '0001', 'status': 'Pending', 'total_amount': 420.0,
+         'customer_details': {'name': 'Bench', 'phone': '0000000000'},
+         'items': [{'name': 'Strawberry Mint Box (30 Sachets)', 'quantity': 2, 'price': 210.0}]}
+
+
+def run_concurrently(write, threads, orders):
+    """Runs `orders` writes on each of `threads` threads; returns per-write durations (ms) and wall time."""
+    durations, lock = [], threading.Lock()
+
+    def worker():
+        mine = []
+        for _ in range(orders):
+            started = time.perf_counter()
+            write()
+            mine.append((time.perf_counter() - started) * 1000)
+        with lock:
+            durations.extend(mine)
+
+    workers = [threading.Thread(target=worker) for _ in range(threads)]
+    started = time.perf_counter()
+    for thread in workers:
+        thread.start()
+    for thread in workers:
+        thread.join()
+    return durations, time.perf_counter() - started
+
+
+def bench_direct(args):
+    db = FakeFirestore(latency=args.latency)
+    durations, wall = run_concurrently(lambda: db.collection('orders').add(dict(ORDER)), args.threads, args.orders)
+    return durations, wall, db.writes, None
+
+
+def bench_journal(args, synchronous):
+    db = FakeFirestore(latency=args.latency)
+    with tempfile.TemporaryDirectory(prefix='freshmo-bench-journal-') as directory:
+        journal = WriteJournal(os.path.join(directory, 'journal.db'), lambda: db, batch_size=args.batch_size,
+                               group_window=args.group_window, synchronous=synchronous)
+        durations, wall = run_concurrently(lambda: journal.append('orders', ORDER), args.threads, args.orders)
+        with quiet():
+            journal.flush(timeout=60)
+            journal.stop()
+        return durations, wall, db.writes, journal.stats()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--latency', type=float, default=0.03, help="Seconds per Firestore round trip")
+    parser.add_argument('--threads', type=int, default=8, help="Concurrent checkouts")
+    parser.add_argument('--orders', type=int, default=50, help="Orders written by each thread")
+    parser.add_argument('--batch-size', type=int, default=100)
+    parser.add_argument('--group-window', type=float, default=0.02)
+    args = parser.parse_args()
+
+    total = args.threads * args.orders
+    print(f"{total} orders from {args.threads} threads, Firestore round trip {args.latency * 1000:g} ms\n")
+    print(f"{'path':<22} | {'p50 (ms)':>9} | {'p99 (ms)':>9} | {'orders/s':>9} | {'batches':>8} | {'docs written':>12}")
+    for label, run in (('direct add()', lambda: bench_direct(args)),
+                       ('journal, FULL sync', lambda: bench_journal(args, 'FULL')),
+                       ('journal, NORMAL sync', lambda: bench_journal(args, 'NORMAL'))):
+        durations, wall, written, stats = run()
+        summary = summarize(durations)
+        batches = stats['batches'] if stats else total
+        print(f"{label:<22} | {summary['p50_ms']:>9.3f} | {summary['p99_ms']:>9.3f} | {total / wall:>9.1f} | "
+              f"{batches:>8} | {written:>12}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""
+Order export memory vs. collection size.
+
+Compares a naive export (stream the whole 'orders' collection into a list, then build the CSV in
+one string) with the paged, generator-based export behind /admin/orders/export. Peak memory is
+measured with tracemalloc while each export runs, on top of the seeded FakeFirestore. Like
+Firestore, the fake pages through a sorted index that is built once per query (a list of
+references to the stored orders): that index is the small growth left in the streaming peak.
+Both exports take about the same time; most of it is the fake deep-copying each order.
+
+    python -m benchmarks.bench_order_export [--orders 1000 10000 50000]
+"""
+import argparse
+import csv
+import io
+import time
+import tracemalloc
+
+from benchmarks.fake_firestore import FakeFirestore
+from services.order_export import CSV_COLUMNS, csv_row, format_orders, iter_orders
+
+
+def seeded_db(order_count):
+    db = FakeFirestore()
+    db.load('orders', {f"{i:04d}": {
+        'order_number': f"{i:04d}", 'status': 'Pending', 'timestamp': f"2025-01-01T00:00:{i:09d}",
+        'customer_details': {'name': f"Customer {i}", 'phone': '0712345678', 'delivery_type': 'Delivery',
+                             'address': '27 Parakeet Street, Villa Lisa, Boksburg, 1459'},
+        'cart_items': [{'name': 'Strawberry Mint Box (30 Sachets)', 'quantity': 2, 'price_incl_vat': 241.5}] * 3,
+        'subtotal_excl_vat': 630.0, 'total_vat_amount': 94.5, 'delivery_charge': 80.0, 'grand_total_incl_vat': 804.5,
+        'payment_method': 'EFT', 'special_note': 'Leave at the gate',
+    } for i in range(1, order_count + 1)})
+    return db
+
+
+def naive_export(db):
+    orders = [(snapshot.id, snapshot.to_dict()) for snapshot in db.collection('orders').stream()]
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+    writer.writerow(CSV_COLUMNS)
+    for doc_id, order in orders:
+        writer.writerow(csv_row(doc_id, order))
+    return len(buffer.getvalue())
+
+
+def streaming_export(db, page_size):
+    return sum(len(chunk) for chunk in format_orders(iter_orders(db, page_size=page_size), 'csv'))
+
+
+def measure(fn):
+    tracemalloc.start()
+    started = time.perf_counter()
+    size = fn()
+    elapsed = time.perf_counter() - started
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    return size, elapsed, peak / 1e6
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, nargs='+', default=[1000, 10000, 50000])
+    parser.add_argument('--page-size', type=int, default=500)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8} | {'export (MB)':>11} | {'naive peak (MB)':>16} {'s':>6} | {'streaming peak (MB)':>20} {'s':>6}")
+    for order_count in args.orders:
+        db = seeded_db(order_count)
+        size, naive_seconds, naive_peak = measure(lambda: naive_export(db))
+        _, stream_seconds, stream_peak = measure(lambda: streaming_export(db, args.page_size))
+        print(f"{order_count:>8} | {size / 1e6:>11.2f} | {naive_peak:>16.2f} {naive_seconds:>6.2f} | "
+              f"{stream_peak:>20.2f} {stream_seconds:>6.2f}")
+
+
+if __name__ == '__main__':
+    main()
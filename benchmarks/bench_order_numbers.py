@@ -0,0 +1,52 @@
+"""
+Checkout latency vs. order history size.
+
+Compares the old approach (scan every order to find the max order_number) with the
+block-leasing OrderNumberAllocator, both directly and through a full checkout POST.
+
+    python -m benchmarks.bench_order_numbers [--orders 1000 10000 100000]
+"""
+import argparse
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import create_offline_app, quiet, summarize, timed
+from services.order_numbers import OrderNumberAllocator, scan_max_order_number
+
+
+def seeded_db(order_count):
+    db = FakeFirestore()
+    db.load('orders', {f"order-{i}": {'order_number': f"{i:04d}", 'status': 'Pending'} for i in range(1, order_count + 1)})
+    return db
+
+
+def checkout_once(client):
+    client.post('/add-to-cart', data={'item_id': 'sm-box', 'item_name': 'Strawberry Mint Box (30 Sachets)', 'item_amount': '210.00', 'quantity': '1'})
+    client.post('/checkout', data={'name': 'Bench', 'phone': '0000000000', 'delivery_type': 'Aramex', 'address': '', 'payment_method': 'EFT'})
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--checkouts', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8} | {'legacy scan (ms)':>17} | {'allocator (ms)':>15} | {'checkout p50 (ms)':>18} | {'checkout p99 (ms)':>18}")
+    for order_count in args.orders:
+        db = seeded_db(order_count)
+        legacy = summarize(timed(lambda: scan_max_order_number(db), 5))
+
+        allocator = OrderNumberAllocator(lambda: db, block_size=10)
+        allocator.next_order_number()  # One-time counter seeding is not part of the steady state
+        allocated = summarize(timed(allocator.next_order_number, args.checkouts))
+
+        with quiet():
+            app = create_offline_app(db)
+            app.order_numbers.next_order_number()
+            client = app.test_client()
+            checkout = summarize(timed(lambda: checkout_once(client), args.checkouts))
+
+        print(f"{order_count:>8} | {legacy['mean_ms']:>17.3f} | {allocated['mean_ms']:>15.4f} | {checkout['p50_ms']:>18.3f} | {checkout['p99_ms']:>18.3f}")
+
+
+if __name__ == '__main__':
+    main()
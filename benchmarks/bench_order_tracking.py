@@ -0,0 +1,73 @@
+"""
+Order tracking latency and billed reads vs. order history size.
+
+Compares finding an order by scanning 'orders' (what a lookup without an index costs) with
+OrderTracker: a document get by order number (checked against the customer's phone), and a repeat
+lookup served from the TTL cache. Reads per lookup are what Firestore bills.
+
+    python -m benchmarks.bench_order_tracking [--orders 1000 10000 100000]
+"""
+import argparse
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import summarize, timed
+from services.order_tracking import OrderTracker
+
+PHONES = 500  # Distinct customers the seeded orders are spread over
+
+
+def seeded_db(order_count):
+    db = FakeFirestore()
+    orders = {}
+    for i in range(1, order_count + 1):
+        phone = f"07{i % PHONES:08d}"
+        orders[f"{i:04d}"] = {'order_number': f"{i:04d}", 'status': 'Pending', 'timestamp': f"2025-01-01T00:00:{i:09d}",
+                              'customer_phone': phone, 'customer_details': {'phone': phone, 'delivery_type': 'Aramex'},
+                              'cart_items': [{'name': 'Strawberry Mint Box (30 Sachets)', 'quantity': 1}]}
+    db.load('orders', orders)
+    return db
+
+
+def scan_for(db, order_number):
+    for snapshot in db.collection('orders').stream():
+        if snapshot.to_dict().get('order_number') == order_number:
+            return snapshot.to_dict()
+    return None
+
+
+def reads_per_call(db, fn, repeat):
+    before = db.reads
+    for _ in range(repeat):
+        fn()
+    return (db.reads - before) / repeat
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[1])
+    parser.add_argument('--orders', type=int, nargs='+', default=[1000, 10000, 100000])
+    parser.add_argument('--lookups', type=int, default=200)
+    args = parser.parse_args()
+
+    print(f"{'orders':>8} | {'scan (ms)':>10} {'reads':>7} | {'by number (ms)':>15} {'reads':>6} | "
+          f"{'cached (ms)':>12} {'reads':>6}")
+    for order_count in args.orders:
+        db = seeded_db(order_count)
+        target = f"{order_count // 2:04d}"
+        phone = f"07{(order_count // 2) % PHONES:08d}"
+        tracker = OrderTracker(lambda: db, ttl_seconds=0)  # No caching: every lookup reads Firestore
+        cached = OrderTracker(lambda: db, ttl_seconds=3600)
+        cached.find(target, phone)
+
+        scan = summarize(timed(lambda: scan_for(db, target), 3))
+        scan_reads = reads_per_call(db, lambda: scan_for(db, target), 1)
+        by_number = summarize(timed(lambda: tracker.find(target, phone), args.lookups))
+        number_reads = reads_per_call(db, lambda: tracker.find(target, phone), args.lookups)
+        hit = summarize(timed(lambda: cached.find(target, phone), args.lookups))
+        hit_reads = reads_per_call(db, lambda: cached.find(target, phone), args.lookups)
+
+        print(f"{order_count:>8} | {scan['mean_ms']:>10.2f} {scan_reads:>7.0f} | {by_number['p50_ms']:>15.4f} {number_reads:>6.0f} | "
+              f"{hit['p50_ms']:>12.4f} {hit_reads:>6.0f}")
+
+
+if __name__ == '__main__':
+    main()
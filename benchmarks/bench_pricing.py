@@ -0,0 +1,80 @@
+"""
+Cart pricing microbenchmark: the old float round()/sum() code path vs. services/pricing.price_cart.
+
+    python -m benchmarks.bench_pricing [--lines 1 5 25 100]
+
+"legacy" rebuilds the nine-field cart lines with float rounding and then makes the three
+separate sum() passes that view_cart/checkout used to make.
+"""
+import argparse
+import timeit
+import tracemalloc
+
+from services.catalog import CatalogIndex
+from services.pricing import price_cart
+
+VAT_RATE = 0.15
+PRODUCTS = [
+    {'id': f"p{i}", 'name': f"Product {i}", 'category': 'Bench', 'price_excl_vat': 9.00 + i * 1.37}
+    for i in range(100)
+]
+
+
+def legacy_totals(items, prices):
+    cart = []
+    for item in items:
+        price = prices[item['id']]
+        vat_amount_per_unit = round(price * VAT_RATE, 2)
+        price_incl_vat_per_unit = round(price + vat_amount_per_unit, 2)
+        cart.append({
+            'id': item['id'],
+            'name': item['id'],
+            'price_excl_vat_per_unit': price,
+            'vat_amount_per_unit': vat_amount_per_unit,
+            'price_incl_vat_per_unit': price_incl_vat_per_unit,
+            'quantity': item['quantity'],
+            'total_excl_vat': round(price * item['quantity'], 2),
+            'total_vat_amount': round(vat_amount_per_unit * item['quantity'], 2),
+            'total_incl_vat': round(price_incl_vat_per_unit * item['quantity'], 2),
+        })
+    subtotal_excl_vat = sum(line['total_excl_vat'] for line in cart)
+    total_vat_amount = sum(line['total_vat_amount'] for line in cart)
+    grand_total_incl_vat = sum(line['total_incl_vat'] for line in cart)
+    return subtotal_excl_vat, total_vat_amount, grand_total_incl_vat
+
+
+def allocations(fn):
+    tracemalloc.start()
+    fn()
+    current, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+    return peak
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cart pricing microbenchmark.")
+    parser.add_argument('--lines', type=int, nargs='+', default=[1, 5, 25, 100])
+    parser.add_argument('--number', type=int, default=2000)
+    args = parser.parse_args()
+
+    catalog = CatalogIndex(PRODUCTS, VAT_RATE)
+    prices = {p['id']: p['price_excl_vat'] for p in PRODUCTS}
+
+    print(f"{'lines':>6} | {'legacy (us)':>12} | {'cents (us)':>11} | {'legacy peak (B)':>16} | {'cents peak (B)':>15} | max drift (R)")
+    for line_count in args.lines:
+        items = [{'id': f"p{i % 100}", 'quantity': 1 + i % 7} for i in range(line_count)]
+        legacy_us = timeit.timeit(lambda: legacy_totals(items, prices), number=args.number) / args.number * 1e6
+        cents_us = timeit.timeit(lambda: price_cart(items, catalog), number=args.number) / args.number * 1e6
+
+        legacy = legacy_totals(items, prices)
+        totals = price_cart(items, catalog)
+        exact = (totals.subtotal_excl_vat, totals.total_vat_amount, totals.grand_total_incl_vat)
+        # Float rounding (half-even on binary floats) lets the legacy totals drift from exact cents
+        drift = max(abs(a - b) for a, b in zip(legacy, exact))
+
+        print(f"{line_count:>6} | {legacy_us:>12.2f} | {cents_us:>11.2f} | "
+              f"{allocations(lambda: legacy_totals(items, prices)):>16} | {allocations(lambda: price_cart(items, catalog)):>15} | {drift:.2f}")
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,128 @@
+"""
+First-render benchmark: template compile cost on a fresh worker, with and without the Jinja
+bytecode cache (build_templates.py) and PRECOMPILE_TEMPLATES.
+
+Every run is a new interpreter that calls create_app() and requests each page twice; the first
+request pays for loading the page's templates, the second shows the steady-state render time.
+The page cache is disabled so every request renders.
+
+    python -m benchmarks.bench_templates [--runs 5] [--json]
+
+Modes:
+    compile on demand   no bytecode cache, templates compiled by the first request that needs them
+    bytecode            templates loaded from a bytecode cache built for this run
+    precompile          PRECOMPILE_TEMPLATES=1 without bytecode (compile cost moves into create_app)
+    bytecode+precompile both: create_app loads the bytecode of every template
+"""
+import argparse
+import json
+import os
+import shutil
+import statistics
+import subprocess
+import sys
+import tempfile
+
+from benchmarks.harness import OFFLINE_ENV
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+PAGES = ('/', '/about', '/faqs', '/gallery', '/products', '/view-cart', '/checkout', '/rate-us', '/contact')
+
+_CHILD = r"""
+import json, sys, time
+pages = sys.argv[1:]
+from app import create_app
+started = time.perf_counter()
+app = create_app()
+created = time.perf_counter()
+client = app.test_client()
+first, second, status = {}, {}, {}
+for page in pages:
+    t0 = time.perf_counter()
+    status[page] = client.get(page).status_code
+    t1 = time.perf_counter()
+    client.get(page)
+    t2 = time.perf_counter()
+    first[page], second[page] = (t1 - t0) * 1000, (t2 - t1) * 1000
+print(json.dumps({'create_app_ms': (created - started) * 1000, 'first': first, 'second': second, 'status': status}))
+"""
+
+
+def child_env(cache_dir, precompile):
+    env = dict(os.environ, **OFFLINE_ENV)
+    env.update({
+        'FLASK_ENV': 'production',
+        'PAGE_CACHE_ENABLED': '0',
+        'JINJA_BYTECODE_CACHE_DIR': cache_dir,
+        'PRECOMPILE_TEMPLATES': '1' if precompile else '0',
+        'PYTHONDONTWRITEBYTECODE': '1',
+    })
+    return env
+
+
+def run_once(cache_dir, precompile):
+    result = subprocess.run([sys.executable, '-c', _CHILD, *PAGES], cwd=REPO_ROOT, env=child_env(cache_dir, precompile),
+                            capture_output=True, text=True, check=True)
+    # The app logs with print(); the measurement is the last line of stdout
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+def summarize_mode(samples):
+    median = statistics.median
+    first_total = [sum(s['first'].values()) for s in samples]
+    return {
+        'create_app_ms': round(median(s['create_app_ms'] for s in samples), 1),
+        'first_request_ms': {page: round(median(s['first'][page] for s in samples), 2) for page in PAGES},
+        'first_requests_total_ms': round(median(first_total), 1),
+        'first_request_max_ms': round(median(max(s['first'].values()) for s in samples), 1),
+        'steady_state_total_ms': round(median(sum(s['second'].values()) for s in samples), 1),
+        'startup_plus_first_requests_ms': round(median(s['create_app_ms'] + t for s, t in zip(samples, first_total)), 1),
+        'status': samples[0]['status'],
+    }
+
+
+def measure(runs):
+    workdir = tempfile.mkdtemp(prefix='freshmo-jinja-')
+    try:
+        missing = os.path.join(workdir, 'none')  # Never created: no bytecode cache
+        bytecode = os.path.join(workdir, 'bytecode')
+        os.makedirs(bytecode)
+        run_once(bytecode, precompile=True)  # Fills the cache, as build_templates.py would
+        modes = {
+            'compile on demand': (missing, False),
+            'bytecode': (bytecode, False),
+            'precompile': (missing, True),
+            'bytecode+precompile': (bytecode, True),
+        }
+        return {name: summarize_mode([run_once(*args) for _ in range(runs)]) for name, args in modes.items()}
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="First-request latency with and without the Jinja bytecode cache.")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--json', action='store_true', help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.runs)
+    if args.json:
+        print(json.dumps(report, indent=2))
+        return
+    print(f"median of {args.runs} fresh workers, {len(PAGES)} pages, page cache off")
+    print(f"{'mode':<22}{'create_app':>12}{'1st reqs':>11}{'slowest 1st':>13}{'startup+1st':>13}{'2nd reqs':>11}")
+    for name, row in report.items():
+        print(f"{name:<22}{row['create_app_ms']:>10.1f}ms{row['first_requests_total_ms']:>9.1f}ms"
+              f"{row['first_request_max_ms']:>11.1f}ms{row['startup_plus_first_requests_ms']:>11.1f}ms"
+              f"{row['steady_state_total_ms']:>9.1f}ms")
+    print("\nfirst request per page (ms):")
+    print(f"{'page':<14}" + ''.join(f"{name:>22}" for name in report))
+    for page in PAGES:
+        print(f"{page:<14}" + ''.join(f"{row['first_request_ms'][page]:>22.2f}" for row in report.values()))
+    failed = {page: code for page, code in next(iter(report.values()))['status'].items() if code >= 500}
+    if failed:
+        print(f"\nWARNING: pages returned errors: {failed}")
+
+
+if __name__ == '__main__':
+    main()
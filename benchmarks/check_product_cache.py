@@ -0,0 +1,131 @@
+"""
+Product cache check: the live /products pages follow the Firestore 'products' collection.
+
+Runs the real app against FakeFirestore seeded with the catalog from services/catalog_data.py, one
+product renamed, and checks through the test client that:
+  - /products serves the bundled catalog without reading Firestore, and starts the cache's first
+    load on a background thread
+  - once loaded, /products and /products/<category_name> show the Firestore data with a new ETag
+  - a write to the collection reaches app.catalog through the snapshot listener (cart and checkout
+    price from it too)
+  - two caches over the same products report the same version (a content hash, not a counter)
+  - documents without a name, category or price are skipped, and an empty collection keeps the
+    bundled catalog
+
+    python -m benchmarks.check_product_cache
+
+Exits 1 when a check fails.
+"""
+import sys
+import time
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import create_offline_app, quiet
+from services import catalog_data
+from services.catalog_sync import product_document
+from services.product_cache import ProductCache
+
+RENAMED = ('sm-box', 'Strawberry Mint Box (30 Sachets, Firestore)')
+CATEGORY_PATH = '/products/Mouthwash_Sachets'
+
+
+def seeded_db(products):
+    db = FakeFirestore()
+    db.load('products', {product['id']: product_document(product) for product in products})
+    return db
+
+
+def catalog_products():
+    product_id, name = RENAMED
+    return [dict(product, name=name) if product['id'] == product_id else product for product in catalog_data.PRODUCTS]
+
+
+def wait_for(condition, timeout=5):
+    deadline = time.monotonic() + timeout
+    while not condition() and time.monotonic() < deadline:
+        time.sleep(0.01)
+    return condition()
+
+
+def check_live_pages(failures):
+    db = seeded_db(catalog_products())
+    with quiet():
+        app = create_offline_app(db=db, FLASK_ENV='production', PRODUCT_CACHE_ENABLED='1')
+    client = app.test_client()
+    bundled_version = app.catalog.version
+
+    with quiet():
+        first = client.get('/products')
+        if first.status_code != 200:
+            failures.append(f"GET /products returned {first.status_code}")
+        loaded = wait_for(lambda: app.catalog.version != bundled_version)
+    if not loaded:
+        return failures.append(f"app.catalog was not rebuilt from Firestore ({app.product_cache.last_error})")
+    if app.firestore_accounting.stats()['routes'].get('/products', {}).get('reads'):
+        failures.append("GET /products read Firestore on the request thread")
+
+    with quiet():
+        listing, category = client.get('/products'), client.get(CATEGORY_PATH)
+    if listing.headers.get('ETag') == first.headers.get('ETag'):
+        failures.append("/products kept its ETag after the catalog changed")
+    if RENAMED[1] not in category.get_data(as_text=True):
+        failures.append(f"{CATEGORY_PATH} does not show the product name from Firestore")
+
+    before = app.catalog.version
+    with quiet():
+        db.collection('products').document('sm-single').update({'price_excl_vat': 9.5})
+    if not wait_for(lambda: app.catalog.get('sm-single').price_excl_vat == 9.5):
+        failures.append("a Firestore write did not reach app.catalog through the listener")
+    with quiet():
+        after = client.get(CATEGORY_PATH)
+    if app.catalog.version == before or after.headers.get('ETag') == category.headers.get('ETag'):
+        failures.append(f"{CATEGORY_PATH} kept its version after a price change")
+    app.product_cache.close()
+
+
+def check_shared_version(failures):
+    caches = [ProductCache(lambda db=seeded_db(catalog_products()): db, poll_interval=3600) for _ in range(2)]
+    versions = [cache.snapshot()[0] for cache in caches]
+    if versions[0] is None or versions[0] != versions[1]:
+        failures.append(f"two caches over the same products report different versions: {versions}")
+    for cache in caches:
+        cache.close()
+
+
+def check_bad_documents(failures):
+    documents = {product['id']: product_document(product) for product in catalog_data.PRODUCTS}
+    documents['half-written'] = {'name': 'No price yet', 'category': 'Combos'}
+    db = FakeFirestore()
+    db.load('products', documents)
+    with quiet():
+        app = create_offline_app(db=db, FLASK_ENV='production', PRODUCT_CACHE_ENABLED='1')
+        app.test_client().get('/products')
+        wait_for(lambda: app.product_cache.loaded_at is not None)
+    if app.catalog.get('half-written') is not None or len(app.catalog.products) != len(catalog_data.PRODUCTS):
+        failures.append("a document without a price made it into the catalog")
+    app.product_cache.close()
+
+    with quiet():
+        app = create_offline_app(db=FakeFirestore(), FLASK_ENV='production', PRODUCT_CACHE_ENABLED='1')
+        bundled_version = app.catalog.version
+        app.test_client().get('/products')
+        wait_for(lambda: app.product_cache.loaded_at is not None)
+    if app.catalog.version != bundled_version:
+        failures.append("an empty 'products' collection replaced the bundled catalog")
+    app.product_cache.close()
+
+
+def main():
+    failures = []
+    check_live_pages(failures)
+    check_shared_version(failures)
+    check_bad_documents(failures)
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: /products and {CATEGORY_PATH} follow the Firestore product cache.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
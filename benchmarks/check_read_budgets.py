@@ -0,0 +1,109 @@
+"""
+Firestore read-budget check: fails when a route reads more documents than it is allowed to.
+
+Runs the shop flow through the test client against FakeFirestore with FIRESTORE_ENFORCE_READ_BUDGET
+on, so a request over its budget raises ReadBudgetExceeded, and any query streamed without limit()
+is reported. The fake is seeded with --orders orders and --reviews reviews, so a route that scans a
+collection shows up as hundreds of reads instead of a handful.
+
+    python -m benchmarks.check_read_budgets [--orders 500] [--budget /checkout=3]
+
+Exits 1 when a route is over budget or an unbounded query ran.
+"""
+import argparse
+import sys
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import create_offline_app, quiet
+
+# Documents a single request may read. Pages are served from the in-memory catalog and carts;
+# a checkout reads the order counter once per leased block; tracking reads one order (two for an
+# order placed before order numbers became document IDs);
+# /rate-us reads the overall and one product's rating aggregate while they are not cached.
+DEFAULT_BUDGETS = {
+    '/': 0, '/about': 0, '/faqs': 0, '/gallery': 0, '/products': 0, '/products/<string:category_name>': 0,
+    '/add-to-cart': 0, '/view-cart': 0, '/checkout': 1, '/rate-us': 2, '/contact': 0, '/track-order': 2,
+}
+
+
+def seeded_db(orders, reviews):
+    db = FakeFirestore()
+    db.load('orders', {f"order-{i}": {'order_number': i, 'status': 'Pending', 'customer_details': {'phone': f"07{i:08d}"}}
+                       for i in range(1, orders + 1)})
+    db.load('reviews', {f"review-{i}": {'product': 'Strawberry Mint Box (30 Sachets)', 'rating': 1 + i % 5, 'review': 'ok'}
+                        for i in range(reviews)})
+    # A deployed shop already has its order counter; seeding it is a one-off scan (see services/order_numbers.py)
+    db.load('counters', {'orders': {'last_order_number': orders}})
+    db.reads = db.writes = 0
+    return db
+
+
+def scenario(app, client, checkouts, orders_seeded):
+    product = app.catalog.products[0]
+    category = next(iter(app.catalog.categories))
+    for path in ('/', '/about', '/faqs', '/gallery', '/products', f"/products/{category}", '/rate-us',
+                 f"/rate-us?product={product.name}", '/contact'):
+        yield 'GET', path, None
+    for _ in range(checkouts):
+        yield 'POST', '/add-to-cart', {'item_id': product.id, 'quantity': 2}
+        yield 'GET', '/view-cart', None
+        yield 'GET', '/checkout', None
+        yield 'POST', '/checkout', {'name': 'Budget Check', 'phone': '0712345678', 'delivery_type': 'Aramex',
+                                    'address': '', 'payment_method': 'EFT'}
+    for query in ('order_number=1&phone=0712345678', f"order_number={orders_seeded + 1}&phone=0712345678",
+                  'order_number=2&phone=0700000001', 'phone=0712345678'):
+        yield 'GET', f"/track-order?{query}", None
+    yield 'POST', '/rate-us', {'product': product.name, 'rating': '5', 'review': 'Great', 'name': 'Budget Check'}
+    yield 'POST', '/contact', {'name': 'Budget Check', 'email': 'check@example.com', 'subject': 'Hi', 'message': 'Hello'}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Fail when a route exceeds its Firestore read budget.")
+    parser.add_argument('--orders', type=int, default=500, help="Orders preloaded into the fake")
+    parser.add_argument('--reviews', type=int, default=200, help="Reviews preloaded into the fake")
+    parser.add_argument('--checkouts', type=int, default=25, help="Checkouts to run (crosses order-number block leases)")
+    parser.add_argument('--budget', action='append', default=[], metavar='ROUTE=READS', help="Override a route's budget")
+    args = parser.parse_args()
+
+    budgets = dict(DEFAULT_BUDGETS)
+    for override in args.budget:
+        route, _, reads = override.rpartition('=')
+        budgets[route] = int(reads)
+
+    db = seeded_db(args.orders, args.reviews)
+    with quiet():
+        app = create_offline_app(db=db, FLASK_ENV='production', FIRESTORE_ENFORCE_READ_BUDGET='1')
+    accounting = app.firestore_accounting
+    accounting.route_budgets = budgets
+    client = app.test_client()
+
+    from services.firestore_accounting import ReadBudgetExceeded
+
+    failures = []
+    for method, path, data in scenario(app, client, args.checkouts, args.orders):
+        try:
+            with quiet():
+                response = client.open(path, method=method, data=data)
+            if response.status_code >= 500:
+                failures.append(f"{method} {path} returned {response.status_code}")
+        except ReadBudgetExceeded as e:
+            failures.append(str(e))
+    if not app.journal.flush(timeout=30):
+        failures.append(f"{app.journal.pending_count()} journaled writes never reached Firestore")
+
+    stats = accounting.stats()
+    print(f"{'route':<36}{'requests':>9}{'reads':>8}{'writes':>8}{'RPCs':>7}{'budget':>8}")
+    for route, totals in sorted(stats['routes'].items()):
+        print(f"{route:<36}{totals['requests']:>9}{totals['reads']:>8}{totals['writes']:>8}{totals['round_trips']:>7}"
+              f"{str(accounting.budget_for(route)):>8}")
+    for query, count in sorted(stats['unbounded_queries'].items()):
+        failures.append(f"unbounded query ({count}x): {query}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print(f"OK: every route stayed within its read budget ({args.orders} orders, {args.reviews} reviews).")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
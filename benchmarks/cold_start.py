@@ -0,0 +1,147 @@
+"""
+Cold-start report and budget check for the serverless entry point.
+
+Starts fresh interpreters that import wsgi.py (what Vercel does on a cold start) and serve one
+/about request, then reports:
+  - wall time for `import wsgi` (includes create_app) on top of an already imported Flask, the
+    time `import flask` itself took in the same process, and the first request
+  - the slowest imports, from python -X importtime
+  - whether any deferred heavy module (firebase_admin, grpc, google-cloud-firestore, requests)
+    was loaded anyway
+
+Exits 1 when the median import time is over --budget-ms or a deferred module was loaded, so it
+can guard against regressions in CI. Only the app's own share is budgeted: Flask's import time
+depends on the machine (and is paid by any Flask app), so it is reported but not checked. The
+budget can also come from COLD_START_BUDGET_MS, for CI machines slower than a laptop.
+
+    python -m benchmarks.cold_start                  # report + check against the default budget
+    python -m benchmarks.cold_start --budget-ms 150 --runs 7 --top 15
+    python benchmarks/cold_start.py                  # same, for CI steps that run scripts by path
+"""
+import argparse
+import json
+import os
+import re
+import statistics
+import subprocess
+import sys
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+if REPO_ROOT not in sys.path:
+    sys.path.insert(0, REPO_ROOT)  # Run by path, only benchmarks/ itself would be importable
+
+from benchmarks.harness import OFFLINE_ENV  # noqa: E402
+# Median ms for `import wsgi` after `import flask`: about 30 ms on a laptop, so ~3x headroom
+DEFAULT_BUDGET_MS = float(os.environ.get('COLD_START_BUDGET_MS', 100.0))
+# Must not be imported just to start the app and serve a page that does not use them
+DEFERRED_MODULES = ('firebase_admin', 'google.cloud.firestore', 'grpc', 'requests')
+
+_CHILD = r"""
+import json, sys, time
+started = time.perf_counter()
+import flask
+flask_imported = time.perf_counter()
+import wsgi
+imported = time.perf_counter()
+response = wsgi.app.test_client().get('/about')
+served = time.perf_counter()
+print(json.dumps({
+    'flask_ms': (flask_imported - started) * 1000,
+    'import_ms': (imported - flask_imported) * 1000,
+    'first_request_ms': (served - imported) * 1000,
+    'status': response.status_code,
+    'modules': sorted(sys.modules),
+}))
+"""
+_IMPORTTIME_LINE = re.compile(r'^import time:\s+(\d+) \|\s+(\d+) \|( *)(\S+)')
+
+
+def child_env():
+    env = dict(os.environ, **OFFLINE_ENV)
+    # A (fake) service account makes sure Firebase would be initialised at import if it were still eager
+    env['FIREBASE_SERVICE_ACCOUNT_JSON'] = json.dumps({'type': 'service_account', 'project_id': 'cold-start-check'})
+    env['FLASK_ENV'] = 'production'
+    env['PYTHONDONTWRITEBYTECODE'] = '1'
+    return env
+
+
+def run_once(importtime=False):
+    command = [sys.executable] + (['-X', 'importtime'] if importtime else []) + ['-c', _CHILD]
+    result = subprocess.run(command, cwd=REPO_ROOT, env=child_env(), capture_output=True, text=True, check=True)
+    # The app logs with print(); the measurement is the last line of stdout
+    return json.loads(result.stdout.strip().splitlines()[-1]), result.stderr
+
+
+def parse_importtime(stderr):
+    """Returns [(cumulative_us, self_us, depth, module)] from -X importtime output."""
+    rows = []
+    for line in stderr.splitlines():
+        match = _IMPORTTIME_LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, module = match.groups()
+            rows.append((int(cumulative_us), int(self_us), len(indent) // 2, module))
+    return rows
+
+
+def measure(runs=5, top=10):
+    samples = [run_once()[0] for _ in range(runs)]
+    detail, stderr = run_once(importtime=True)
+    rows = parse_importtime(stderr)
+    loaded_deferred = sorted(
+        module for module in DEFERRED_MODULES
+        if any(name == module or name.startswith(module + '.') for name in detail['modules'])
+    )
+    return {
+        'runs': runs,
+        'import_ms_median': round(statistics.median(s['import_ms'] for s in samples), 1),
+        'import_ms_max': round(max(s['import_ms'] for s in samples), 1),
+        'flask_ms_median': round(statistics.median(s['flask_ms'] for s in samples), 1),
+        'first_request_ms_median': round(statistics.median(s['first_request_ms'] for s in samples), 1),
+        'first_request_status': detail['status'],
+        'modules_loaded': len(detail['modules']),
+        'deferred_modules_loaded': loaded_deferred,
+        'slowest_imports': [
+            {'module': module, 'cumulative_ms': round(cumulative / 1000, 1), 'self_ms': round(own / 1000, 1)}
+            for cumulative, own, _, module in sorted(rows, reverse=True)[:top]
+        ],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Cold-start import report and budget check for wsgi.py.")
+    parser.add_argument('--budget-ms', type=float, default=DEFAULT_BUDGET_MS,
+                        help="Max median `import wsgi` time on top of `import flask` (default: $COLD_START_BUDGET_MS or 100)")
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--top', type=int, default=10, help="How many of the slowest imports to list")
+    parser.add_argument('--json', action='store_true', help="Print the raw report as JSON")
+    args = parser.parse_args()
+
+    report = measure(args.runs, args.top)
+    if args.json:
+        print(json.dumps(report, indent=2))
+    else:
+        print(f"import flask: median {report['flask_ms_median']} ms (not budgeted)")
+        print(f"import wsgi after flask: median {report['import_ms_median']} ms, max {report['import_ms_max']} ms "
+              f"over {args.runs} runs (budget {args.budget_ms:g} ms)")
+        print(f"first GET /about: median {report['first_request_ms_median']} ms (status {report['first_request_status']})")
+        print(f"modules loaded: {report['modules_loaded']}")
+        print("slowest imports (cumulative / self):")
+        for row in report['slowest_imports']:
+            print(f"  {row['cumulative_ms']:8.1f} ms {row['self_ms']:7.1f} ms  {row['module']}")
+
+    failures = []
+    if report['import_ms_median'] > args.budget_ms:
+        failures.append(f"import time {report['import_ms_median']} ms (beyond Flask) is over the {args.budget_ms:g} ms budget")
+    if report['deferred_modules_loaded']:
+        failures.append("deferred modules were imported at startup: " + ', '.join(report['deferred_modules_loaded']))
+    if report['first_request_status'] != 200:
+        failures.append(f"GET /about returned {report['first_request_status']}")
+    for failure in failures:
+        print(f"FAIL: {failure}")
+    if not failures:
+        print("OK: cold start is within budget.")
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == '__main__':
+    main()
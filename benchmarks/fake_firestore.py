@@ -0,0 +1,584 @@
+"""
+In-memory stand-in for the parts of the Firestore client Freshmo uses.
+
+This lets the benchmarks run the real app code (transactions, batches, queries)
+without network access or credentials. FakeAsyncFirestore puts the same documents
+behind the AsyncClient calls of the async checkout. It is NOT a full Firestore emulator:
+only the calls made by app.py, routes/ and services/ are supported.
+"""
+import asyncio
+import copy
+import threading
+import time
+import uuid
+from datetime import datetime
+
+from firebase_admin import firestore
+from google.api_core.exceptions import AlreadyExists
+
+
+def _get_field(data, field_path):
+    """Resolve a dotted field path (e.g. 'customer_details.phone') inside a document dict."""
+    value = data
+    for part in field_path.split('.'):
+        if not isinstance(value, dict) or part not in value:
+            return None
+        value = value[part]
+    return value
+
+
+def _resolve_sentinels(data):
+    """Replace Firestore sentinels the way the server would."""
+    resolved = {}
+    for key, value in data.items():
+        if value is firestore.SERVER_TIMESTAMP:
+            resolved[key] = datetime.now()
+        elif isinstance(value, dict):
+            resolved[key] = _resolve_sentinels(value)
+        else:
+            resolved[key] = value
+    return resolved
+
+
+def _apply_increments(current, data):
+    """Apply firestore.Increment transforms against the current document values."""
+    applied = {}
+    for key, value in data.items():
+        if isinstance(value, firestore.Increment):
+            applied[key] = (current.get(key) or 0) + value.value
+        else:
+            applied[key] = value
+    return applied
+
+
+_OPERATORS = {
+    '==': lambda a, b: a == b,
+    '!=': lambda a, b: a != b,
+    '<': lambda a, b: a is not None and a < b,
+    '<=': lambda a, b: a is not None and a <= b,
+    '>': lambda a, b: a is not None and a > b,
+    '>=': lambda a, b: a is not None and a >= b,
+    'in': lambda a, b: a in b,
+    'array_contains': lambda a, b: isinstance(a, list) and b in a,
+}
+
+
+class FakeDocumentSnapshot:
+    def __init__(self, reference, data):
+        self.reference = reference
+        self.id = reference.id
+        self._data = data
+
+    @property
+    def exists(self):
+        return self._data is not None
+
+    def to_dict(self):
+        return copy.deepcopy(self._data) if self._data is not None else None
+
+    def get(self, field_path):
+        return copy.deepcopy(_get_field(self._data or {}, field_path))
+
+
+class FakeDocumentReference:
+    def __init__(self, db, collection_name, doc_id):
+        self._db = db
+        self._collection_name = collection_name
+        self.id = doc_id
+
+    @property
+    def path(self):
+        return f"{self._collection_name}/{self.id}"
+
+    def get(self, field_paths=None, transaction=None):
+        self._db._round_trip()
+        return self._read(field_paths)
+
+    def set(self, document_data, merge=False):
+        self._db._round_trip()
+        self._set(document_data, merge)
+
+    def create(self, document_data):
+        self._db._round_trip()
+        self._create(document_data)
+
+    def update(self, field_updates):
+        self._db._round_trip()
+        self._update(field_updates)
+
+    def delete(self):
+        self._db._round_trip()
+        self._delete()
+
+    # --- Shared with FakeAsyncDocumentReference (after its round trip) ---
+    def _read(self, field_paths):
+        with self._db._lock:
+            data = self._db._collection(self._collection_name).get(self.id)
+            self._db.reads += 1
+            if data is not None and field_paths:
+                data = {field: _get_field(data, field) for field in field_paths}
+            return FakeDocumentSnapshot(self, copy.deepcopy(data))
+
+    def _set(self, document_data, merge):
+        with self._db._lock:
+            self._db._write(self, document_data, merge=merge)
+        self._db._notify_watchers()
+
+    def _create(self, document_data):
+        with self._db._lock:
+            if self.id in self._db._collection(self._collection_name):
+                raise AlreadyExists(f"Document already exists: {self.path}")
+            self._db._write(self, document_data)
+        self._db._notify_watchers()
+
+    def _update(self, field_updates):
+        with self._db._lock:
+            self._db._update(self, field_updates)
+        self._db._notify_watchers()
+
+    def _delete(self):
+        with self._db._lock:
+            self._db._delete(self)
+        self._db._notify_watchers()
+
+
+class FakeQuery:
+    def __init__(self, db, collection_name, filters=(), orders=(), limit=None, start_after=None, fields=None):
+        self._db = db
+        self._collection_name = collection_name
+        self._filters = tuple(filters)
+        self._orders = tuple(orders)
+        self._limit = limit
+        self._start_after = start_after
+        self._fields = fields
+
+    def _copy(self, **changes):
+        params = {
+            'filters': self._filters,
+            'orders': self._orders,
+            'limit': self._limit,
+            'start_after': self._start_after,
+            'fields': self._fields,
+        }
+        params.update(changes)
+        return FakeQuery(self._db, self._collection_name, **params)
+
+    def where(self, field_path=None, op_string=None, value=None, filter=None):
+        if filter is not None:  # firestore.FieldFilter, the keyword form newer client versions prefer
+            field_path, op_string, value = filter.field_path, filter.op_string, filter.value
+        return self._copy(filters=self._filters + ((field_path, op_string, value),))
+
+    def order_by(self, field_path, direction=firestore.Query.ASCENDING):
+        return self._copy(orders=self._orders + ((field_path, direction),))
+
+    def limit(self, count):
+        return self._copy(limit=count)
+
+    def start_after(self, document_fields_or_snapshot):
+        return self._copy(start_after=document_fields_or_snapshot)
+
+    def select(self, field_paths):
+        return self._copy(fields=tuple(field_paths))
+
+    def _filtered_and_sorted(self):
+        docs = list(self._db._collection(self._collection_name).items())
+        for field, op, value in self._filters:
+            docs = [(doc_id, data) for doc_id, data in docs if _OPERATORS[op](_get_field(data, field), value)]
+        for field, direction in reversed(self._orders):
+            if field == '__name__':  # firestore.FieldPath.document_id()
+                docs.sort(key=lambda item: item[0], reverse=direction == firestore.Query.DESCENDING)
+                continue
+            docs.sort(key=lambda item: (_get_field(item[1], field) is None, _get_field(item[1], field)),
+                      reverse=direction == firestore.Query.DESCENDING)
+        return docs, {doc_id: position for position, (doc_id, _) in enumerate(docs)}
+
+    def _matching(self):
+        # Like Firestore's indexes, a filtered and sorted result is kept until the collection changes,
+        # so paging through it costs one sort, not one per page
+        key = (self._collection_name, self._filters, self._orders)
+        with self._db._lock:
+            try:
+                docs, positions = self._db._indexes[key]
+            except KeyError:
+                docs, positions = self._db._indexes[key] = self._filtered_and_sorted()
+            except TypeError:  # Unhashable filter value (e.g. a list for 'in'): not cached
+                docs, positions = self._filtered_and_sorted()
+        if self._start_after is not None:
+            cursor = self._start_after
+            if isinstance(cursor, FakeDocumentSnapshot):
+                cursor_id = cursor.id
+            else:
+                cursor_id = cursor.get('__name__') if isinstance(cursor, dict) else None
+            if cursor_id in positions:
+                start = positions[cursor_id] + 1
+                end = None if self._limit is None else start + self._limit
+                docs = docs[start:end]  # Only the page is copied, not the rest of the collection
+            elif isinstance(cursor, dict) and self._orders:
+                field, direction = self._orders[0]
+                after = _OPERATORS['<' if direction == firestore.Query.DESCENDING else '>']
+                docs = [(doc_id, data) for doc_id, data in docs if after(_get_field(data, field), cursor[field])]
+        if self._limit is not None:
+            docs = docs[:self._limit]
+        return docs
+
+    def stream(self, transaction=None):
+        self._db._round_trip()
+        yield from self._snapshots()
+
+    def _snapshots(self):
+        for doc_id, data in self._matching():
+            self._db.reads += 1
+            if self._fields is not None:
+                data = {field: _get_field(data, field) for field in self._fields}
+            ref = FakeDocumentReference(self._db, self._collection_name, doc_id)
+            yield FakeDocumentSnapshot(ref, copy.deepcopy(data))
+
+    def get(self, transaction=None):
+        return list(self.stream(transaction=transaction))
+
+
+class FakeCollectionReference(FakeQuery):
+    def __init__(self, db, collection_name):
+        super().__init__(db, collection_name)
+        self.id = collection_name
+
+    def document(self, document_id=None):
+        return FakeDocumentReference(self._db, self._collection_name, document_id or uuid.uuid4().hex[:20])
+
+    def list_documents(self, page_size=None):
+        """References to every document in the collection (one round trip; billed like a read per document)."""
+        self._db._round_trip()
+        with self._db._lock:
+            ids = list(self._db._collection(self._collection_name))
+        self._db.reads += len(ids)
+        return [self.document(doc_id) for doc_id in ids]
+
+    def on_snapshot(self, callback):
+        """Calls callback(docs, changes, read_time) now and after every write to this collection."""
+        return self._db._watch(self, callback)
+
+    def add(self, document_data, document_id=None):
+        ref = self.document(document_id)
+        ref.set(document_data)
+        return datetime.now(), ref
+
+
+class FakeWriteBatch:
+    def __init__(self, db):
+        self._db = db
+        self._writes = []
+
+    def __len__(self):
+        return len(self._writes)
+
+    def set(self, reference, document_data, merge=False):
+        self._writes.append(('set', reference, document_data, merge))
+
+    def create(self, reference, document_data):
+        self._writes.append(('create', reference, document_data, False))
+
+    def update(self, reference, field_updates):
+        self._writes.append(('update', reference, field_updates, False))
+
+    def delete(self, reference):
+        self._writes.append(('delete', reference, None, False))
+
+    def commit(self):
+        self._db._round_trip()
+        with self._db._lock:
+            self._db._apply(self._writes)
+        self._db._notify_watchers()
+        results = [datetime.now()] * len(self._writes)
+        self._writes = []
+        return results
+
+
+class FakeTransaction(FakeWriteBatch):
+    """Serialises transactions with the database lock; understood by firestore.transactional."""
+    _read_only = False
+    _max_attempts = 5
+
+    def __init__(self, db):
+        super().__init__(db)
+        self._id = None
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    def _begin(self, retry_id=None):
+        self._db._round_trip()
+        self._db._lock.acquire()
+        self._id = uuid.uuid4().bytes
+
+    def _commit(self):
+        try:
+            self._db._apply(self._writes)
+        finally:
+            self._release()
+        self._db._notify_watchers()
+
+    def _rollback(self):
+        self._release()
+
+    def _release(self):
+        if self._id is not None:
+            self._clean_up()
+            self._db._lock.release()
+
+
+class FakeWatch:
+    def __init__(self, db, collection, callback):
+        self._db = db
+        self._collection = collection
+        self._callback = callback
+        self.is_active = True
+
+    def _fire(self):
+        if self.is_active:
+            self._callback(self._collection.get(), [], datetime.now())
+
+    def unsubscribe(self):
+        self.is_active = False
+        with self._db._lock:
+            self._db._watches.remove(self)
+
+
+class FakeFirestore:
+    """Thread-safe in-memory Firestore client.
+
+    ``latency`` adds a fixed delay to every round trip so benchmarks can model
+    a remote database; ``reads``/``writes`` count billed document operations.
+    """
+
+    def __init__(self, latency=0.0):
+        self.latency = latency
+        self.reads = 0
+        self.writes = 0
+        self._lock = threading.RLock()
+        self._data = {}
+        self._watches = []
+        self._changed = set()  # Collections written since watchers were last notified
+        self._indexes = {}  # (collection, filters, orders) -> (sorted [(doc_id, data)], {doc_id: position})
+        self.fail = False  # Set to True to make every call raise, as if Firestore were unreachable
+
+    def _round_trip(self):
+        if self.fail:
+            raise ConnectionError("Fake Firestore is unavailable")
+        if self.latency:
+            time.sleep(self.latency)
+
+    def _watch(self, collection, callback):
+        watch = FakeWatch(self, collection, callback)
+        with self._lock:
+            self._watches.append(watch)
+        watch._fire()
+        return watch
+
+    def _notify_watchers(self):
+        """Delivers snapshots for collections changed by the last write (called without the lock held)."""
+        with self._lock:
+            changed, self._changed = self._changed, set()
+            watches = [w for w in self._watches if w._collection.id in changed]
+        for watch in watches:
+            watch._fire()
+
+    def _mark_changed(self, name):
+        """Called with the lock held after a write to collection `name`."""
+        self._changed.add(name)
+        for key in [key for key in self._indexes if key[0] == name]:
+            del self._indexes[key]
+
+    def _collection(self, name):
+        return self._data.setdefault(name, {})
+
+    def collection(self, collection_path):
+        return FakeCollectionReference(self, collection_path)
+
+    def document(self, document_path):
+        collection_name, doc_id = document_path.split('/', 1)
+        return FakeDocumentReference(self, collection_name, doc_id)
+
+    def batch(self):
+        return FakeWriteBatch(self)
+
+    def transaction(self, **kwargs):
+        return FakeTransaction(self)
+
+    def get_all(self, references, field_paths=None, transaction=None):
+        self._round_trip()
+        with self._lock:
+            for ref in references:
+                data = self._collection(ref._collection_name).get(ref.id)
+                self.reads += 1
+                if data is not None and field_paths:
+                    data = {field: _get_field(data, field) for field in field_paths}
+                yield FakeDocumentSnapshot(ref, copy.deepcopy(data))
+
+    # --- Write helpers (callers hold self._lock) ---
+    def _write(self, ref, data, merge=False):
+        documents = self._collection(ref._collection_name)
+        current = documents.get(ref.id) or {}
+        data = _resolve_sentinels(_apply_increments(current, data))
+        if merge:
+            merged = copy.deepcopy(current)
+            merged.update(copy.deepcopy(data))
+            documents[ref.id] = merged
+        else:
+            documents[ref.id] = copy.deepcopy(data)
+        self._mark_changed(ref._collection_name)
+        self.writes += 1
+
+    def _update(self, ref, field_updates):
+        documents = self._collection(ref._collection_name)
+        if ref.id not in documents:
+            raise ValueError(f"No document to update: {ref.path}")
+        document = documents[ref.id]
+        for field_path, value in field_updates.items():
+            parts = field_path.split('.')
+            target = document
+            for part in parts[:-1]:
+                target = target.setdefault(part, {})
+            if value is firestore.DELETE_FIELD:
+                target.pop(parts[-1], None)
+                continue
+            value = _apply_increments(target, {parts[-1]: value})[parts[-1]]
+            target[parts[-1]] = _resolve_sentinels({'v': value})['v']
+        self._mark_changed(ref._collection_name)
+        self.writes += 1
+
+    def _delete(self, ref):
+        self._collection(ref._collection_name).pop(ref.id, None)
+        self._mark_changed(ref._collection_name)
+        self.writes += 1
+
+    def _apply(self, writes):
+        for op, ref, data, merge in writes:
+            if op == 'set':
+                self._write(ref, data, merge=merge)
+            elif op == 'create':
+                if ref.id in self._collection(ref._collection_name):
+                    raise AlreadyExists(f"Document already exists: {ref.path}")
+                self._write(ref, data)
+            elif op == 'update':
+                self._update(ref, data)
+            else:
+                self._delete(ref)
+
+    def load(self, collection_name, documents):
+        """Bulk-load ``{doc_id: data}`` without counting writes (for seeding benchmarks)."""
+        with self._lock:
+            self._collection(collection_name).update(copy.deepcopy(documents))
+            self._mark_changed(collection_name)
+        self._notify_watchers()
+
+
+class FakeAsyncDocumentReference(FakeDocumentReference):
+    def __init__(self, client, collection_name, doc_id):
+        super().__init__(client._db, collection_name, doc_id)
+        self._client = client
+
+    async def get(self, field_paths=None, transaction=None):
+        await self._client._round_trip()
+        return self._read(field_paths)
+
+    async def set(self, document_data, merge=False):
+        await self._client._round_trip()
+        self._set(document_data, merge)
+
+    async def create(self, document_data):
+        await self._client._round_trip()
+        self._create(document_data)
+
+    async def update(self, field_updates):
+        await self._client._round_trip()
+        self._update(field_updates)
+
+    async def delete(self):
+        await self._client._round_trip()
+        self._delete()
+
+
+class FakeAsyncCollectionReference:
+    def __init__(self, client, collection_name):
+        self._client = client
+        self._collection_name = collection_name
+        self.id = collection_name
+
+    def document(self, document_id=None):
+        return FakeAsyncDocumentReference(self._client, self._collection_name, document_id or uuid.uuid4().hex[:20])
+
+    async def stream(self, transaction=None):
+        await self._client._round_trip()
+        for snapshot in FakeQuery(self._client._db, self._collection_name)._snapshots():
+            yield snapshot
+
+
+class FakeAsyncTransaction(FakeWriteBatch):
+    """FakeTransaction for async_transactional; transactions of one FakeAsyncFirestore take turns."""
+    _read_only = False
+    _max_attempts = 5
+
+    def __init__(self, client):
+        super().__init__(client._db)
+        self._client = client
+        self._id = None
+
+    def _clean_up(self):
+        self._writes = []
+        self._id = None
+
+    async def _begin(self, retry_id=None):
+        await self._client._round_trip()
+        await self._client._transaction_lock().acquire()
+        self._id = uuid.uuid4().bytes
+
+    async def _commit(self):
+        try:
+            with self._db._lock:
+                self._db._apply(self._writes)
+        finally:
+            self._release()
+        self._db._notify_watchers()
+
+    async def _rollback(self):
+        self._release()
+
+    def _release(self):
+        if self._id is not None:
+            self._clean_up()
+            self._client._transaction_lock().release()
+
+
+class FakeAsyncFirestore:
+    """Stand-in for google.cloud.firestore.AsyncClient over a FakeFirestore's documents and counters.
+
+    A round trip awaits asyncio.sleep(latency) instead of blocking, so calls from many checkouts
+    overlap on one event loop. Its transactions take turns with each other (an asyncio.Lock on the
+    loop it is used from), not with the FakeFirestore's own.
+    """
+
+    def __init__(self, db):
+        self._db = db
+        self._lock = None
+
+    async def _round_trip(self):
+        if self._db.fail:
+            raise ConnectionError("Fake Firestore is unavailable")
+        if self._db.latency:
+            await asyncio.sleep(self._db.latency)
+
+    def _transaction_lock(self):
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+        return self._lock
+
+    def collection(self, collection_path):
+        return FakeAsyncCollectionReference(self, collection_path)
+
+    def document(self, document_path):
+        collection_name, doc_id = document_path.split('/', 1)
+        return FakeAsyncDocumentReference(self, collection_name, doc_id)
+
+    def transaction(self, **kwargs):
+        return FakeAsyncTransaction(self)
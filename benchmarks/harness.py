@@ -0,0 +1,67 @@
+"""Shared helpers for running the Freshmo app offline in benchmarks."""
+import atexit
+import contextlib
+import io
+import os
+import statistics
+import tempfile
+import time
+
+# Never let a benchmark reach the real Telegram bot, Google API or Firebase project from .env.
+OFFLINE_ENV = {
+    'TELEGRAM_BOT_TOKEN': '',
+    'TELEGRAM_CHAT_ID': '',
+    'GOOGLE_API_KEY': '',
+    'FIREBASE_SERVICE_ACCOUNT_JSON': '',
+    # A journal of its own, so benchmark orders are never replayed into Firestore by a real app start
+    'WRITE_JOURNAL_PATH': os.path.join(tempfile.gettempdir(), f"freshmo-bench-journal-{os.getpid()}.db"),
+}
+
+
+@atexit.register
+def _remove_offline_journal():
+    for suffix in ('', '-wal', '-shm'):
+        with contextlib.suppress(OSError):
+            os.remove(OFFLINE_ENV['WRITE_JOURNAL_PATH'] + suffix)
+
+
+def create_offline_app(db=None, **env):
+    """Builds the real Flask app with external services disabled and ``db`` as its Firestore client."""
+    os.environ.update(OFFLINE_ENV)
+    os.environ.update({key: str(value) for key, value in env.items()})
+    from app import create_app
+
+    app = create_app()
+    app.config['TESTING'] = True
+    app.db = db
+    return app
+
+
+def timed(fn, repeat):
+    """Calls fn ``repeat`` times and returns the per-call durations in milliseconds."""
+    durations = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        durations.append((time.perf_counter() - start) * 1000)
+    return durations
+
+
+def percentile(ordered, fraction):
+    """Nearest-rank percentile of an already sorted list."""
+    return ordered[min(len(ordered) - 1, int(len(ordered) * fraction))]
+
+
+def summarize(durations):
+    ordered = sorted(durations)
+    return {
+        'mean_ms': round(statistics.fmean(ordered), 3),
+        'p50_ms': round(percentile(ordered, 0.50), 3),
+        'p95_ms': round(percentile(ordered, 0.95), 3),
+        'p99_ms': round(percentile(ordered, 0.99), 3),
+    }
+
+
+def quiet():
+    """Swallows the app's print() logging so benchmark tables stay readable."""
+    return contextlib.redirect_stdout(io.StringIO())
@@ -0,0 +1,290 @@
+"""
+End-to-end load test of the shop flow, fully offline.
+
+Boots the real app on a local threaded WSGI server with an in-memory Firestore (FakeFirestore)
+and local stand-ins for the Telegram Bot API and Google Distance Matrix (stub_servers.py), then
+runs --users virtual customers for --duration seconds. Each customer repeatedly:
+
+    GET /products -> GET /products/<category> -> POST /add-to-cart x --cart-items
+    -> GET /view-cart -> GET /checkout -> POST /checkout
+
+following redirects like a browser. Reports req/s and p50/p95/p99 per route (grouped by URL
+rule) and writes the results to JSON so runs can be compared across commits:
+
+    python -m benchmarks.loadtest --users 16 --duration 30
+    python -m benchmarks.loadtest --telegram-latency 0.3 --maps-failure-rate 0.2 --firestore-latency 0.02
+    python -m benchmarks.loadtest --baseline benchmarks/results/loadtest-abc123.json   # run, then compare
+    python -m benchmarks.loadtest --compare old.json new.json                          # compare only
+
+The client runs in the same process as the server, so absolute numbers are a lower bound;
+compare runs made on the same machine with the same options.
+"""
+import argparse
+import json
+import logging
+import os
+import platform
+import random
+import subprocess
+import sys
+import threading
+import time
+from datetime import datetime
+from urllib.parse import urlsplit
+
+from benchmarks.fake_firestore import FakeFirestore
+from benchmarks.harness import create_offline_app, percentile, quiet
+from benchmarks.stub_servers import distance_matrix_stub, telegram_stub
+
+REPO_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+RESULTS_DIR = os.path.join(REPO_ROOT, 'benchmarks', 'results')
+SUBURBS = ('Boksburg', 'Benoni', 'Germiston', 'Kempton Park', 'Alberton', 'Springs', 'Brakpan')
+FIXED_DELIVERY_TYPES = ('Collection', 'PEP PAXI', 'Aramex')
+PAYMENT_METHODS = ('Cash on Collection', 'Cash on Delivery', 'EFT', 'Instant Cash')
+
+
+class VirtualCustomer:
+    """One browser session walking the shop flow; records (label, started_at, ms, ok) per request."""
+
+    def __init__(self, base_url, app, options, seed):
+        import requests  # The load generator's own client, separate from the app's pooled one
+
+        self.base_url = base_url
+        self.session = requests.Session()
+        self.url_adapter = app.url_map.bind('localhost')
+        self.products = list(app.catalog.products)
+        self.categories = list(app.catalog.categories)
+        self.options = options
+        self.random = random.Random(seed)
+        self.samples = []
+        self.checkouts = 0
+
+    def label_for(self, method, path):
+        try:
+            rule, _ = self.url_adapter.match(path, method=method, return_rule=True)
+            return f"{method} {rule.rule}"
+        except Exception:
+            return f"{method} {path}"
+
+    def request(self, method, path, data=None, expect_location=None):
+        """Sends one request, then follows a redirect (as its own sample). Returns the final path."""
+        label = self.label_for(method, path)
+        started = time.perf_counter()
+        try:
+            response = self.session.request(method, self.base_url + path, data=data, allow_redirects=False, timeout=30)
+            location = urlsplit(response.headers.get('Location', '')).path
+            ok = response.status_code < 400 and (expect_location is None or location == expect_location)
+        except Exception:
+            response, location, ok = None, '', False
+        self.samples.append((label, started, (time.perf_counter() - started) * 1000, ok))
+        if response is not None and response.is_redirect and location:
+            return self.request('GET', location)
+        return path
+
+    def run_scenario(self):
+        rnd = self.random
+        self.request('GET', '/products')
+        self.request('GET', f"/products/{rnd.choice(self.categories)}")
+        for _ in range(self.options.cart_items):
+            product = rnd.choice(self.products)
+            form = {'item_id': product.id, 'quantity': rnd.randint(1, 3)}
+            colors = product.colors or product.toothbrush_colors
+            if colors:
+                form['color'] = rnd.choice(list(colors))
+            self.request('POST', '/add-to-cart', form)
+        self.request('GET', '/view-cart')
+        self.request('GET', '/checkout')
+
+        if rnd.random() < self.options.delivery_share:
+            delivery_type = 'Delivery'
+            address = f"{rnd.randrange(self.options.addresses)} Loadtest Street, {rnd.choice(SUBURBS)}"
+        else:
+            delivery_type, address = rnd.choice(FIXED_DELIVERY_TYPES), ''
+        form = {'name': 'Load Test', 'phone': f"07{rnd.randrange(10 ** 8):08d}", 'delivery_type': delivery_type,
+                'address': address, 'payment_method': rnd.choice(PAYMENT_METHODS), 'special_note': ''}
+        # A successful order redirects home; a failed one back to /checkout
+        self.request('POST', '/checkout', form, expect_location='/')
+        self.checkouts += 1
+        if self.options.think_time:
+            time.sleep(rnd.uniform(0, 2 * self.options.think_time))
+
+    def run_until(self, deadline):
+        while time.perf_counter() < deadline:
+            self.run_scenario()
+
+
+def git_revision():
+    try:
+        commit = subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=REPO_ROOT, capture_output=True, text=True, check=True).stdout.strip()
+        dirty = bool(subprocess.run(['git', 'status', '--porcelain', '--untracked-files=no'], cwd=REPO_ROOT,
+                                    capture_output=True, text=True, check=True).stdout.strip())
+        return commit, dirty
+    except (OSError, subprocess.CalledProcessError):
+        return 'unknown', False
+
+
+def summarize_routes(samples, measured_seconds):
+    by_label = {}
+    for label, _, duration_ms, ok in samples:
+        by_label.setdefault(label, []).append((duration_ms, ok))
+    routes = {}
+    for label, rows in sorted(by_label.items()):
+        ordered = sorted(duration for duration, _ in rows)
+        routes[label] = {
+            'requests': len(rows),
+            'errors': sum(1 for _, ok in rows if not ok),
+            'rps': round(len(rows) / measured_seconds, 2),
+            'mean_ms': round(sum(ordered) / len(ordered), 2),
+            'p50_ms': round(percentile(ordered, 0.50), 2),
+            'p95_ms': round(percentile(ordered, 0.95), 2),
+            'p99_ms': round(percentile(ordered, 0.99), 2),
+            'max_ms': round(ordered[-1], 2),
+        }
+    return routes
+
+
+def run(options):
+    from werkzeug.serving import make_server
+
+    logging.getLogger('werkzeug').setLevel(logging.ERROR)
+    telegram = telegram_stub(latency=options.telegram_latency, failure_rate=options.telegram_failure_rate).start()
+    maps = distance_matrix_stub(latency=options.maps_latency, failure_rate=options.maps_failure_rate).start()
+    db = FakeFirestore(latency=options.firestore_latency)
+    try:
+        with quiet():
+            app = create_offline_app(
+                db=db, FLASK_ENV='production', TELEGRAM_BOT_TOKEN='loadtest', TELEGRAM_CHAT_ID='1',
+                TELEGRAM_API_BASE=telegram.url, TELEGRAM_MIN_INTERVAL='0',
+                GOOGLE_API_KEY='loadtest', GOOGLE_MAPS_API_BASE=maps.url,
+            )
+        # Config is read when app.py is first imported; never run against the real APIs from .env
+        if app.config['TELEGRAM_API_BASE'] != telegram.url or app.config['GOOGLE_MAPS_API_BASE'] != maps.url:
+            sys.exit("app.py was imported before the stubs were configured; run the load test in a fresh process")
+        app.config['TESTING'] = False  # Errors become 500 responses, as in production
+
+        server = make_server('127.0.0.1', 0, app, threaded=True)
+        threading.Thread(target=server.serve_forever, daemon=True).start()
+        base_url = f"http://127.0.0.1:{server.server_port}"
+        customers = [VirtualCustomer(base_url, app, options, seed=options.seed + i) for i in range(options.users)]
+
+        print(f"Load testing {base_url}: {options.users} users for {options.duration:g}s (+{options.warmup:g}s warm-up)...")
+        with quiet():
+            started = time.perf_counter()
+            measure_from = started + options.warmup
+            deadline = measure_from + options.duration
+            threads = [threading.Thread(target=c.run_until, args=(deadline,)) for c in customers]
+            for thread in threads:
+                thread.start()
+            for thread in threads:
+                thread.join()
+            finished = time.perf_counter()
+            app.telegram_notifier.flush(timeout=30)
+            app.journal.flush(timeout=30)
+            server.shutdown()
+    finally:
+        telegram.stop()
+        maps.stop()
+
+    samples = [sample for c in customers for sample in c.samples if sample[1] >= measure_from]
+    measured_seconds = finished - measure_from
+    routes = summarize_routes(samples, measured_seconds)
+    commit, dirty = git_revision()
+    return {
+        'meta': {
+            'commit': commit, 'dirty': dirty, 'timestamp': datetime.now().isoformat(timespec='seconds'),
+            'python': platform.python_version(), 'platform': platform.platform(),
+            'options': {key: value for key, value in vars(options).items() if key not in ('output', 'baseline', 'compare')},
+        },
+        'totals': {
+            'requests': len(samples),
+            'errors': sum(1 for sample in samples if not sample[3]),
+            'rps': round(len(samples) / measured_seconds, 2),
+            'checkouts_per_s': routes.get('POST /checkout', {}).get('rps', 0.0),
+            'measured_seconds': round(measured_seconds, 2),
+        },
+        'routes': routes,
+        'upstream': {
+            'telegram_messages': len(telegram.requests),
+            'distance_matrix_calls': len(maps.requests),
+            'firestore_reads': db.reads,
+            'firestore_writes': db.writes,
+            'notifier': app.telegram_notifier.stats(),
+            'delivery_quotes': app.delivery_quotes.stats(),
+            'journal': app.journal.stats(),
+            'http_client': app.http.stats(),
+        },
+    }
+
+
+def print_report(report):
+    totals = report['totals']
+    print(f"\n{totals['requests']} requests in {totals['measured_seconds']}s: {totals['rps']} req/s, "
+          f"{totals['checkouts_per_s']} checkouts/s, {totals['errors']} errors")
+    print(f"{'route':<36}{'reqs':>7}{'err':>5}{'req/s':>9}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}{'max ms':>9}")
+    for label, row in report['routes'].items():
+        print(f"{label:<36}{row['requests']:>7}{row['errors']:>5}{row['rps']:>9.1f}{row['p50_ms']:>9.1f}"
+              f"{row['p95_ms']:>9.1f}{row['p99_ms']:>9.1f}{row['max_ms']:>9.1f}")
+    upstream = report['upstream']
+    print(f"upstream: {upstream['telegram_messages']} Telegram messages, {upstream['distance_matrix_calls']} Distance Matrix calls, "
+          f"{upstream['firestore_reads']} Firestore reads, {upstream['firestore_writes']} writes")
+
+
+def print_comparison(old, new):
+    def change(before, after):
+        return f"{(after - before) / before * 100:+.0f}%" if before else 'n/a'
+
+    print(f"\n{old['meta']['commit']} -> {new['meta']['commit']}")
+    print(f"total req/s {old['totals']['rps']} -> {new['totals']['rps']} ({change(old['totals']['rps'], new['totals']['rps'])})")
+    print(f"{'route':<36}{'req/s':>18}{'p95 ms':>20}{'p99 ms':>20}")
+    for label in sorted(set(old['routes']) | set(new['routes'])):
+        before, after = old['routes'].get(label), new['routes'].get(label)
+        if not before or not after:
+            print(f"{label:<36}  only in {'new' if after else 'old'} run")
+            continue
+        cells = [f"{before[key]:.1f}>{after[key]:.1f} {change(before[key], after[key]):>5}" for key in ('rps', 'p95_ms', 'p99_ms')]
+        print(f"{label:<36}" + ''.join(f"{cell:>20}" for cell in cells))
+
+
+def load_report(path):
+    with open(path) as f:
+        return json.load(f)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Offline end-to-end load test of browse -> cart -> checkout.")
+    parser.add_argument('--users', type=int, default=8, help="Concurrent virtual customers")
+    parser.add_argument('--duration', type=float, default=20.0, help="Measured seconds")
+    parser.add_argument('--warmup', type=float, default=3.0, help="Seconds run before measuring")
+    parser.add_argument('--cart-items', type=int, default=3, help="add-to-cart requests per scenario")
+    parser.add_argument('--delivery-share', type=float, default=0.5, help="Fraction of orders using Distance Matrix delivery")
+    parser.add_argument('--addresses', type=int, default=200, help="Distinct delivery addresses (repeats hit the quote cache)")
+    parser.add_argument('--think-time', type=float, default=0.0, help="Mean pause in seconds between scenarios")
+    parser.add_argument('--seed', type=int, default=1)
+    parser.add_argument('--firestore-latency', type=float, default=0.0, help="Seconds per Firestore round trip")
+    parser.add_argument('--telegram-latency', type=float, default=0.0)
+    parser.add_argument('--telegram-failure-rate', type=float, default=0.0)
+    parser.add_argument('--maps-latency', type=float, default=0.0)
+    parser.add_argument('--maps-failure-rate', type=float, default=0.0)
+    parser.add_argument('--output', help="Results file (default: benchmarks/results/loadtest-<commit>-<time>.json)")
+    parser.add_argument('--baseline', help="Earlier results file to compare this run against")
+    parser.add_argument('--compare', nargs=2, metavar=('OLD', 'NEW'), help="Compare two results files and exit")
+    options = parser.parse_args()
+
+    if options.compare:
+        print_comparison(*(load_report(path) for path in options.compare))
+        return
+
+    report = run(options)
+    print_report(report)
+    output = options.output or os.path.join(
+        RESULTS_DIR, f"loadtest-{report['meta']['commit']}-{datetime.now().strftime('%Y%m%d-%H%M%S')}.json")
+    os.makedirs(os.path.dirname(os.path.abspath(output)), exist_ok=True)
+    with open(output, 'w') as f:
+        json.dump(report, f, indent=2)
+    print(f"Results written to {output}")
+    if options.baseline:
+        print_comparison(load_report(options.baseline), report)
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+"""
+Local stand-ins for the external HTTP APIs the app calls.
+
+    python -m benchmarks.stub_servers --telegram-port 8081 --maps-port 8082
+
+then start the app with TELEGRAM_API_BASE=http://127.0.0.1:8081 so notifications
+are recorded locally instead of reaching the real bot, and with
+GOOGLE_MAPS_API_BASE=http://127.0.0.1:8082 (and any non-empty GOOGLE_API_KEY) so
+delivery quotes come from the Distance Matrix stand-in.
+"""
+import argparse
+import hashlib
+import json
+import random
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlsplit
+
+
+class _Server(ThreadingHTTPServer):
+    request_queue_size = 128  # Many clients connect at once in the concurrency benchmarks
+    daemon_threads = True
+
+
+class StubServer:
+    """Runs a ThreadingHTTPServer on a background thread with configurable latency and failures."""
+
+    def __init__(self, handler_class, port=0, latency=0.0, failure_rate=0.0):
+        self.latency = latency
+        self.failure_rate = failure_rate
+        self.requests = []  # Parsed request bodies, in arrival order
+        self._lock = threading.Lock()
+        self._server = _Server(('127.0.0.1', port), handler_class)
+        self._server.stub = self
+        self._thread = None
+
+    @property
+    def url(self):
+        host, port = self._server.server_address
+        return f"http://{host}:{port}"
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def record(self, body):
+        with self._lock:
+            self.requests.append(body)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc_info):
+        self.stop()
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = 'HTTP/1.1'  # Keep-alive, like the real APIs
+
+    def log_message(self, format, *args):
+        pass  # Keep benchmark output clean
+
+    def _send_json(self, status, body):
+        encoded = json.dumps(body).encode()
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(encoded)))
+        self.end_headers()
+        self.wfile.write(encoded)
+
+    def _simulate(self):
+        """Applies the configured latency; returns True if this request should fail."""
+        stub = self.server.stub
+        if stub.latency:
+            time.sleep(stub.latency)
+        return random.random() < stub.failure_rate
+
+
+class TelegramHandler(_StubHandler):
+    """Accepts POST /bot<token>/sendMessage like the Telegram Bot API."""
+
+    def do_POST(self):
+        length = int(self.headers.get('Content-Length') or 0)
+        payload = json.loads(self.rfile.read(length) or b'{}')
+        if self._simulate():
+            self._send_json(500, {'ok': False, 'error_code': 500, 'description': 'Stub failure'})
+            return
+        if not self.path.endswith('/sendMessage'):
+            self._send_json(404, {'ok': False, 'error_code': 404, 'description': 'Not Found'})
+            return
+        self.server.stub.record(payload)
+        self._send_json(200, {'ok': True, 'result': {'message_id': len(self.server.stub.requests), 'text': payload.get('text')}})
+
+
+class DistanceMatrixHandler(_StubHandler):
+    """Answers GET /maps/api/distancematrix/json like the Distance Matrix API, with a stable 1-60 km per destination."""
+
+    def do_GET(self):
+        url = urlsplit(self.path)
+        query = {key: values[0] for key, values in parse_qs(url.query).items()}
+        if self._simulate():
+            self._send_json(500, {'status': 'UNKNOWN_ERROR', 'rows': []})
+            return
+        if url.path != '/maps/api/distancematrix/json':
+            self._send_json(404, {'status': 'NOT_FOUND', 'rows': []})
+            return
+        self.server.stub.record(query)
+        destination = query.get('destinations', '')
+        metres = 1000 + int(hashlib.sha1(destination.encode()).hexdigest(), 16) % 59000
+        element = {'status': 'OK', 'distance': {'value': metres, 'text': f"{metres / 1000:.1f} km"},
+                   'duration': {'value': metres // 12, 'text': f"{metres // 720} mins"}}
+        self._send_json(200, {'status': 'OK', 'origin_addresses': [query.get('origins', '')],
+                              'destination_addresses': [destination], 'rows': [{'elements': [element]}]})
+
+
+def telegram_stub(port=0, latency=0.0, failure_rate=0.0):
+    return StubServer(TelegramHandler, port=port, latency=latency, failure_rate=failure_rate)
+
+
+def distance_matrix_stub(port=0, latency=0.0, failure_rate=0.0):
+    return StubServer(DistanceMatrixHandler, port=port, latency=latency, failure_rate=failure_rate)
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run local stub APIs for Freshmo.")
+    parser.add_argument('--telegram-port', type=int, default=8081)
+    parser.add_argument('--maps-port', type=int, default=8082)
+    parser.add_argument('--latency', type=float, default=0.0, help="Seconds added to every response")
+    parser.add_argument('--failure-rate', type=float, default=0.0, help="Fraction of requests answered with HTTP 500")
+    args = parser.parse_args()
+
+    telegram = telegram_stub(args.telegram_port, args.latency, args.failure_rate).start()
+    maps = distance_matrix_stub(args.maps_port, args.latency, args.failure_rate).start()
+    print(f"Telegram stub listening on {telegram.url} (set TELEGRAM_API_BASE={telegram.url})")
+    print(f"Distance Matrix stub listening on {maps.url} (set GOOGLE_MAPS_API_BASE={maps.url})")
+    try:
+        while True:
+            time.sleep(1)
+    except KeyboardInterrupt:
+        telegram.stop()
+        maps.stop()
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,542 @@
+"""
+Stylesheet build step (replaces the in-browser Tailwind CDN compiler).
+
+Scans templates/ for class names, generates only the Tailwind (v3) utilities that are actually
+used -- including arbitrary values such as text-[#00897B] or min-h-[60vh] and the hover:/focus:/
+sm:/md:/lg: variants -- and writes one minified stylesheet:
+
+    Tailwind preflight  +  static/css/base.css (site styles)  +  used utilities
+    -> static/css/site.css
+
+The order matches what the CDN produced (site styles first, utilities last, so utilities win).
+build_static.py then fingerprints site.css like every other asset. The generator is pure Python
+and needs no network or Node toolchain; it covers the utility families used on this site and
+reports any class that looks like a Tailwind utility but is not supported, so it can be added here.
+
+Usage:
+    python build_css.py          # regenerate static/css/site.css
+    python build_css.py --check  # exit 1 if site.css is out of date with the templates (for CI)
+
+Run it after editing templates or base.css, and commit the regenerated site.css.
+"""
+import argparse
+import glob
+import os
+import re
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+CONTENT_GLOBS = ('templates/**/*.html',)
+SOURCE_STYLESHEETS = ('static/css/base.css',)
+OUTPUT_PATH = os.path.join(BASE_DIR, 'static', 'css', 'site.css')
+
+# --- Theme (Tailwind v3 defaults, trimmed to the palettes worth carrying) ---
+SCREENS = {'sm': '640px', 'md': '768px', 'lg': '1024px', 'xl': '1280px', '2xl': '1536px'}
+
+SPACING = {'px': '1px', '0': '0px'}
+SPACING.update({str(n).rstrip('0').rstrip('.') if isinstance(n, float) else str(n): f"{n * 0.25:g}rem"
+                for n in (0.5, 1, 1.5, 2, 2.5, 3, 3.5, 4, 5, 6, 7, 8, 9, 10, 11, 12, 14, 16, 20, 24, 28,
+                          32, 36, 40, 44, 48, 52, 56, 60, 64, 72, 80, 96)})
+
+FRACTIONS = {'1/2': '50%', '1/3': '33.333333%', '2/3': '66.666667%', '1/4': '25%', '3/4': '75%', 'full': '100%'}
+
+_SHADES = (50, 100, 200, 300, 400, 500, 600, 700, 800, 900)
+_PALETTES = {
+    'gray': ('#f9fafb', '#f3f4f6', '#e5e7eb', '#d1d5db', '#9ca3af', '#6b7280', '#4b5563', '#374151', '#1f2937', '#111827'),
+    'red': ('#fef2f2', '#fee2e2', '#fecaca', '#fca5a5', '#f87171', '#ef4444', '#dc2626', '#b91c1c', '#991b1b', '#7f1d1d'),
+    'yellow': ('#fefce8', '#fef9c3', '#fef08a', '#fde047', '#facc15', '#eab308', '#ca8a04', '#a16207', '#854d0e', '#713f12'),
+    'green': ('#f0fdf4', '#dcfce7', '#bbf7d0', '#86efac', '#4ade80', '#22c55e', '#16a34a', '#15803d', '#166534', '#14532d'),
+    'teal': ('#f0fdfa', '#ccfbf1', '#99f6e4', '#5eead4', '#2dd4bf', '#14b8a6', '#0d9488', '#0f766e', '#115e59', '#134e4a'),
+    'blue': ('#eff6ff', '#dbeafe', '#bfdbfe', '#93c5fd', '#60a5fa', '#3b82f6', '#2563eb', '#1d4ed8', '#1e40af', '#1e3a8a'),
+}
+COLORS = {'white': '#ffffff', 'black': '#000000', 'transparent': 'transparent', 'current': 'currentColor'}
+for _name, _values in _PALETTES.items():
+    COLORS.update({f"{_name}-{shade}": value for shade, value in zip(_SHADES, _values)})
+
+FONT_SIZES = {
+    'xs': ('0.75rem', '1rem'), 'sm': ('0.875rem', '1.25rem'), 'base': ('1rem', '1.5rem'),
+    'lg': ('1.125rem', '1.75rem'), 'xl': ('1.25rem', '1.75rem'), '2xl': ('1.5rem', '2rem'),
+    '3xl': ('1.875rem', '2.25rem'), '4xl': ('2.25rem', '2.5rem'), '5xl': ('3rem', '1'), '6xl': ('3.75rem', '1'),
+}
+FONT_WEIGHTS = {'light': '300', 'normal': '400', 'medium': '500', 'semibold': '600', 'bold': '700', 'extrabold': '800'}
+LINE_HEIGHTS = {'none': '1', 'tight': '1.25', 'snug': '1.375', 'normal': '1.5', 'relaxed': '1.625', 'loose': '2'}
+RADII = {'': '0.25rem', 'none': '0px', 'sm': '0.125rem', 'md': '0.375rem', 'lg': '0.5rem', 'xl': '0.75rem',
+         '2xl': '1rem', 'full': '9999px'}
+MAX_WIDTHS = {'xs': '20rem', 'sm': '24rem', 'md': '28rem', 'lg': '32rem', 'xl': '36rem', '2xl': '42rem',
+              '3xl': '48rem', '4xl': '56rem', '5xl': '64rem', '6xl': '72rem', '7xl': '80rem', 'full': '100%', 'none': 'none'}
+SHADOWS = {
+    'sm': '0 1px 2px 0 rgb(0 0 0 / 0.05)',
+    '': '0 1px 3px 0 rgb(0 0 0 / 0.1), 0 1px 2px -1px rgb(0 0 0 / 0.1)',
+    'md': '0 4px 6px -1px rgb(0 0 0 / 0.1), 0 2px 4px -2px rgb(0 0 0 / 0.1)',
+    'lg': '0 10px 15px -3px rgb(0 0 0 / 0.1), 0 4px 6px -4px rgb(0 0 0 / 0.1)',
+    'xl': '0 20px 25px -5px rgb(0 0 0 / 0.1), 0 8px 10px -6px rgb(0 0 0 / 0.1)',
+    '2xl': '0 25px 50px -12px rgb(0 0 0 / 0.25)',
+    'none': '0 0 #0000',
+}
+OPACITIES = {str(n): f"{n / 100:g}" for n in (0, 5, 10, 20, 25, 30, 40, 50, 60, 70, 75, 80, 90, 95, 100)}
+EASE = 'cubic-bezier(0.4, 0, 0.2, 1)'
+TRANSITION_PROPERTIES = {
+    '': 'color, background-color, border-color, text-decoration-color, fill, stroke, opacity, box-shadow, transform, filter, backdrop-filter',
+    'all': 'all',
+    'colors': 'color, background-color, border-color, text-decoration-color, fill, stroke',
+    'opacity': 'opacity',
+    'shadow': 'box-shadow',
+    'transform': 'transform',
+}
+TRANSFORM = ('translate(var(--tw-translate-x), var(--tw-translate-y)) rotate(var(--tw-rotate)) '
+             'skewX(var(--tw-skew-x)) skewY(var(--tw-skew-y)) scaleX(var(--tw-scale-x)) scaleY(var(--tw-scale-y))')
+
+PREFLIGHT = """
+*,::before,::after{box-sizing:border-box;border-width:0;border-style:solid;border-color:#e5e7eb}
+::before,::after{--tw-content:''}
+html{line-height:1.5;-webkit-text-size-adjust:100%;-moz-tab-size:4;tab-size:4;font-family:ui-sans-serif,system-ui,sans-serif,"Apple Color Emoji","Segoe UI Emoji","Segoe UI Symbol","Noto Color Emoji";font-feature-settings:normal;font-variation-settings:normal;-webkit-tap-highlight-color:transparent}
+body{margin:0;line-height:inherit}
+hr{height:0;color:inherit;border-top-width:1px}
+abbr:where([title]){text-decoration:underline dotted}
+h1,h2,h3,h4,h5,h6{font-size:inherit;font-weight:inherit}
+a{color:inherit;text-decoration:inherit}
+b,strong{font-weight:bolder}
+code,kbd,samp,pre{font-family:ui-monospace,SFMono-Regular,Menlo,Monaco,Consolas,"Liberation Mono","Courier New",monospace;font-size:1em}
+small{font-size:80%}
+sub,sup{font-size:75%;line-height:0;position:relative;vertical-align:baseline}
+sub{bottom:-0.25em}
+sup{top:-0.5em}
+table{text-indent:0;border-color:inherit;border-collapse:collapse}
+button,input,optgroup,select,textarea{font-family:inherit;font-feature-settings:inherit;font-variation-settings:inherit;font-size:100%;font-weight:inherit;line-height:inherit;letter-spacing:inherit;color:inherit;margin:0;padding:0}
+button,select{text-transform:none}
+button,input:where([type='button']),input:where([type='reset']),input:where([type='submit']){-webkit-appearance:button;background-color:transparent;background-image:none}
+:-moz-focusring{outline:auto}
+:-moz-ui-invalid{box-shadow:none}
+progress{vertical-align:baseline}
+::-webkit-inner-spin-button,::-webkit-outer-spin-button{height:auto}
+[type='search']{-webkit-appearance:textfield;outline-offset:-2px}
+::-webkit-search-decoration{-webkit-appearance:none}
+::-webkit-file-upload-button{-webkit-appearance:button;font:inherit}
+summary{display:list-item}
+blockquote,dl,dd,h1,h2,h3,h4,h5,h6,hr,figure,p,pre{margin:0}
+fieldset{margin:0;padding:0}
+legend{padding:0}
+ol,ul,menu{list-style:none;margin:0;padding:0}
+dialog{padding:0}
+textarea{resize:vertical}
+input::placeholder,textarea::placeholder{opacity:1;color:#9ca3af}
+button,[role="button"]{cursor:pointer}
+:disabled{cursor:default}
+img,svg,video,canvas,audio,iframe,embed,object{display:block;vertical-align:middle}
+img,video{max-width:100%;height:auto}
+[hidden]{display:none}
+*,::before,::after,::backdrop{--tw-translate-x:0;--tw-translate-y:0;--tw-rotate:0;--tw-skew-x:0;--tw-skew-y:0;--tw-scale-x:1;--tw-scale-y:1;--tw-ring-offset-width:0px;--tw-ring-offset-color:#fff;--tw-ring-color:rgb(59 130 246 / 0.5);--tw-ring-offset-shadow:0 0 #0000;--tw-ring-shadow:0 0 #0000;--tw-shadow:0 0 #0000;--tw-shadow-colored:0 0 #0000}
+"""
+
+# Pseudo-class variants, in the order Tailwind emits them (responsive variants always come last)
+PSEUDO_VARIANTS = {'hover': ':hover', 'focus': ':focus', 'active': ':active', 'disabled': ':disabled'}
+
+# Tailwind's extractor: anything between quotes/whitespace/angle brackets that does not end in ':'
+CANDIDATE_PATTERN = re.compile(r"[^<>\"'`\s]*[^<>\"'`\s:]")
+# class="..." attributes and class_='...' helper arguments, used only to report unsupported classes
+CLASS_ATTRIBUTE_PATTERN = re.compile(r"""\bclass_?\s*=\s*(["'])(.*?)\1""", re.S)
+# Something that looks like it was meant as a utility (used to warn about unsupported classes)
+UTILITY_LIKE = re.compile(r"^(?:[a-z0-9]+:)*-?(?:bg|text|border|p[xytrbl]?|m[xytrbl]?|w|h|min-h|max-w|gap|space-[xy]|"
+                          r"grid-cols|rounded|shadow|opacity|duration|z|inset|font|leading|scale|transition|ring)-")
+
+
+# --- Helpers ---
+def _hex_to_rgb(value):
+    value = value.lstrip('#')
+    if len(value) == 3:
+        value = ''.join(c * 2 for c in value)
+    if not re.fullmatch(r'[0-9a-fA-F]{6}', value):
+        return None
+    return ' '.join(str(int(value[i:i + 2], 16)) for i in (0, 2, 4))
+
+
+def _arbitrary(value):
+    """'[60vh]' -> '60vh' (underscores stand for spaces, as in Tailwind)."""
+    if value.startswith('[') and value.endswith(']'):
+        return value[1:-1].replace('_', ' ')
+    return None
+
+
+def _color(value):
+    """Theme color name or arbitrary [#hex] -> CSS color, or None."""
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None:
+        return arbitrary if arbitrary.startswith(('#', 'rgb', 'hsl')) else None
+    return COLORS.get(value)
+
+
+def _color_declarations(prop, opacity_var, color):
+    rgb = _hex_to_rgb(color) if color.startswith('#') else None
+    if rgb is None:
+        return [(prop, color)]
+    return [(opacity_var, '1'), (prop, f"rgb({rgb} / var({opacity_var}))")]
+
+
+def _spacing(value, allow_auto=False, extra=None):
+    if allow_auto and value == 'auto':
+        return 'auto'
+    if extra and value in extra:
+        return extra[value]
+    arbitrary = _arbitrary(value)
+    if arbitrary is not None:
+        return arbitrary
+    return SPACING.get(value)
+
+
+def _is_length(value):
+    return bool(re.match(r'^-?[\d.]+(px|rem|em|%|vh|vw|ch)$', value)) or value.startswith(('calc(', 'clamp(', 'var('))
+
+
+# --- Utility resolution ---
+# Each entry: (plugin order, resolver). Order follows Tailwind's core plugin order so that, as with
+# the CDN, e.g. `p-6 px-8` lets px-8 win and `text-lg md:text-2xl` switches at md.
+STATIC_UTILITIES = [
+    # position / inset / z-index
+    (10, {'static': [('position', 'static')], 'fixed': [('position', 'fixed')], 'absolute': [('position', 'absolute')],
+          'relative': [('position', 'relative')], 'sticky': [('position', 'sticky')]}),
+    # display
+    (40, {'block': [('display', 'block')], 'inline-block': [('display', 'inline-block')], 'inline': [('display', 'inline')],
+          'flex': [('display', 'flex')], 'inline-flex': [('display', 'inline-flex')], 'grid': [('display', 'grid')],
+          'hidden': [('display', 'none')]}),
+    (55, {'flex-1': [('flex', '1 1 0%')], 'flex-auto': [('flex', '1 1 auto')], 'flex-none': [('flex', 'none')],
+          'flex-shrink-0': [('flex-shrink', '0')], 'shrink-0': [('flex-shrink', '0')],
+          'flex-grow': [('flex-grow', '1')], 'grow': [('flex-grow', '1')], 'flex-grow-0': [('flex-grow', '0')]}),
+    (60, {'transform': [('transform', TRANSFORM)], 'transform-none': [('transform', 'none')]}),
+    (62, {'cursor-pointer': [('cursor', 'pointer')]}),
+    (64, {'list-inside': [('list-style-position', 'inside')], 'list-outside': [('list-style-position', 'outside')]}),
+    (65, {'list-disc': [('list-style-type', 'disc')], 'list-decimal': [('list-style-type', 'decimal')],
+          'list-none': [('list-style-type', 'none')]}),
+    (70, {'flex-row': [('flex-direction', 'row')], 'flex-col': [('flex-direction', 'column')],
+          'flex-row-reverse': [('flex-direction', 'row-reverse')], 'flex-col-reverse': [('flex-direction', 'column-reverse')]}),
+    (71, {'flex-wrap': [('flex-wrap', 'wrap')], 'flex-nowrap': [('flex-wrap', 'nowrap')]}),
+    (72, {'items-start': [('align-items', 'flex-start')], 'items-end': [('align-items', 'flex-end')],
+          'items-center': [('align-items', 'center')], 'items-baseline': [('align-items', 'baseline')],
+          'items-stretch': [('align-items', 'stretch')]}),
+    (73, {'justify-start': [('justify-content', 'flex-start')], 'justify-end': [('justify-content', 'flex-end')],
+          'justify-center': [('justify-content', 'center')], 'justify-between': [('justify-content', 'space-between')],
+          'justify-around': [('justify-content', 'space-around')]}),
+    (80, {'overflow-hidden': [('overflow', 'hidden')], 'overflow-auto': [('overflow', 'auto')],
+          'overflow-x-auto': [('overflow-x', 'auto')]}),
+    (81, {'truncate': [('overflow', 'hidden'), ('text-overflow', 'ellipsis'), ('white-space', 'nowrap')]}),
+    (87, {'border': [('border-width', '1px')], 'border-0': [('border-width', '0px')], 'border-2': [('border-width', '2px')],
+          'border-t': [('border-top-width', '1px')], 'border-b': [('border-bottom-width', '1px')]}),
+    (93, {'bg-cover': [('background-size', 'cover')], 'bg-contain': [('background-size', 'contain')]}),
+    (94, {'bg-center': [('background-position', 'center')], 'bg-top': [('background-position', 'top')]}),
+    (95, {'bg-no-repeat': [('background-repeat', 'no-repeat')]}),
+    (96, {'object-cover': [('object-fit', 'cover')], 'object-contain': [('object-fit', 'contain')]}),
+    (110, {'text-left': [('text-align', 'left')], 'text-center': [('text-align', 'center')],
+           'text-right': [('text-align', 'right')], 'text-justify': [('text-align', 'justify')]}),
+    (113, {'italic': [('font-style', 'italic')], 'not-italic': [('font-style', 'normal')]}),
+    (115, {'uppercase': [('text-transform', 'uppercase')], 'capitalize': [('text-transform', 'capitalize')]}),
+    (118, {'underline': [('text-decoration-line', 'underline')], 'no-underline': [('text-decoration-line', 'none')],
+           'line-through': [('text-decoration-line', 'line-through')]}),
+    (140, {'ease-linear': [('transition-timing-function', 'linear')], 'ease-in': [('transition-timing-function', 'cubic-bezier(0.4, 0, 1, 1)')],
+           'ease-out': [('transition-timing-function', 'cubic-bezier(0, 0, 0.2, 1)')], 'ease-in-out': [('transition-timing-function', EASE)]}),
+]
+_STATIC = {name: (order, decls) for order, table in STATIC_UTILITIES for name, decls in table.items()}
+
+
+def _resolve_dynamic(name):
+    """Returns (order, declarations, child_selector) for parameterised utilities, or None."""
+    negative = name.startswith('-')
+    body = name[1:] if negative else name
+
+    def neg(value):
+        return f"-{value}" if negative and value not in ('0px', 'auto') else value
+
+    match = re.fullmatch(r'(inset|inset-x|inset-y|top|right|bottom|left)-(.+)', body)
+    if match:
+        value = _spacing(match.group(2), allow_auto=True, extra=FRACTIONS)
+        if value is None:
+            return None
+        props = {'inset': ['inset'], 'inset-x': ['left', 'right'], 'inset-y': ['top', 'bottom']}.get(match.group(1), [match.group(1)])
+        return 11, [(prop, neg(value)) for prop in props], None
+
+    match = re.fullmatch(r'z-(\d+|auto)', body)
+    if match:
+        return 12, [('z-index', match.group(1))], None
+
+    match = re.fullmatch(r'(m|mx|my|mt|mr|mb|ml)-(.+)', body)
+    if match:
+        value = _spacing(match.group(2), allow_auto=True)
+        if value is None:
+            return None
+        kind = match.group(1)
+        props = {'m': ['margin'], 'mx': ['margin-left', 'margin-right'], 'my': ['margin-top', 'margin-bottom'],
+                 'mt': ['margin-top'], 'mr': ['margin-right'], 'mb': ['margin-bottom'], 'ml': ['margin-left']}[kind]
+        order = {'m': 20, 'mx': 21, 'my': 21}.get(kind, 22)
+        return order, [(prop, neg(value)) for prop in props], None
+
+    if negative:
+        return None
+
+    match = re.fullmatch(r'(h|min-h|max-h|w|min-w|max-w)-(.+)', body)
+    if match:
+        kind, raw = match.groups()
+        if kind == 'max-w':
+            value = MAX_WIDTHS.get(raw) or _arbitrary(raw)
+        elif kind in ('min-h', 'min-w', 'max-h'):
+            value = {'0': '0px', 'full': '100%', 'screen': '100vh' if kind != 'min-w' else '100vw'}.get(raw) or _arbitrary(raw)
+        else:
+            extra = dict(FRACTIONS, screen='100vh' if kind == 'h' else '100vw', fit='fit-content')
+            value = _spacing(raw, allow_auto=True, extra=extra)
+        if value is None:
+            return None
+        prop = {'h': 'height', 'min-h': 'min-height', 'max-h': 'max-height',
+                'w': 'width', 'min-w': 'min-width', 'max-w': 'max-width'}[kind]
+        return {'h': 45, 'max-h': 46, 'min-h': 47, 'w': 48, 'min-w': 49, 'max-w': 50}[kind], [(prop, value)], None
+
+    match = re.fullmatch(r'scale-(\d+)', body)
+    if match:
+        value = f"{int(match.group(1)) / 100:g}"
+        return 59, [('--tw-scale-x', value), ('--tw-scale-y', value), ('transform', TRANSFORM)], None
+
+    match = re.fullmatch(r'grid-cols-(\d+|none)', body)
+    if match:
+        value = 'none' if match.group(1) == 'none' else f"repeat({match.group(1)}, minmax(0, 1fr))"
+        return 66, [('grid-template-columns', value)], None
+
+    match = re.fullmatch(r'gap-(x-|y-)?(.+)', body)
+    if match:
+        value = _spacing(match.group(2))
+        if value is None:
+            return None
+        prop = {'x-': 'column-gap', 'y-': 'row-gap'}.get(match.group(1), 'gap')
+        return 75, [(prop, value)], None
+
+    match = re.fullmatch(r'space-(x|y)-(.+)', body)
+    if match:
+        value = _spacing(match.group(2))
+        if value is None:
+            return None
+        axis = match.group(1)
+        start, end = ('left', 'right') if axis == 'x' else ('top', 'bottom')
+        reverse = f"--tw-space-{axis}-reverse"
+        decls = [(reverse, '0'), (f"margin-{end}", f"calc({value} * var({reverse}))"),
+                 (f"margin-{start}", f"calc({value} * calc(1 - var({reverse})))")]
+        return 76, decls, ' > :not([hidden]) ~ :not([hidden])'
+
+    match = re.fullmatch(r'rounded(?:-(.+))?', body)
+    if match:
+        value = RADII.get(match.group(1) or '') or _arbitrary(match.group(1) or '')
+        return (85, [('border-radius', value)], None) if value else None
+
+    match = re.fullmatch(r'border-(.+)', body)
+    if match:
+        color = _color(match.group(1))
+        if color:
+            return 88, _color_declarations('border-color', '--tw-border-opacity', color), None
+        return None
+
+    match = re.fullmatch(r'bg-opacity-(\d+)', body)
+    if match and match.group(1) in OPACITIES:
+        return 91, [('--tw-bg-opacity', OPACITIES[match.group(1)])], None
+
+    match = re.fullmatch(r'bg-(.+)', body)
+    if match:
+        color = _color(match.group(1))
+        if color:
+            return 90, _color_declarations('background-color', '--tw-bg-opacity', color), None
+        return None
+
+    match = re.fullmatch(r'(p|px|py|pt|pr|pb|pl)-(.+)', body)
+    if match:
+        value = _spacing(match.group(2))
+        if value is None:
+            return None
+        kind = match.group(1)
+        props = {'p': ['padding'], 'px': ['padding-left', 'padding-right'], 'py': ['padding-top', 'padding-bottom'],
+                 'pt': ['padding-top'], 'pr': ['padding-right'], 'pb': ['padding-bottom'], 'pl': ['padding-left']}[kind]
+        order = {'p': 100, 'px': 101, 'py': 101}.get(kind, 102)
+        return order, [(prop, value) for prop in props], None
+
+    match = re.fullmatch(r'text-(.+)', body)
+    if match:
+        raw = match.group(1)
+        if raw in FONT_SIZES:
+            size, line_height = FONT_SIZES[raw]
+            return 111, [('font-size', size), ('line-height', line_height)], None
+        arbitrary = _arbitrary(raw)
+        if arbitrary is not None and _is_length(arbitrary):
+            return 111, [('font-size', arbitrary)], None
+        color = _color(raw)
+        if color:
+            return 116, _color_declarations('color', '--tw-text-opacity', color), None
+        return None
+
+    match = re.fullmatch(r'text-opacity-(\d+)', body)
+    if match and match.group(1) in OPACITIES:
+        return 117, [('--tw-text-opacity', OPACITIES[match.group(1)])], None
+
+    match = re.fullmatch(r'font-(.+)', body)
+    if match and match.group(1) in FONT_WEIGHTS:
+        return 112, [('font-weight', FONT_WEIGHTS[match.group(1)])], None
+
+    match = re.fullmatch(r'leading-(.+)', body)
+    if match:
+        value = LINE_HEIGHTS.get(match.group(1)) or _spacing(match.group(1))
+        return (114, [('line-height', value)], None) if value else None
+
+    match = re.fullmatch(r'opacity-(\d+)', body)
+    if match and match.group(1) in OPACITIES:
+        return 120, [('opacity', OPACITIES[match.group(1)])], None
+
+    match = re.fullmatch(r'shadow(?:-(.+))?', body)
+    if match and (match.group(1) or '') in SHADOWS:
+        value = SHADOWS[match.group(1) or '']
+        colored = re.sub(r'rgb\([^)]*\)', 'var(--tw-shadow-color)', value)
+        return 121, [('--tw-shadow', value), ('--tw-shadow-colored', colored),
+                     ('box-shadow', 'var(--tw-ring-offset-shadow, 0 0 #0000), var(--tw-ring-shadow, 0 0 #0000), var(--tw-shadow)')], None
+
+    match = re.fullmatch(r'ring-(.+)', body)
+    if match:
+        color = _color(match.group(1))
+        if color:
+            return 125, _color_declarations('--tw-ring-color', '--tw-ring-opacity', color), None
+        return None
+
+    match = re.fullmatch(r'transition(?:-(.+))?', body)
+    if match and (match.group(1) or '') in TRANSITION_PROPERTIES:
+        return 130, [('transition-property', TRANSITION_PROPERTIES[match.group(1) or '']),
+                     ('transition-timing-function', EASE), ('transition-duration', '150ms')], None
+
+    match = re.fullmatch(r'duration-(\d+)', body)
+    if match:
+        return 135, [('transition-duration', f"{match.group(1)}ms")], None
+
+    return None
+
+
+def resolve_utility(name):
+    """Utility name without variants -> (order, declarations, child selector), or None if unknown."""
+    if name in _STATIC:
+        order, decls = _STATIC[name]
+        return order, decls, None
+    return _resolve_dynamic(name)
+
+
+def split_variants(candidate):
+    """'md:hover:text-[#fff]' -> (['md', 'hover'], 'text-[#fff]'); colons inside [...] are kept."""
+    parts, depth, current = [], 0, ''
+    for char in candidate:
+        if char == '[':
+            depth += 1
+        elif char == ']':
+            depth -= 1
+        if char == ':' and depth == 0:
+            parts.append(current)
+            current = ''
+        else:
+            current += char
+    return parts, current
+
+
+def escape_class(name):
+    """CSS-escapes a class name for use in a selector (md:w-auto -> md\\:w-auto)."""
+    escaped = re.sub(r'([^a-zA-Z0-9_-])', r'\\\1', name)
+    return '\\3' + escaped[0] + ' ' + escaped[1:] if escaped[0].isdigit() else escaped
+
+
+# --- Scanning and generation ---
+def scan_candidates(base_dir=BASE_DIR, content_globs=CONTENT_GLOBS):
+    """Returns (every candidate token, tokens that appear inside class attributes)."""
+    candidates, class_names = set(), set()
+    for pattern in content_globs:
+        for path in sorted(glob.glob(os.path.join(base_dir, pattern), recursive=True)):
+            with open(path, encoding='utf-8') as f:
+                text = f.read()
+            candidates.update(CANDIDATE_PATTERN.findall(text))
+            for match in CLASS_ATTRIBUTE_PATTERN.finditer(text):
+                class_names.update(match.group(2).split())
+    return candidates, class_names
+
+
+def generate_utilities(candidates, class_names=()):
+    """Returns (css, used classes, unsupported utility-like classes found in class_names)."""
+    rules = []  # (screen index, pseudo index, order, class name, css rule): variants sort after plain utilities
+    used, unsupported = set(), set()
+    screens = list(SCREENS)
+    pseudo_names = list(PSEUDO_VARIANTS)
+    for candidate in candidates:
+        variants, name = split_variants(candidate)
+        screen = [v for v in variants if v in SCREENS]
+        pseudo = [v for v in variants if v in PSEUDO_VARIANTS]
+        if len(screen) > 1 or len(screen) + len(pseudo) != len(variants):
+            continue
+        resolved = resolve_utility(name)
+        if resolved is None:
+            if candidate in class_names and UTILITY_LIKE.match(candidate):
+                unsupported.add(candidate)
+            continue
+        order, decls, child = resolved
+        selector = '.' + escape_class(candidate) + ''.join(PSEUDO_VARIANTS[p] for p in pseudo) + (child or '')
+        body = ';'.join(f"{prop}:{value}" for prop, value in decls)
+        screen_index = screens.index(screen[0]) + 1 if screen else 0
+        pseudo_index = max((pseudo_names.index(p) + 1 for p in pseudo), default=0)
+        rules.append((screen_index, pseudo_index, order, candidate, f"{selector}{{{body}}}"))
+        used.add(candidate)
+
+    rules.sort()
+    css = []
+    for screen_index in sorted({r[0] for r in rules}):
+        block = ''.join(r[4] for r in rules if r[0] == screen_index)
+        if screen_index == 0:
+            css.append(block)
+        else:
+            css.append(f"@media (min-width:{SCREENS[screens[screen_index - 1]]}){{{block}}}")
+    return ''.join(css), used, unsupported
+
+
+def minify_css(css):
+    """Strips comments and insignificant whitespace (no string-aware rewriting needed for our sources)."""
+    css = re.sub(r'/\*.*?\*/', '', css, flags=re.S)
+    css = re.sub(r'\s+', ' ', css)
+    css = re.sub(r'\s*([{};,>])\s*', r'\1', css)
+    css = re.sub(r':\s+', ':', css)
+    css = css.replace(';}', '}')
+    return css.strip()
+
+
+def build_stylesheet(base_dir=BASE_DIR):
+    """Returns (css text, used classes, unsupported classes)."""
+    sources = []
+    for relative in SOURCE_STYLESHEETS:
+        with open(os.path.join(base_dir, relative), encoding='utf-8') as f:
+            sources.append(f.read())
+    utilities, used, unsupported = generate_utilities(*scan_candidates(base_dir))
+    css = minify_css(PREFLIGHT + '\n'.join(sources)) + utilities
+    header = '/* Generated by build_css.py from templates/ and ' + ', '.join(SOURCE_STYLESHEETS) + ' -- do not edit */\n'
+    return header + css + '\n', used, unsupported
+
+
+def build(output_path=OUTPUT_PATH, base_dir=BASE_DIR):
+    css, used, unsupported = build_stylesheet(base_dir)
+    with open(output_path, 'w', encoding='utf-8') as f:
+        f.write(css)
+    print(f"Wrote {output_path}: {len(used)} utilities, {len(css.encode())} bytes")
+    if unsupported:
+        print("Classes that look like Tailwind utilities but are not supported by build_css.py: " + ', '.join(sorted(unsupported)))
+    return css
+
+
+def check(output_path=OUTPUT_PATH, base_dir=BASE_DIR):
+    css, _, _ = build_stylesheet(base_dir)
+    try:
+        with open(output_path, encoding='utf-8') as f:
+            current = f.read()
+    except OSError:
+        current = None
+    if current != css:
+        print(f"{output_path} is out of date; run python build_css.py")
+        return False
+    print(f"{output_path} is up to date.")
+    return True
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the site stylesheet with only the Tailwind utilities the templates use.")
+    parser.add_argument('--check', action='store_true', help="Verify site.css is current instead of writing it")
+    args = parser.parse_args()
+    if args.check:
+        sys.exit(0 if check() else 1)
+    build()
@@ -0,0 +1,208 @@
+"""
+Icon and web-font build step (replaces the Font Awesome and Google Fonts stylesheets).
+
+Icons: finds every {{ icon('name') }} used in templates/ and writes just those icons as <symbol>s
+into templates/partials/icon_sprite.svg, which base.html inlines once per page. Icons are read
+from the vendored SVGs in assets/icons/fontawesome/<style>/ (Font Awesome Free, CC BY 4.0).
+To use a new icon, copy its SVG there from the Font Awesome Free download and rerun this script.
+
+Fonts: subsets the vendored Inter files in assets/fonts/ to the characters the site can show
+(Latin-1 plus typographic punctuation plus any other character found in templates/), writes
+static/fonts/inter-<weight>.woff2 and a static/fonts/fonts.json manifest. services/web_fonts.py
+turns the manifest into @font-face rules and preload hints; without it the Google Fonts
+stylesheet is used as before. Either static files (Inter-Regular.ttf, Inter-SemiBold.ttf,
+Inter-Bold.ttf) or the variable font (InterVariable.ttf / Inter[opsz,wght].ttf) from the Inter
+release (SIL Open Font License 1.1; vendor its LICENSE.txt alongside) can be vendored.
+
+Everything runs offline. Font subsetting needs fontTools and brotli at build time
+(pip install fonttools brotli). Commit the generated sprite, fonts and manifest: the
+buildCommand in vercel.json does not run this script.
+
+Usage:
+    python build_fonts.py          # icon sprite and fonts
+    python build_fonts.py --icons  # icon sprite only
+    python build_fonts.py --fonts  # fonts only; exit 1 if no Inter files are vendored
+"""
+import argparse
+import glob
+import json
+import os
+import re
+import sys
+from xml.etree import ElementTree
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+TEMPLATE_GLOB = os.path.join(BASE_DIR, 'templates', '**', '*.html')
+ICON_SOURCE_DIR = os.path.join(BASE_DIR, 'assets', 'icons', 'fontawesome')
+ICON_STYLES = ('solid', 'regular', 'brands')  # Lookup order when a name exists in several styles
+SPRITE_PATH = os.path.join(BASE_DIR, 'templates', 'partials', 'icon_sprite.svg')
+
+FONT_SOURCE_DIR = os.path.join(BASE_DIR, 'assets', 'fonts')
+FONT_OUTPUT_DIR = os.path.join(BASE_DIR, 'static', 'fonts')
+FONT_MANIFEST = 'fonts.json'
+FONT_FAMILY = 'Inter'
+# Weights used by the site (base.css and the font-semibold/font-bold utilities), with their static file names
+FONT_WEIGHTS = {400: 'Inter-Regular', 600: 'Inter-SemiBold', 700: 'Inter-Bold'}
+VARIABLE_FONT_NAMES = ('InterVariable', 'Inter[opsz,wght]', 'Inter-VariableFont_opsz,wght')
+FONT_EXTENSIONS = ('.ttf', '.otf', '.woff2', '.woff')
+
+# Characters always kept: printable ASCII, Latin-1 (names, addresses, accents) and typographic punctuation.
+# Product names, reviews and customer details come from Firestore, so templates alone are not enough.
+BASE_CODEPOINTS = set(range(0x20, 0x7F)) | set(range(0xA0, 0x100)) | {
+    0x2013, 0x2014, 0x2018, 0x2019, 0x201C, 0x201D, 0x2022, 0x2026, 0x20AC, 0x2122, 0x2192,
+}
+
+ICON_CALL_PATTERN = re.compile(r"""\bicon\(\s*['"]([a-z0-9-]+)['"]""")
+LEGACY_ICON_PATTERN = re.compile(r'\bfa-([a-z0-9-]+)')
+SVG_NS = 'http://www.w3.org/2000/svg'
+
+
+def _template_texts():
+    for path in sorted(glob.glob(TEMPLATE_GLOB, recursive=True)):
+        if os.path.abspath(path) == SPRITE_PATH:
+            continue
+        with open(path, encoding='utf-8') as f:
+            yield path, f.read()
+
+
+# --- Icons ---
+def find_icon_names():
+    names, legacy = set(), set()
+    for path, text in _template_texts():
+        names.update(ICON_CALL_PATTERN.findall(text))
+        legacy.update(f"{os.path.relpath(path, BASE_DIR)}: fa-{name}" for name in LEGACY_ICON_PATTERN.findall(text))
+    return names, legacy
+
+
+def load_icon(name):
+    """Returns (viewBox, inner SVG markup) for a vendored icon."""
+    for style in ICON_STYLES:
+        path = os.path.join(ICON_SOURCE_DIR, style, f"{name}.svg")
+        if os.path.exists(path):
+            root = ElementTree.parse(path).getroot()
+            shapes = ''.join(
+                ElementTree.tostring(child, encoding='unicode').replace(f' xmlns:ns0="{SVG_NS}"', '').replace('ns0:', '')
+                for child in root if isinstance(child.tag, str)  # Comments (license banner) are skipped
+            )
+            return root.get('viewBox'), shapes
+    raise FileNotFoundError(f"Icon '{name}' is not vendored; copy its SVG into {ICON_SOURCE_DIR}/<style>/")
+
+
+def build_icon_sprite():
+    names, legacy = find_icon_names()
+    symbols = []
+    for name in sorted(names):
+        view_box, shapes = load_icon(name)
+        symbols.append(f'<symbol id="icon-{name}" viewBox="{view_box}">{shapes}</symbol>')
+    sprite = ('{# Generated by build_fonts.py from assets/icons (Font Awesome Free, CC BY 4.0) -- do not edit #}\n'
+              f'<svg xmlns="{SVG_NS}" style="display:none" aria-hidden="true">{"".join(symbols)}</svg>\n')
+    os.makedirs(os.path.dirname(SPRITE_PATH), exist_ok=True)
+    with open(SPRITE_PATH, 'w', encoding='utf-8') as f:
+        f.write(sprite)
+    print(f"Wrote {SPRITE_PATH}: {len(symbols)} icons, {len(sprite.encode())} bytes")
+    if legacy:
+        print("Font Awesome classes still in templates (use {{ icon('name') }} instead): " + ', '.join(sorted(legacy)))
+    return sorted(names)
+
+
+# --- Fonts ---
+def template_codepoints():
+    codepoints = set()
+    for _, text in _template_texts():
+        codepoints.update(ord(char) for char in text if ord(char) >= 0x20)
+    return codepoints
+
+
+def unicode_range(codepoints):
+    """{0x20, 0x21, 0x22, 0x41} -> 'U+20-22,U+41'"""
+    ranges = []
+    for cp in sorted(codepoints):
+        if ranges and cp == ranges[-1][1] + 1:
+            ranges[-1][1] = cp
+        else:
+            ranges.append([cp, cp])
+    return ','.join(f"U+{start:X}" if start == end else f"U+{start:X}-{end:X}" for start, end in ranges)
+
+
+def _find_font_source(names):
+    for name in names:
+        for ext in FONT_EXTENSIONS:
+            path = os.path.join(FONT_SOURCE_DIR, name + ext)
+            if os.path.exists(path):
+                return path
+    return None
+
+
+def _load_face(weight, TTFont, instancer):
+    """Opens the vendored font for a weight: its static file, or the variable font pinned to that weight."""
+    static_path = _find_font_source([FONT_WEIGHTS[weight]])
+    if static_path:
+        return TTFont(static_path), static_path
+    variable_path = _find_font_source(VARIABLE_FONT_NAMES)
+    if variable_path:
+        font = TTFont(variable_path)
+        axes = {axis.axisTag: None for axis in font['fvar'].axes}  # None pins every other axis to its default
+        axes['wght'] = weight
+        return instancer.instantiateVariableFont(font, axes), variable_path
+    return None, None
+
+
+def build_fonts():
+    try:
+        from fontTools.subset import Options, Subsetter
+        from fontTools.ttLib import TTFont
+        from fontTools.varLib import instancer
+    except ImportError:
+        print("Skipping font subsetting: fontTools is not installed (pip install fonttools brotli).")
+        return None
+
+    wanted = BASE_CODEPOINTS | template_codepoints()
+    faces, covered = [], set()
+    os.makedirs(FONT_OUTPUT_DIR, exist_ok=True)
+    for weight in sorted(FONT_WEIGHTS):
+        font, source = _load_face(weight, TTFont, instancer)
+        if font is None:
+            print(f"No vendored {FONT_FAMILY} {weight} in {FONT_SOURCE_DIR}; skipping that weight.")
+            continue
+        available = set(font.getBestCmap())
+        options = Options()
+        options.flavor = 'woff2'
+        options.layout_features = ['kern', 'liga', 'calt', 'ccmp', 'locl', 'mark', 'mkmk']
+        options.hinting = False  # Hinting is ignored by modern browsers and is a large share of the file
+        options.desubroutinize = True  # Compresses better under WOFF2's brotli
+        subsetter = Subsetter(options)
+        subsetter.populate(unicodes=wanted & available)
+        subsetter.subset(font)
+
+        filename = f"{FONT_FAMILY.lower()}-{weight}.woff2"
+        output_path = os.path.join(FONT_OUTPUT_DIR, filename)
+        font.flavor = 'woff2'
+        font.save(output_path)
+        covered |= wanted & available
+        faces.append({'weight': weight, 'style': 'normal', 'file': f"fonts/{filename}"})
+        print(f"Wrote {output_path} from {os.path.basename(source)}: {len(wanted & available)} characters, "
+              f"{os.path.getsize(output_path)} bytes")
+
+    if not faces:
+        print(f"No {FONT_FAMILY} files vendored in {FONT_SOURCE_DIR}; pages keep using the Google Fonts stylesheet.")
+        return None
+
+    manifest = {'family': FONT_FAMILY, 'unicode_range': unicode_range(covered), 'faces': faces}
+    with open(os.path.join(FONT_OUTPUT_DIR, FONT_MANIFEST), 'w') as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    return manifest
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build the icon sprite and subsetted self-hosted fonts.")
+    parser.add_argument('--icons', action='store_true', help="Only rebuild templates/partials/icon_sprite.svg")
+    parser.add_argument('--fonts', action='store_true', help="Only rebuild static/fonts (fails if nothing is vendored)")
+    args = parser.parse_args()
+    everything = not (args.icons or args.fonts)
+    if args.icons or everything:
+        try:
+            build_icon_sprite()
+        except FileNotFoundError as e:
+            sys.exit(str(e))
+    if (args.fonts or everything) and build_fonts() is None and args.fonts:
+        sys.exit(1)
@@ -0,0 +1,211 @@
+"""
+Responsive image build step.
+
+Turns every JPEG/PNG under static/images/ into resized derivatives in static/derived/:
+AVIF, WebP and JPEG at each of WIDTHS (never upscaled), plus a tiny blurred placeholder
+that is inlined as a data: URI. static/derived/images.json records, per source image, its
+intrinsic size, placeholder and variant list; services/responsive_images.py reads it to
+render <picture> elements with srcset/sizes.
+
+Derivatives are named after the source's content hash, so a rebuild only re-encodes images
+whose bytes changed and removes derivatives of deleted/changed sources.
+
+Usage:
+    python build_images.py          # update static/derived (incremental)
+    python build_images.py --force  # re-encode everything
+    python build_images.py --clean  # remove static/derived (templates fall back to the originals)
+
+Run it before build_static.py so the derivatives are fingerprinted along with everything else.
+Needs Pillow (pip install Pillow) at build time only; AVIF output needs a Pillow built with
+libavif (Pillow >= 11.3 wheels) and is skipped otherwise.
+
+static/derived/ is not committed: the buildCommand in vercel.json runs this script (with
+requirements-build.txt installed) ahead of build_static.py on every deployment.
+"""
+import argparse
+import base64
+import concurrent.futures
+import hashlib
+import io
+import json
+import os
+import shutil
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+SOURCE_DIRNAME = 'images'
+DERIVED_DIRNAME = 'derived'
+MANIFEST_NAME = 'images.json'
+HASH_LENGTH = 12
+
+WIDTHS = (320, 480, 640, 960, 1280)
+SOURCE_EXTENSIONS = {'.jpg', '.jpeg', '.png'}
+PLACEHOLDER_WIDTH = 16
+
+# Encoder settings per output format: (Pillow format name, file extension, save options)
+FORMATS = {
+    'avif': ('AVIF', '.avif', {'quality': 50, 'speed': 6}),
+    'webp': ('WEBP', '.webp', {'quality': 75, 'method': 6}),
+    'jpeg': ('JPEG', '.jpg', {'quality': 78, 'optimize': True, 'progressive': True}),
+}
+
+
+def _require_pillow():
+    try:
+        from PIL import Image, ImageFilter, ImageOps, features
+    except ImportError:
+        raise SystemExit("build_images.py needs Pillow: pip install Pillow")
+    return Image, ImageFilter, ImageOps, features
+
+
+def source_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def target_widths(source_width):
+    """WIDTHS smaller than the source, topped with the source width (capped at the largest WIDTH). Never upscales."""
+    widths = {w for w in WIDTHS if w < source_width}
+    widths.add(min(source_width, WIDTHS[-1]))
+    return sorted(widths)
+
+
+def derived_name(logical_path, digest, width, ext):
+    """images/image1.jpg -> derived/images/image1.<hash>.640w.webp"""
+    directory, filename = os.path.split(logical_path)
+    stem = os.path.splitext(filename)[0]
+    return '/'.join(part for part in (DERIVED_DIRNAME, directory, f"{stem}.{digest}.{width}w{ext}") if part)
+
+
+def make_placeholder(image, Image, ImageFilter):
+    """Blurred JPEG of well under 1KB, inlined as a data: URI and shown while the real image loads."""
+    height = max(1, round(image.height * PLACEHOLDER_WIDTH / image.width))
+    tiny = image.resize((PLACEHOLDER_WIDTH, height), Image.LANCZOS).filter(ImageFilter.GaussianBlur(1))
+    buffer = io.BytesIO()
+    tiny.save(buffer, 'JPEG', quality=40)
+    return 'data:image/jpeg;base64,' + base64.b64encode(buffer.getvalue()).decode('ascii')
+
+
+def collect_sources(static_dir):
+    source_root = os.path.join(static_dir, SOURCE_DIRNAME)
+    sources = []
+    for root, dirs, files in os.walk(source_root):
+        dirs.sort()
+        for filename in sorted(files):
+            if os.path.splitext(filename)[1].lower() in SOURCE_EXTENSIONS:
+                sources.append(os.path.relpath(os.path.join(root, filename), static_dir).replace(os.sep, '/'))
+    return sources
+
+
+def load_manifest(static_dir):
+    path = os.path.join(static_dir, DERIVED_DIRNAME, MANIFEST_NAME)
+    try:
+        with open(path) as f:
+            return json.load(f)['images']
+    except (OSError, ValueError, KeyError):
+        return {}
+
+
+def _entry_files(entry):
+    return [path for variants in entry['variants'].values() for _, path in variants]
+
+
+def _is_current(entry, digest, formats, static_dir):
+    if not entry or entry.get('hash') != digest or set(entry.get('variants', {})) != set(formats):
+        return False
+    return all(os.path.exists(os.path.join(static_dir, path)) for path in _entry_files(entry))
+
+
+def process_image(logical_path, data, digest, formats, static_dir):
+    Image, ImageFilter, ImageOps, _ = _require_pillow()
+    with Image.open(io.BytesIO(data)) as opened:
+        image = ImageOps.exif_transpose(opened)  # Phone photos are often stored rotated
+        image = image.convert('RGB')
+
+    entry = {
+        'hash': digest,
+        'width': image.width,
+        'height': image.height,
+        'placeholder': make_placeholder(image, Image, ImageFilter),
+        'variants': {fmt: [] for fmt in formats},
+    }
+    for width in target_widths(image.width):
+        height = max(1, round(image.height * width / image.width))
+        resized = image if width == image.width else image.resize((width, height), Image.LANCZOS)
+        for fmt in formats:
+            pil_format, ext, options = FORMATS[fmt]
+            output = derived_name(logical_path, digest, width, ext)
+            output_path = os.path.join(static_dir, output)
+            os.makedirs(os.path.dirname(output_path), exist_ok=True)
+            resized.save(output_path, pil_format, **options)
+            entry['variants'][fmt].append([width, output])
+    return entry
+
+
+def build(static_dir=STATIC_DIR, force=False, jobs=None):
+    """Updates static/derived and returns the manifest ({logical path: entry})."""
+    _, _, _, features = _require_pillow()
+    formats = [fmt for fmt in FORMATS if fmt != 'avif' or features.check('avif')]
+    derived_dir = os.path.join(static_dir, DERIVED_DIRNAME)
+    os.makedirs(derived_dir, exist_ok=True)
+
+    previous = {} if force else load_manifest(static_dir)
+    manifest = {}
+    pending = {}
+    for logical_path in collect_sources(static_dir):
+        with open(os.path.join(static_dir, logical_path), 'rb') as f:
+            data = f.read()
+        digest = source_hash(data)
+        if _is_current(previous.get(logical_path), digest, formats, static_dir):
+            manifest[logical_path] = previous[logical_path]
+        else:
+            pending[logical_path] = (data, digest)
+
+    # Encoding (AVIF especially) is CPU-bound, so changed images are spread over all cores
+    encoded = 0
+    with concurrent.futures.ProcessPoolExecutor(max_workers=jobs) as pool:
+        futures = {pool.submit(process_image, path, data, digest, formats, static_dir): path
+                   for path, (data, digest) in pending.items()}
+        for future in concurrent.futures.as_completed(futures):
+            logical_path = futures[future]
+            try:
+                manifest[logical_path] = future.result()
+                encoded += 1
+            except Exception as e:
+                print(f"Skipping {logical_path}: {e} 😞")
+    reused = len(manifest) - encoded
+
+    # Drop derivatives that no current source refers to (deleted or changed images)
+    keep = {os.path.normpath(os.path.join(static_dir, path)) for entry in manifest.values() for path in _entry_files(entry)}
+    removed = 0
+    for root, _, files in os.walk(derived_dir):
+        for filename in files:
+            path = os.path.normpath(os.path.join(root, filename))
+            if filename != MANIFEST_NAME and path not in keep:
+                os.remove(path)
+                removed += 1
+
+    with open(os.path.join(derived_dir, MANIFEST_NAME), 'w') as f:
+        json.dump({'formats': formats, 'images': manifest}, f, indent=2, sort_keys=True)
+
+    print(f"Processed {len(manifest)} images ({encoded} encoded, {reused} unchanged, {removed} stale files removed) into {derived_dir}")
+    if 'avif' not in formats:
+        print("Note: this Pillow build has no AVIF support; only WebP and JPEG derivatives were written.")
+    return manifest
+
+
+def clean(static_dir=STATIC_DIR):
+    derived_dir = os.path.join(static_dir, DERIVED_DIRNAME)
+    if os.path.isdir(derived_dir):
+        shutil.rmtree(derived_dir)
+        print(f"Removed {derived_dir}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Build resized AVIF/WebP/JPEG derivatives of static/images.")
+    parser.add_argument('--force', action='store_true', help="Re-encode every image, ignoring the cache")
+    parser.add_argument('--jobs', type=int, default=None, help="Parallel encoder processes (default: one per CPU)")
+    parser.add_argument('--clean', action='store_true', help="Remove the build output instead of building")
+    args = parser.parse_args()
+    if args.clean:
+        clean()
+    else:
+        build(force=args.force, jobs=args.jobs)
@@ -0,0 +1,175 @@
+"""
+Static asset build step.
+
+Copies every file under static/ into static/dist/ with a content hash in its name
+(e.g. style.css -> dist/style.3f2a1b9c0d4e.css), writes gzip and brotli variants of
+text assets, and records the mapping in static/dist/manifest.json. At runtime
+services/static_assets.py makes url_for('static', ...) resolve through that manifest and
+serves the hashed files with immutable, one-year caching.
+
+Byte-identical files are stored once, so every name that points at the same bytes
+shares one cached URL.
+
+Usage:
+    python build_static.py          # (re)build static/dist
+    python build_static.py --clean  # remove static/dist (the app falls back to plain /static URLs)
+
+Brotli output needs the optional 'brotli' package (pip install brotli); without it only
+gzip variants are written.
+
+static/dist/ is not committed: Vercel runs this script as part of the buildCommand in
+vercel.json (with requirements-build.txt installed) before bundling the app.
+"""
+import argparse
+import gzip
+import hashlib
+import json
+import os
+import re
+import shutil
+
+STATIC_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'static')
+DIST_DIRNAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+HASH_LENGTH = 12
+
+# Text formats worth precompressing (JPEGs/PNGs are already compressed)
+COMPRESSIBLE_EXTENSIONS = {'.css', '.js', '.svg', '.html', '.json', '.txt', '.xml', '.ico', '.map'}
+MIN_COMPRESS_SIZE = 256  # Bytes; smaller files are not worth a second request variant
+
+CSS_URL_PATTERN = re.compile(r"url\(\s*(['\"]?)(/static/|\.\./|\./)?([^'\")]+)\1\s*\)")
+
+try:
+    import brotli
+except ImportError:
+    brotli = None
+
+
+def content_hash(data):
+    return hashlib.sha256(data).hexdigest()[:HASH_LENGTH]
+
+
+def hashed_name(logical_path, digest):
+    """images/logo.jpg + abc123 -> dist/images/logo.abc123.jpg"""
+    directory, filename = os.path.split(logical_path)
+    stem, ext = os.path.splitext(filename)
+    return '/'.join(part for part in (DIST_DIRNAME, directory, f"{stem}.{digest}{ext}") if part)
+
+
+def rewrite_css_urls(css_text, css_path, manifest):
+    """Points url(...) references in a stylesheet at the hashed files."""
+    css_dir = os.path.dirname(css_path)
+
+    def replace(match):
+        quote, prefix, target = match.groups()
+        if target.startswith(('data:', 'http:', 'https:', '//', '#')):
+            return match.group(0)
+        path, _, suffix = target.partition('?')
+        if prefix == '/static/':
+            logical = path
+        else:
+            logical = os.path.normpath(os.path.join(css_dir, (prefix or '') + path)).replace(os.sep, '/')
+        if logical not in manifest:
+            return match.group(0)
+        # Hashed files all live under /static/dist/, so an absolute URL is always correct
+        return f"url({quote}/static/{manifest[logical]}{quote})"
+
+    return CSS_URL_PATTERN.sub(replace, css_text)
+
+
+def write_compressed_variants(path, data):
+    """Writes path.gz (and path.br when brotli is installed) if they are smaller than the original."""
+    written = []
+    gz = gzip.compress(data, compresslevel=9, mtime=0)  # mtime=0 keeps builds reproducible
+    if len(gz) < len(data):
+        with open(path + '.gz', 'wb') as f:
+            f.write(gz)
+        written.append('gz')
+    if brotli is not None:
+        br = brotli.compress(data, quality=11)
+        if len(br) < len(data):
+            with open(path + '.br', 'wb') as f:
+                f.write(br)
+            written.append('br')
+    return written
+
+
+def collect_sources(static_dir):
+    sources = []
+    for root, dirs, files in os.walk(static_dir):
+        dirs[:] = sorted(d for d in dirs if not (root == static_dir and d == DIST_DIRNAME))
+        for filename in sorted(files):
+            full_path = os.path.join(root, filename)
+            sources.append(os.path.relpath(full_path, static_dir).replace(os.sep, '/'))
+    # Stylesheets last, so the files they reference already have hashed names
+    return sorted(sources, key=lambda p: (p.endswith('.css'), p))
+
+
+def build(static_dir=STATIC_DIR, extra_sources=None):
+    """
+    Builds static/dist and returns the manifest ({logical path: hashed path}).
+    extra_sources maps logical paths to bytes generated by other build steps (not present under static/).
+    """
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+    os.makedirs(dist_dir)
+
+    manifest = {}
+    by_digest = {}  # content hash -> hashed path, for deduplication
+    total_bytes = unique_bytes = 0
+    compressed = 0
+
+    sources = [(p, None) for p in collect_sources(static_dir)]
+    sources += sorted((extra_sources or {}).items())
+    for logical_path, data in sources:
+        if data is None:
+            with open(os.path.join(static_dir, logical_path), 'rb') as f:
+                data = f.read()
+        if logical_path.endswith('.css'):
+            data = rewrite_css_urls(data.decode('utf-8'), logical_path, manifest).encode('utf-8')
+
+        digest = content_hash(data)
+        total_bytes += len(data)
+        if digest in by_digest:
+            manifest[logical_path] = by_digest[digest]
+            continue
+
+        output = hashed_name(logical_path, digest)
+        output_path = os.path.join(static_dir, output)
+        os.makedirs(os.path.dirname(output_path), exist_ok=True)
+        with open(output_path, 'wb') as f:
+            f.write(data)
+        unique_bytes += len(data)
+        if os.path.splitext(logical_path)[1].lower() in COMPRESSIBLE_EXTENSIONS and len(data) >= MIN_COMPRESS_SIZE:
+            if write_compressed_variants(output_path, data):
+                compressed += 1
+
+        by_digest[digest] = output
+        manifest[logical_path] = output
+
+    with open(os.path.join(dist_dir, MANIFEST_NAME), 'w') as f:
+        json.dump({'files': manifest}, f, indent=2, sort_keys=True)
+
+    print(f"Built {len(manifest)} assets ({len(by_digest)} unique, {compressed} precompressed) into {dist_dir}")
+    print(f"Deduplicated {total_bytes - unique_bytes} bytes of identical files.")
+    if brotli is None:
+        print("Note: 'brotli' is not installed; only gzip variants were written.")
+    return manifest
+
+
+def clean(static_dir=STATIC_DIR):
+    dist_dir = os.path.join(static_dir, DIST_DIRNAME)
+    if os.path.isdir(dist_dir):
+        shutil.rmtree(dist_dir)
+        print(f"Removed {dist_dir}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description="Fingerprint and precompress static assets.")
+    parser.add_argument('--clean', action='store_true', help="Remove the build output instead of building")
+    args = parser.parse_args()
+    if args.clean:
+        clean()
+    else:
+        build()
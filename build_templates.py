@@ -0,0 +1,59 @@
+"""
+Template build step: compiles every template in templates/ to Jinja bytecode.
+
+Writes one <key>.cache file per template into jinja_cache/ (or JINJA_BYTECODE_CACHE_DIR).
+At runtime services/template_cache.py points Jinja at that directory, so a fresh worker
+loads compiled templates instead of parsing base.html, checkout.html, ... on its first
+requests. Bytecode is only valid for the Python minor version that built it: build with the
+deployment's Python. A stale or foreign file is ignored and the template recompiled, so a
+mismatch costs speed, never correctness. jinja_cache/ is not committed: the buildCommand in
+vercel.json runs this script last on every deployment.
+
+Usage:
+    python build_templates.py          # rebuild the bytecode cache
+    python build_templates.py --clean  # remove it (templates are compiled on first use again)
+"""
+import argparse
+import glob
+import os
+import shutil
+import sys
+
+BASE_DIR = os.path.dirname(os.path.abspath(__file__))
+DEFAULT_CACHE_DIR = os.path.join(BASE_DIR, 'jinja_cache')
+
+
+def build(cache_dir):
+    os.makedirs(cache_dir, exist_ok=True)
+    for path in glob.glob(os.path.join(cache_dir, '*.cache')):
+        os.remove(path)
+    # The app's environment carries the custom filters that templates are compiled against
+    os.environ['JINJA_BYTECODE_CACHE_DIR'] = cache_dir
+    os.environ['PRECOMPILE_TEMPLATES'] = '0'
+    sys.path.insert(0, BASE_DIR)
+    from app import create_app
+
+    app = create_app()
+    count, elapsed, errors = app.template_cache.precompile()
+    written = glob.glob(os.path.join(cache_dir, '*.cache'))
+    size = sum(os.path.getsize(path) for path in written)
+    print(f"Wrote {len(written)} bytecode files ({size} bytes) to {cache_dir} in {elapsed * 1000:.0f} ms")
+    return errors
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Compile templates/ to Jinja bytecode.")
+    parser.add_argument('--clean', action='store_true', help="Remove the bytecode cache")
+    parser.add_argument('--dir', default=os.environ.get('JINJA_BYTECODE_CACHE_DIR') or DEFAULT_CACHE_DIR)
+    args = parser.parse_args()
+    if args.clean:
+        shutil.rmtree(args.dir, ignore_errors=True)
+        print(f"Removed {args.dir}")
+        return
+    errors = build(args.dir)
+    if errors:
+        sys.exit("Templates with errors:\n  " + '\n  '.join(errors))
+
+
+if __name__ == '__main__':
+    main()
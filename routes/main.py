@@ -1,16 +1,19 @@
 from flask import Blueprint, render_template, url_for, request, flash, current_app, redirect
 import time
 import json # Import json for parsing FIREBASE_CREDENTIALS if needed for direct use in route (though config handles it)
+from services.page_cache import cached_page
 
 main_bp = Blueprint('main', __name__)
 
 @main_bp.route('/')
 @main_bp.route('/home')
+@cached_page()
 def home():
     """Renders the home page."""
     return render_template('home.html')
 
 @main_bp.route('/about')
+@cached_page()
 def about():
     """Renders the about page."""
     return render_template('about.html')
@@ -39,14 +42,7 @@ def contact():
                 f"Subject: {subject}\n\n"
                 f"Message:\n{message}"
             )
-            current_app.send_telegram_notification(
-                order_number=None,
-                cart_items=[],
-                customer_details={},
-                final_total=0,
-                payment_method=None,
-                special_note=telegram_message
-            )
+            current_app.send_general_telegram_message(telegram_message, parse_mode=None)
             flash('Your message has been sent successfully! We will get back to you soon. 🚀', 'success')
             return redirect(url_for('main.contact'))
         except Exception as e:
@@ -98,7 +94,7 @@ def track_order():
                 f"Time: {time.strftime('%I:%M %p SAST, %B %d, %Y')} ⏰\n\n"
                 f"Please follow up! 🚨"
             )
-            current_app.send_telegram_notification(order_number=None, cart_items=[], customer_details={}, final_total=0, payment_method=None, special_note=message)
+            current_app.send_general_telegram_message(message, parse_mode=None)
 
             flash("Request submitted! We’ll get back to you soon. 🚀", 'success')
             return redirect(url_for('main.track_order'))
@@ -113,6 +109,7 @@ def rate_us():
     return render_template('rate_us.html')
 
 @main_bp.route('/store_location')
+@cached_page()
 def store_location():
     """Renders the store location page."""
     return render_template('store_location.html')
@@ -0,0 +1,72 @@
+import time
+from urllib.parse import urlsplit
+import httpx
+
+from services.http_client import CircuitOpenError
+
+# Raised before anything is sent (a bad URL or header from our own config): they say nothing about the upstream's health
+LOCAL_REQUEST_ERRORS = (httpx.UnsupportedProtocol, httpx.InvalidURL, httpx.LocalProtocolError)
+
+
+class AsyncOutboundClient:
+    """
+    OutboundClient for coroutines (the async checkout), on one httpx.AsyncClient.
+
+    httpx keeps a keep-alive pool per host on the event loop, so any number of in-flight calls share
+    max_connections sockets without a thread each. Timeouts match OutboundClient, and circuit breakers
+    and latency histograms come from guards (the app's OutboundClient), so a host has one circuit and
+    one set of /metrics series whichever client called it. The client belongs to the event loop it is
+    first used on (app.event_loop).
+    """
+
+    def __init__(self, guards, connect_timeout=3.05, read_timeout=5.0, max_connections=100):
+        self.guards = guards
+        self._client = httpx.AsyncClient(
+            timeout=httpx.Timeout(read_timeout, connect=connect_timeout),
+            limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+        )
+
+    async def request(self, method, url, **kwargs):
+        """
+        Sends a request through the pooled client.
+        Raises CircuitOpenError without calling out if the host's circuit is open; httpx.HTTPError on failure.
+        """
+        host = urlsplit(url).netloc
+        breaker, stats = self.guards.guard(host)
+        if not breaker.allow_request():
+            with stats._lock:
+                stats.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}; skipping call")
+
+        started = time.perf_counter()
+        try:
+            response = await self._client.request(method, url, **kwargs)
+        except LOCAL_REQUEST_ERRORS:
+            breaker.release_trial()
+            raise
+        except httpx.HTTPError:
+            stats.observe(time.perf_counter() - started, error=True)
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # A bug or a cancelled task is not the upstream's fault, but a half-open trial must still be settled
+            breaker.release_trial()
+            raise
+
+        # 5xx means the upstream is unhealthy; 4xx is our problem and should not trip the breaker
+        upstream_error = response.status_code >= 500
+        stats.observe(time.perf_counter() - started, error=upstream_error or response.status_code >= 400)
+        if upstream_error:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    async def get(self, url, **kwargs):
+        return await self.request('GET', url, **kwargs)
+
+    async def post(self, url, **kwargs):
+        return await self.request('POST', url, **kwargs)
+
+    async def aclose(self):
+        await self._client.aclose()
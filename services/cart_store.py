@@ -0,0 +1,323 @@
+import abc
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+def line_key(item_id, color=None):
+    """Identifies a cart line: the same product in two colors is two lines."""
+    return f"{item_id}|{color or ''}"
+
+
+class CartStore(abc.ABC):
+    """
+    Server-side cart storage keyed by an opaque cart id (the only thing kept in the session cookie).
+
+    Every operation addresses one line by its line_key, so mutations cost the same regardless
+    of cart size. Carts idle for longer than idle_ttl seconds are expired. The method set mirrors
+    a Redis hash per cart (HGETALL / HGET / HSET / HDEL / DEL + EXPIRE), so backends map onto it directly.
+    """
+
+    def __init__(self, idle_ttl=2 * 24 * 3600):
+        self.idle_ttl = idle_ttl
+
+    @abc.abstractmethod
+    def get_items(self, cart_id):
+        """All lines in the cart, in the order they were added."""
+
+    @abc.abstractmethod
+    def get_line(self, cart_id, key):
+        """One line of the cart, or None."""
+
+    @abc.abstractmethod
+    def put_line(self, cart_id, key, line):
+        """Adds the line, or replaces it in place if the cart already has it."""
+
+    @abc.abstractmethod
+    def remove_line(self, cart_id, key):
+        """Removes the line if the cart has it."""
+
+    @abc.abstractmethod
+    def clear(self, cart_id):
+        """Empties the cart."""
+
+    def count(self, cart_id):
+        """Number of lines in the cart."""
+        return len(self.get_items(cart_id))
+
+
+class MemoryCartStore(CartStore):
+    """Process-local store for development and single-worker deployments."""
+
+    def __init__(self, idle_ttl=2 * 24 * 3600, sweep_every=500):
+        super().__init__(idle_ttl)
+        self._carts = OrderedDict()  # cart_id -> (last_used, OrderedDict(line_key -> line)), least recently used first
+        self._lock = threading.Lock()
+        self._ops = 0
+        self._sweep_every = sweep_every
+
+    def _lines(self, cart_id, create=False):
+        now = time.time()
+        entry = self._carts.get(cart_id)
+        if entry is not None and now - entry[0] > self.idle_ttl:
+            del self._carts[cart_id]
+            entry = None
+        if entry is None:
+            if not create:
+                return None
+            entry = (now, OrderedDict())
+        self._carts[cart_id] = (now, entry[1])
+        self._carts.move_to_end(cart_id)
+        self._ops += 1
+        if self._ops % self._sweep_every == 0:
+            self._sweep(now)
+        return entry[1]
+
+    def _sweep(self, now):
+        # Carts are kept in last-used order, so expired ones are at the front
+        while self._carts:
+            cart_id, (last_used, _) = next(iter(self._carts.items()))
+            if now - last_used <= self.idle_ttl:
+                break
+            del self._carts[cart_id]
+
+    def get_items(self, cart_id):
+        with self._lock:
+            lines = self._lines(cart_id)
+            return [dict(line) for line in lines.values()] if lines else []
+
+    def get_line(self, cart_id, key):
+        with self._lock:
+            lines = self._lines(cart_id)
+            line = lines.get(key) if lines else None
+            return dict(line) if line else None
+
+    def put_line(self, cart_id, key, line):
+        with self._lock:
+            self._lines(cart_id, create=True)[key] = dict(line)
+
+    def remove_line(self, cart_id, key):
+        with self._lock:
+            lines = self._lines(cart_id)
+            if lines:
+                lines.pop(key, None)
+
+    def clear(self, cart_id):
+        with self._lock:
+            self._carts.pop(cart_id, None)
+
+    def count(self, cart_id):
+        with self._lock:
+            lines = self._lines(cart_id)
+            return len(lines) if lines else 0
+
+
+class SQLiteCartStore(CartStore):
+    """Carts in a SQLite file, shared by every worker on the host and kept across restarts."""
+
+    def __init__(self, path, idle_ttl=2 * 24 * 3600, sweep_every=500):
+        super().__init__(idle_ttl)
+        self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None)
+        self._conn.execute('PRAGMA journal_mode=WAL')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS carts (cart_id TEXT PRIMARY KEY, last_used REAL NOT NULL)')
+        self._conn.execute('CREATE TABLE IF NOT EXISTS cart_lines (cart_id TEXT NOT NULL, line_key TEXT NOT NULL, '
+                           'data TEXT NOT NULL, PRIMARY KEY (cart_id, line_key))')
+        self._conn.execute('CREATE INDEX IF NOT EXISTS carts_last_used ON carts (last_used)')
+        self._lock = threading.Lock()
+        self._ops = 0
+        self._sweep_every = sweep_every
+
+    def _touch(self, cart_id, now):
+        self._conn.execute('INSERT INTO carts (cart_id, last_used) VALUES (?, ?) '
+                           'ON CONFLICT(cart_id) DO UPDATE SET last_used = excluded.last_used', (cart_id, now))
+        self._ops += 1
+        if self._ops % self._sweep_every == 0:
+            self._sweep(now)
+
+    def _alive(self, cart_id, now):
+        row = self._conn.execute('SELECT last_used FROM carts WHERE cart_id = ?', (cart_id,)).fetchone()
+        if row and now - row[0] > self.idle_ttl:
+            self._delete_cart(cart_id)
+            return False
+        return row is not None
+
+    def _delete_cart(self, cart_id):
+        self._conn.execute('DELETE FROM cart_lines WHERE cart_id = ?', (cart_id,))
+        self._conn.execute('DELETE FROM carts WHERE cart_id = ?', (cart_id,))
+
+    def _sweep(self, now):
+        cutoff = now - self.idle_ttl
+        self._conn.execute('DELETE FROM cart_lines WHERE cart_id IN (SELECT cart_id FROM carts WHERE last_used < ?)', (cutoff,))
+        self._conn.execute('DELETE FROM carts WHERE last_used < ?', (cutoff,))
+
+    def get_items(self, cart_id):
+        now = time.time()
+        with self._lock:
+            if not self._alive(cart_id, now):
+                return []
+            self._touch(cart_id, now)
+            rows = self._conn.execute('SELECT data FROM cart_lines WHERE cart_id = ? ORDER BY rowid', (cart_id,)).fetchall()
+        return [json.loads(row[0]) for row in rows]
+
+    def get_line(self, cart_id, key):
+        now = time.time()
+        with self._lock:
+            if not self._alive(cart_id, now):
+                return None
+            row = self._conn.execute('SELECT data FROM cart_lines WHERE cart_id = ? AND line_key = ?', (cart_id, key)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put_line(self, cart_id, key, line):
+        now = time.time()
+        with self._lock:
+            self._alive(cart_id, now)
+            self._conn.execute('BEGIN')
+            try:
+                # UPDATE first so an existing line keeps its position (rowid) in the cart
+                updated = self._conn.execute('UPDATE cart_lines SET data = ? WHERE cart_id = ? AND line_key = ?',
+                                             (json.dumps(line), cart_id, key)).rowcount
+                if not updated:
+                    self._conn.execute('INSERT INTO cart_lines (cart_id, line_key, data) VALUES (?, ?, ?)', (cart_id, key, json.dumps(line)))
+                self._touch(cart_id, now)
+                self._conn.execute('COMMIT')
+            except BaseException:
+                # The connection is shared; never leave it inside a half-done transaction
+                self._conn.execute('ROLLBACK')
+                raise
+
+    def remove_line(self, cart_id, key):
+        with self._lock:
+            removed = self._conn.execute('DELETE FROM cart_lines WHERE cart_id = ? AND line_key = ?', (cart_id, key)).rowcount
+            if removed:  # Removing from a cart that does not exist must not create one
+                self._touch(cart_id, time.time())
+
+    def clear(self, cart_id):
+        with self._lock:
+            self._delete_cart(cart_id)
+
+    def count(self, cart_id):
+        now = time.time()
+        with self._lock:
+            if not self._alive(cart_id, now):
+                return 0
+            return self._conn.execute('SELECT COUNT(*) FROM cart_lines WHERE cart_id = ?', (cart_id,)).fetchone()[0]
+
+
+class CookieCartStore(CartStore):
+    """
+    Lines kept in the signed Flask session cookie, as carts were before server-side storage.
+    Works across any number of instances with no shared store, at the cost of sending the cart
+    with every request (browsers cap a cookie at about 4 KB). cart_id is ignored: the cookie is the cart.
+    Only usable inside a request.
+    """
+
+    SESSION_KEY = 'cart_lines'  # [[line_key, line], ...] in the order added; a list because session JSON sorts dict keys
+
+    def _lines(self):
+        from flask import session
+
+        return session.get(self.SESSION_KEY, [])
+
+    def _save(self, lines):
+        from flask import session
+
+        if lines:
+            session[self.SESSION_KEY] = lines
+        else:
+            session.pop(self.SESSION_KEY, None)
+        session.modified = True
+
+    def get_items(self, cart_id):
+        return [dict(line) for _, line in self._lines()]
+
+    def get_line(self, cart_id, key):
+        return next((dict(line) for line_key_, line in self._lines() if line_key_ == key), None)
+
+    def put_line(self, cart_id, key, line):
+        lines = [list(pair) for pair in self._lines()]
+        for pair in lines:
+            if pair[0] == key:
+                pair[1] = dict(line)
+                break
+        else:
+            lines.append([key, dict(line)])
+        self._save(lines)
+
+    def remove_line(self, cart_id, key):
+        self._save([pair for pair in self._lines() if pair[0] != key])
+
+    def clear(self, cart_id):
+        self._save([])
+
+    def count(self, cart_id):
+        return len(self._lines())
+
+
+class RedisCartStore(CartStore):
+    """One Redis hash per cart, expired with EXPIRE. Requires the optional 'redis' package (requirements-redis.txt)."""
+
+    def __init__(self, url, idle_ttl=2 * 24 * 3600, prefix='freshmo:cart:'):
+        super().__init__(idle_ttl)
+        try:
+            import redis  # Optional dependency, only needed when CART_STORE_URL is a redis:// URL
+        except ImportError as e:
+            raise RuntimeError("CART_STORE_URL is a Redis URL but the 'redis' package is not installed "
+                               "(pip install -r requirements-redis.txt)") from e
+        self._redis = redis.Redis.from_url(url)
+        self._prefix = prefix
+
+    def _key(self, cart_id):
+        return f"{self._prefix}{cart_id}"
+
+    def get_items(self, cart_id):
+        key = self._key(cart_id)
+        pipe = self._redis.pipeline()
+        pipe.hgetall(key)
+        pipe.expire(key, int(self.idle_ttl))
+        lines = pipe.execute()[0]
+        # Redis hashes are unordered; each line records when it was added
+        items = [json.loads(value) for value in lines.values()]
+        return sorted(items, key=lambda line: line.get('added_at', 0))
+
+    def get_line(self, cart_id, key):
+        value = self._redis.hget(self._key(cart_id), key)
+        return json.loads(value) if value else None
+
+    def put_line(self, cart_id, key, line):
+        line = dict(line)
+        line.setdefault('added_at', time.time())
+        pipe = self._redis.pipeline()
+        pipe.hset(self._key(cart_id), key, json.dumps(line))
+        pipe.expire(self._key(cart_id), int(self.idle_ttl))
+        pipe.execute()
+
+    def remove_line(self, cart_id, key):
+        self._redis.hdel(self._key(cart_id), key)
+
+    def clear(self, cart_id):
+        self._redis.delete(self._key(cart_id))
+
+    def count(self, cart_id):
+        return self._redis.hlen(self._key(cart_id))
+
+
+def create_cart_store(url, idle_ttl=2 * 24 * 3600):
+    """
+    Builds a cart store from a URL:
+      memory://              -> MemoryCartStore (default; one process only)
+      cookie://              -> CookieCartStore (signed session cookie; production default)
+      sqlite:///path/to.db   -> SQLiteCartStore
+      redis://host:6379/0    -> RedisCartStore
+    """
+    url = url or 'memory://'
+    if url.startswith('sqlite:///'):
+        return SQLiteCartStore(url[len('sqlite:///'):], idle_ttl=idle_ttl)
+    if url.startswith(('redis://', 'rediss://', 'unix://')):
+        return RedisCartStore(url, idle_ttl=idle_ttl)
+    if url.startswith('memory://'):
+        return MemoryCartStore(idle_ttl=idle_ttl)
+    if url.startswith('cookie://'):
+        return CookieCartStore(idle_ttl=idle_ttl)
+    raise ValueError(f"Unsupported CART_STORE_URL: {url}")
@@ -0,0 +1,107 @@
+import hashlib
+import json
+from dataclasses import dataclass
+from types import MappingProxyType
+from services.pricing import to_cents, to_rands, unit_vat_cents, vat_basis_points
+
+# Descriptions shown on the /products page, in display order
+CATEGORY_DESCRIPTIONS = {
+    'Mouthwash Sachets': 'Experience instant freshness with our convenient mouthwash sachets! 💧',
+    'Oral Care Accessories': 'Enhance your oral hygiene routine with our eco-friendly accessories! 🦷',
+    'Combos': 'Get the best of both worlds with our specially curated Freshmo combos! ✨',
+}
+
+# Categories with a hand-picked product order; every other category is sorted by name
+CATEGORY_SORT_ORDER = {
+    'Mouthwash Sachets': ('sm-single', 'sm-box', 'sm-bulk'),
+}
+
+# Categories whose product pages offer a toothbrush colour choice
+COLOR_CATEGORIES = ('Oral Care Accessories', 'Combos')
+
+
+@dataclass(frozen=True)
+class Product:
+    """Read-only product record with VAT-inclusive prices precomputed."""
+    id: str
+    name: str
+    category: str
+    price_excl_vat: float
+    price_incl_vat: float
+    vat_amount: float
+    price_excl_vat_cents: int
+    vat_cents: int
+    image_url: str = 'placeholder.jpg'
+    type: str = None
+    colors: tuple = ()
+    toothbrush_colors: tuple = ()
+
+
+class CatalogIndex:
+    """
+    Immutable, precomputed view of the product catalog.
+
+    Built once (at create_app time or when the catalog changes) so request handlers only do
+    dictionary lookups. To change the catalog, build a new index and swap the reference;
+    readers holding the old index keep a consistent view.
+    """
+
+    def __init__(self, products, vat_rate, toothbrush_colors=()):
+        self.vat_rate = vat_rate
+        self.vat_bp = vat_basis_points(vat_rate)
+        self.toothbrush_colors = tuple(toothbrush_colors)
+        self.products = tuple(self._freeze(product) for product in products)
+        self.by_id = MappingProxyType({product.id: product for product in self.products})
+
+        by_category = {}
+        for product in self.products:
+            by_category.setdefault(product.category, []).append(product)
+        for category, items in by_category.items():
+            order = CATEGORY_SORT_ORDER.get(category)
+            if order:
+                items.sort(key=lambda p: order.index(p.id) if p.id in order else 999)
+            else:
+                items.sort(key=lambda p: p.name)
+        self.by_category = MappingProxyType({category: tuple(items) for category, items in by_category.items()})
+
+        # The /products listing: known categories first in their display order, then any others
+        ordered = [c for c in CATEGORY_DESCRIPTIONS if c in self.by_category]
+        ordered += sorted(c for c in self.by_category if c not in CATEGORY_DESCRIPTIONS)
+        self.categories = MappingProxyType({
+            category: MappingProxyType({'description': CATEGORY_DESCRIPTIONS.get(category, f"Explore our {category} selection!")})
+            for category in ordered
+        })
+
+        # Content hash of the catalog, usable as a cache key
+        serialized = json.dumps([product.__dict__ for product in self.products], sort_keys=True)
+        self.version = hashlib.sha1(f"{vat_rate}|{serialized}".encode()).hexdigest()[:12]
+
+    def _freeze(self, product):
+        # Prices are worked out in integer cents (see services/pricing.py) so product pages,
+        # cart and checkout all agree to the cent
+        price_excl_vat_cents = to_cents(product['price_excl_vat'])
+        vat_cents = unit_vat_cents(price_excl_vat_cents, self.vat_bp)
+        return Product(
+            id=product['id'],
+            name=product['name'],
+            category=product['category'],
+            price_excl_vat=to_rands(price_excl_vat_cents),
+            price_incl_vat=to_rands(price_excl_vat_cents + vat_cents),
+            vat_amount=to_rands(vat_cents),
+            price_excl_vat_cents=price_excl_vat_cents,
+            vat_cents=vat_cents,
+            image_url=product.get('image_url') or 'placeholder.jpg',
+            type=product.get('type'),
+            colors=tuple(product.get('colors') or ()),
+            toothbrush_colors=tuple(product.get('toothbrush_colors') or ()),
+        )
+
+    def get(self, product_id):
+        return self.by_id.get(product_id)
+
+    def items_in(self, category):
+        """Pre-sorted products in a category (empty tuple if unknown)."""
+        return self.by_category.get(category, ())
+
+    def colors_for(self, category):
+        return self.toothbrush_colors if category in COLOR_CATEGORIES else ()
@@ -0,0 +1,22 @@
+"""
+The Freshmo product catalog: the single list the shop sells from (app.py builds its CatalogIndex
+from it) and that populate_firestore.py syncs into the Firestore 'products' collection.
+Edit products here; `python populate_firestore.py --dry-run` shows what a sync would change.
+"""
+
+# List of available toothbrush colors for dropdowns
+TOOTHBRUSH_COLORS = ['green', 'orange', 'purple', 'grey', 'blue']
+
+PRODUCTS = [
+    # Mouthwash Sachets
+    {'id': 'sm-single', 'name': 'Strawberry Mint Single Sachet', 'category': 'Mouthwash Sachets', 'price_excl_vat': 9.00, 'type': 'single', 'image_url': 'strawberry_mint_single_sachet.jpg'},
+    {'id': 'sm-box', 'name': 'Strawberry Mint Box (30 Sachets)', 'category': 'Mouthwash Sachets', 'price_excl_vat': 210.00, 'type': 'box', 'image_url': 'strawberry_mint_box.jpg'},
+    {'id': 'sm-bulk', 'name': 'Strawberry Mint Bulk Box (10 Boxes)', 'category': 'Mouthwash Sachets', 'price_excl_vat': 1800.00, 'type': 'bulk_box', 'image_url': 'strawberry_mint_bulk_box.jpg'},
+
+    # Oral Care Accessories
+    {'id': 'bamboo-toothbrush', 'name': 'Biodegradable Bamboo Toothbrush', 'category': 'Oral Care Accessories', 'price_excl_vat': 45.00, 'colors': TOOTHBRUSH_COLORS, 'image_url': 'biodegradable_bamboo_toothbrush.jpg'},
+    {'id': 'bamboo-toothbrush-box', 'name': 'Biodegradable Bamboo Toothbrush Box (10 Pcs)', 'category': 'Oral Care Accessories', 'price_excl_vat': 350.00, 'colors': TOOTHBRUSH_COLORS, 'image_url': 'biodegradable_bamboo_toothbrush_box.jpg'},
+
+    # Combos
+    {'id': 'freshness-combo', 'name': 'Freshness Combo (Box + Toothbrush)', 'category': 'Combos', 'price_excl_vat': 225.00, 'toothbrush_colors': TOOTHBRUSH_COLORS, 'image_url': 'freshness_combo.jpg'}
+]
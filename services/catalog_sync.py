@@ -0,0 +1,101 @@
+import copy
+from concurrent.futures import ThreadPoolExecutor
+from dataclasses import dataclass, field
+
+FIRESTORE_MAX_BATCH = 500  # Firestore's limit on writes per batch
+REMOVED = object()  # Diff value for a field to delete (written as firestore.DELETE_FIELD)
+
+
+def product_document(product):
+    """Firestore document for a catalog product: every field except 'id', which is the document ID."""
+    return {key: copy.deepcopy(value) for key, value in product.items() if key != 'id'}
+
+
+def diff_fields(current, desired):
+    """
+    Field-by-field changes that turn `current` into `desired`: {field: new value}, with fields that
+    are gone from `desired` mapped to REMOVED.
+    """
+    changes = {key: value for key, value in desired.items() if key not in current or current[key] != value}
+    changes.update({key: REMOVED for key in current if key not in desired})
+    return changes
+
+
+@dataclass
+class SyncPlan:
+    creates: dict = field(default_factory=dict)  # doc_id -> document
+    updates: dict = field(default_factory=dict)  # doc_id -> {field: value, or REMOVED}
+    deletes: list = field(default_factory=list)  # doc_ids no longer in the catalog (only with prune)
+    unchanged: list = field(default_factory=list)
+
+    @property
+    def write_count(self):
+        return len(self.creates) + len(self.updates) + len(self.deletes)
+
+    def describe(self):
+        lines = [f"+ {doc_id}" for doc_id in sorted(self.creates)]
+        for doc_id, changes in sorted(self.updates.items()):
+            lines.append(f"~ {doc_id}: " + ', '.join(f"{key} removed" if value is REMOVED else f"{key}={value!r}"
+                                                     for key, value in sorted(changes.items())))
+        lines += [f"- {doc_id}" for doc_id in sorted(self.deletes)]
+        lines.append(f"{len(self.creates)} to create, {len(self.updates)} to update, {len(self.deletes)} to delete, "
+                     f"{len(self.unchanged)} unchanged.")
+        return lines
+
+
+def plan_sync(db, products, collection='products', prune=False):
+    """
+    Compares the catalog with the collection using one get_all() round trip (plus one
+    list_documents() call when prune is on, to find documents no longer in the catalog).
+    """
+    desired = {product['id']: product_document(product) for product in products}
+    ids = set(desired)
+    if prune:
+        ids |= {ref.id for ref in db.collection(collection).list_documents()}
+    refs = [db.collection(collection).document(doc_id) for doc_id in sorted(ids)]
+    current = {snapshot.id: snapshot.to_dict() for snapshot in db.get_all(refs) if snapshot.exists}
+
+    plan = SyncPlan()
+    for doc_id, document in desired.items():
+        if doc_id not in current:
+            plan.creates[doc_id] = document
+            continue
+        changes = diff_fields(current[doc_id], document)
+        if changes:
+            plan.updates[doc_id] = changes
+        else:
+            plan.unchanged.append(doc_id)
+    if prune:
+        plan.deletes = sorted(doc_id for doc_id in current if doc_id not in desired)
+    return plan
+
+
+def apply_sync(db, plan, collection='products', chunk_size=FIRESTORE_MAX_BATCH, workers=4):
+    """
+    Writes the plan in batches of at most chunk_size operations, committing up to `workers` batches
+    at once. Each batch commits atomically on its own; returns the number of batches committed.
+    """
+    from firebase_admin import firestore  # Only needed once the sync actually writes
+
+    operations = [('set', doc_id, document) for doc_id, document in sorted(plan.creates.items())]
+    operations += [('update', doc_id, {key: firestore.DELETE_FIELD if value is REMOVED else value for key, value in changes.items()})
+                   for doc_id, changes in sorted(plan.updates.items())]
+    operations += [('delete', doc_id, None) for doc_id in plan.deletes]
+    chunk_size = max(1, min(chunk_size, FIRESTORE_MAX_BATCH))
+    chunks = [operations[start:start + chunk_size] for start in range(0, len(operations), chunk_size)]
+
+    def commit(chunk):
+        batch = db.batch()
+        for op, doc_id, data in chunk:
+            ref = db.collection(collection).document(doc_id)
+            if op == 'set':
+                batch.set(ref, data)
+            elif op == 'update':
+                batch.update(ref, data)
+            else:
+                batch.delete(ref)
+        batch.commit()
+
+    with ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        list(pool.map(commit, chunks))  # Re-raises the first failed commit
+    return len(chunks)
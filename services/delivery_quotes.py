@@ -0,0 +1,123 @@
+import re
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+# Common street-type abbreviations, expanded so "27 Parakeet St" and "27 parakeet street" share a key
+_ABBREVIATIONS = {
+    'st': 'street', 'str': 'street', 'rd': 'road', 'ave': 'avenue', 'av': 'avenue',
+    'dr': 'drive', 'cres': 'crescent', 'cl': 'close', 'ln': 'lane', 'blvd': 'boulevard',
+    'ext': 'extension', 'hwy': 'highway',
+}
+_COUNTRY_SUFFIXES = ('south africa', 'rsa', 'za')
+
+
+def normalize_address(address):
+    """
+    Reduces an address to a canonical cache key: lower case, no punctuation, single spaces,
+    expanded street abbreviations, and the country suffix dropped.
+    e.g. "27 Parakeet St., Villa Lisa,  Boksburg 1459, South Africa" -> "27 parakeet street villa lisa boksburg 1459"
+    """
+    words = re.sub(r'[^a-z0-9]+', ' ', (address or '').lower()).split()
+    words = [_ABBREVIATIONS.get(word, word) for word in words]
+    text = ' '.join(words)
+    for suffix in _COUNTRY_SUFFIXES:
+        if text.endswith(' ' + suffix):
+            text = text[:-len(suffix) - 1]
+            break
+    return text
+
+
+class DeliveryQuoteCache:
+    """
+    Bounded LRU cache of delivery charges with a TTL, keyed on (origin, normalized destination).
+
+    If db_path is set, quotes are also written to a SQLite file so they survive worker restarts;
+    the in-memory LRU stays in front of it for hot addresses.
+    """
+
+    def __init__(self, max_entries=1024, ttl_seconds=7 * 24 * 3600, db_path=None):
+        self.max_entries = max_entries
+        self.ttl_seconds = ttl_seconds
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (charge, stored_at)
+        self._lock = threading.Lock()
+        self._disk = None
+        if db_path:
+            try:
+                self._disk = sqlite3.connect(db_path, check_same_thread=False)
+                self._disk.execute('CREATE TABLE IF NOT EXISTS delivery_quotes (key TEXT PRIMARY KEY, charge REAL NOT NULL, stored_at REAL NOT NULL)')
+                self._disk.execute('DELETE FROM delivery_quotes WHERE stored_at < ?', (time.time() - ttl_seconds,))
+                self._disk.commit()
+            except sqlite3.Error as e:
+                print(f"Delivery quote disk cache unavailable ({db_path}): {e} 😞. Using memory only.")
+                self._disk = None
+
+    @staticmethod
+    def make_key(origin, destination):
+        return f"{normalize_address(origin)}|{normalize_address(destination)}"
+
+    def get(self, origin, destination):
+        """Returns the cached charge, or None on a miss or an expired entry."""
+        key = self.make_key(origin, destination)
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None and self._disk is not None:
+                entry = self._disk_get(key)
+                if entry is not None:
+                    self._remember(key, entry)
+            if entry is not None and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            if entry is not None:
+                self._entries.pop(key, None)
+            self.misses += 1
+            return None
+
+    def set(self, origin, destination, charge):
+        key = self.make_key(origin, destination)
+        entry = (charge, time.time())
+        with self._lock:
+            self._remember(key, entry)
+            if self._disk is not None:
+                try:
+                    self._disk.execute('INSERT OR REPLACE INTO delivery_quotes (key, charge, stored_at) VALUES (?, ?, ?)', (key, *entry))
+                    self._disk.commit()
+                except sqlite3.Error as e:
+                    print(f"Failed to persist delivery quote: {e} 😢")
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+            if self._disk is not None:
+                self._disk.execute('DELETE FROM delivery_quotes')
+                self._disk.commit()
+
+    def stats(self):
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
+    def _remember(self, key, entry):
+        self._entries[key] = entry
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _disk_get(self, key):
+        try:
+            row = self._disk.execute('SELECT charge, stored_at FROM delivery_quotes WHERE key = ?', (key,)).fetchone()
+        except sqlite3.Error as e:
+            print(f"Failed to read delivery quote from disk: {e} 😢")
+            return None
+        return tuple(row) if row else None
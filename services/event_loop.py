@@ -0,0 +1,75 @@
+import asyncio
+import concurrent.futures
+import contextvars
+import threading
+
+
+class EventLoopThread:
+    """
+    One asyncio event loop per worker process, run on a daemon thread that starts on first use.
+
+    run(coroutine_function, *args) schedules the coroutine on the loop and blocks the calling (request)
+    thread until it finishes, so coroutines from every request thread share one loop. Async clients
+    (httpx, Firestore's AsyncClient) belong to the loop they first ran on, so sharing the loop is what
+    lets their pooled connections serve every request. The coroutine runs in a copy of the caller's
+    context variables, which carries Flask's request and app contexts along.
+    """
+
+    def __init__(self, name='event-loop'):
+        self.name = name
+        self.loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+
+    def _ensure_started(self):
+        if self._thread is not None and self._thread.is_alive():
+            return self.loop
+        with self._lock:
+            if self._thread is None or not self._thread.is_alive():
+                ready = threading.Event()
+                self.loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._serve, args=(self.loop, ready), name=self.name, daemon=True)
+                self._thread.start()
+                ready.wait()
+        return self.loop
+
+    @staticmethod
+    def _serve(loop, ready):
+        asyncio.set_event_loop(loop)
+        loop.call_soon(ready.set)
+        loop.run_forever()
+
+    def run(self, coroutine_function, *args, **kwargs):
+        """Runs coroutine_function(*args, **kwargs) on the loop and returns its result (or raises its exception)."""
+        loop = self._ensure_started()
+        if threading.current_thread() is self._thread:
+            raise RuntimeError("EventLoopThread.run() called from its own loop; await the coroutine instead")
+        done = concurrent.futures.Future()
+
+        def settle(task):
+            if task.cancelled():
+                done.set_exception(concurrent.futures.CancelledError())
+            elif task.exception() is not None:
+                done.set_exception(task.exception())
+            else:
+                done.set_result(task.result())
+
+        def start():
+            # Runs inside `context`, so the task (and the coroutine it creates) inherits the caller's context
+            done.set_running_or_notify_cancel()
+            loop.create_task(coroutine_function(*args, **kwargs)).add_done_callback(settle)
+
+        loop.call_soon_threadsafe(start, context=contextvars.copy_context())
+        return done.result()
+
+    def close(self, timeout=5):
+        """Stops the loop and waits for its thread; the next run() starts a new one."""
+        with self._lock:
+            thread, loop = self._thread, self.loop
+            self._thread = None
+        if thread is None:
+            return
+        loop.call_soon_threadsafe(loop.stop)
+        thread.join(timeout)
+        if not thread.is_alive():
+            loop.close()
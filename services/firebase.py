@@ -0,0 +1,82 @@
+import json
+import os
+
+
+def load_service_account_json(config_json, credentials_file=None):
+    """
+    Returns the service-account JSON string: the FIREBASE_SERVICE_ACCOUNT_JSON value (Vercel),
+    or, for local development, the contents of credentials_file. None if neither is available.
+    """
+    if config_json:
+        return config_json
+    if credentials_file:
+        if os.path.exists(credentials_file):
+            with open(credentials_file, 'r') as f:
+                # Round-trip through json so the result is always a compact JSON string,
+                # consistent with how Vercel environment variables are handled.
+                return json.dumps(json.load(f))
+        print(f"WARNING: '{os.path.basename(credentials_file)}' not found. Firebase will only be initialized if FIREBASE_SERVICE_ACCOUNT_JSON env var is set.")
+    return None
+
+
+def create_firestore_client(app_name, config_json, credentials_file=None):
+    """
+    Initializes the Firebase Admin app and returns a Firestore client, or None if Firebase is not
+    configured or fails to start. firebase_admin (and with it grpc and google-cloud-firestore) is
+    imported here rather than at module level, so processes that never touch Firestore never load it.
+    """
+    firebase_config_json_string = load_service_account_json(config_json, credentials_file)
+    if not firebase_config_json_string:
+        print("WARNING: No FIREBASE_SERVICE_ACCOUNT_JSON environment variable found. Firebase will not be available.")
+        return None
+
+    try:
+        from firebase_admin import credentials, initialize_app, firestore, get_app
+
+        # Parse the JSON string into a Python dictionary
+        firebase_credentials_dict = json.loads(firebase_config_json_string)
+
+        # Check if a Firebase app with this name already exists
+        try:
+            # Use the Flask app's name so several app instances in one process share the Firebase app
+            firebase_app = get_app(name=app_name)
+        except ValueError:
+            # If not, initialize it using the dictionary credentials
+            firebase_app = initialize_app(credentials.Certificate(firebase_credentials_dict), name=app_name)
+            print("Firebase Admin SDK initialized successfully for Flask app instance.")
+
+        # Obtain the Firestore client using the app instance
+        db = firestore.client(app=firebase_app)
+        print("Firestore client obtained successfully.")
+        return db
+    except json.JSONDecodeError as e:
+        print(f"ERROR: FIREBASE_SERVICE_ACCOUNT_JSON environment variable is not valid JSON. Details: {e}")
+    except Exception as e:
+        print(f"Unexpected error during Firebase initialization. Details: {str(e)}")
+    return None
+
+
+def create_async_firestore_client(config_json, credentials_file=None):
+    """
+    Returns a google.cloud.firestore.AsyncClient for the same service account, or None if Firebase is
+    not configured or the client cannot be created. The client belongs to the event loop it is first
+    used on, so build it there (app.event_loop). google-cloud-firestore ships with firebase_admin.
+    """
+    firebase_config_json_string = load_service_account_json(config_json, credentials_file)
+    if not firebase_config_json_string:
+        print("WARNING: No FIREBASE_SERVICE_ACCOUNT_JSON environment variable found. Firebase will not be available.")
+        return None
+
+    try:
+        from firebase_admin import credentials
+        from google.cloud.firestore import AsyncClient
+
+        certificate = credentials.Certificate(json.loads(firebase_config_json_string))
+        db = AsyncClient(project=certificate.project_id, credentials=certificate.get_credential())
+        print("Async Firestore client obtained successfully.")
+        return db
+    except json.JSONDecodeError as e:
+        print(f"ERROR: FIREBASE_SERVICE_ACCOUNT_JSON environment variable is not valid JSON. Details: {e}")
+    except Exception as e:
+        print(f"Unexpected error creating the async Firestore client. Details: {str(e)}")
+    return None
@@ -0,0 +1,441 @@
+import json
+import threading
+from flask import g, has_request_context, request
+
+from services.metrics import current_route, format_counter
+
+# Query methods that bound how many documents a query can return
+_LIMIT_METHODS = ('limit', 'limit_to_last')
+
+
+class ReadBudgetExceeded(Exception):
+    """Raised at the end of a request that read more Firestore documents than its budget (enforce mode only)."""
+
+
+def _unwrap(value):
+    return value._target if isinstance(value, _Proxy) else value
+
+
+def _unwrap_args(args, kwargs):
+    return [_unwrap(arg) for arg in args], {key: _unwrap(value) for key, value in kwargs.items()}
+
+
+class _Proxy:
+    """Delegates everything to the wrapped Firestore object; subclasses count the billed operations."""
+
+    def __init__(self, target, ledger):
+        self._target = target
+        self._ledger = ledger
+
+    def __getattr__(self, name):
+        return getattr(self._target, name)
+
+    def __repr__(self):
+        return f"<{type(self).__name__} for {self._target!r}>"
+
+
+class AccountedDocument(_Proxy):
+    def get(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        snapshot = self._target.get(*args, **kwargs)
+        self._ledger.record(reads=1, round_trips=1)  # A missing document is still billed as one read
+        return snapshot
+
+    def _write(self, method, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        result = getattr(self._target, method)(*args, **kwargs)
+        self._ledger.record(writes=1, round_trips=1)
+        return result
+
+    def set(self, *args, **kwargs):
+        return self._write('set', *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._write('create', *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._write('update', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._write('delete', *args, **kwargs)
+
+    def collection(self, *args, **kwargs):
+        return AccountedQuery(self._target.collection(*args, **kwargs), self._ledger, collection=args[0] if args else '')
+
+
+class AccountedQuery(_Proxy):
+    """A collection or query. Remembers whether a limit was applied so unbounded reads can be flagged."""
+
+    def __init__(self, target, ledger, collection='', limited=False):
+        super().__init__(target, ledger)
+        self._collection = collection
+        self._limited = limited
+
+    def __getattr__(self, name):
+        attribute = getattr(self._target, name)
+        if not callable(attribute) or name.startswith('_'):
+            return attribute
+
+        def chained(*args, **kwargs):
+            args, kwargs = _unwrap_args(args, kwargs)
+            result = attribute(*args, **kwargs)
+            # where(), order_by(), select(), start_after()... return a new query that keeps (or gains) a limit
+            if hasattr(result, 'stream') and not isinstance(result, _Proxy):
+                return type(self)(result, self._ledger, self._collection, self._limited or name in _LIMIT_METHODS)
+            return result
+        return chained
+
+    def stream(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        self._ledger.record_query(self._collection, self._limited)
+        count = 0
+        try:
+            for snapshot in self._target.stream(*args, **kwargs):
+                count += 1
+                yield snapshot
+        finally:
+            self._ledger.record(reads=max(count, 1))  # An empty result is billed as one read
+
+    def get(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        self._ledger.record_query(self._collection, self._limited)
+        snapshots = self._target.get(*args, **kwargs)
+        self._ledger.record(reads=max(len(snapshots), 1))
+        return snapshots
+
+    def document(self, *args, **kwargs):
+        return AccountedDocument(self._target.document(*args, **kwargs), self._ledger)
+
+    def add(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        update_time, reference = self._target.add(*args, **kwargs)
+        self._ledger.record(writes=1, round_trips=1)
+        return update_time, AccountedDocument(reference, self._ledger)
+
+    def on_snapshot(self, callback):
+        def counted(docs, changes, read_time):
+            # The first snapshot reads every document; later ones only the changed documents
+            self._ledger.record(reads=len(changes) if changes else len(docs))
+            return callback(docs, changes, read_time)
+        return self._target.on_snapshot(counted)
+
+
+class AccountedBatch(_Proxy):
+    """Write batch (or transaction): writes are billed per document, the commit is one round trip."""
+
+    def _stage(self, method, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        result = getattr(self._target, method)(*args, **kwargs)
+        self._ledger.record(writes=1)
+        return result
+
+    def set(self, *args, **kwargs):
+        return self._stage('set', *args, **kwargs)
+
+    def create(self, *args, **kwargs):
+        return self._stage('create', *args, **kwargs)
+
+    def update(self, *args, **kwargs):
+        return self._stage('update', *args, **kwargs)
+
+    def delete(self, *args, **kwargs):
+        return self._stage('delete', *args, **kwargs)
+
+    def commit(self, *args, **kwargs):
+        result = self._target.commit(*args, **kwargs)
+        self._ledger.record(round_trips=1)
+        return result
+
+
+class AccountedTransaction(AccountedBatch):
+    """Transaction passed to firestore.transactional, which drives it through _begin/_commit."""
+
+    def get(self, ref_or_query, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        result = self._target.get(_unwrap(ref_or_query), *args, **kwargs)
+        if isinstance(ref_or_query, AccountedDocument):
+            self._ledger.record(reads=1, round_trips=1)
+            return result
+        if isinstance(ref_or_query, AccountedQuery):
+            self._ledger.record_query(ref_or_query._collection, ref_or_query._limited)
+        snapshots = list(result)
+        self._ledger.record(reads=max(len(snapshots), 1))
+        return iter(snapshots)
+
+    def _begin(self, *args, **kwargs):
+        self._ledger.record(round_trips=1)
+        return self._target._begin(*args, **kwargs)
+
+    def _commit(self, *args, **kwargs):
+        self._ledger.record(round_trips=1)
+        return self._target._commit(*args, **kwargs)
+
+
+class AccountedClient(_Proxy):
+    """Firestore client wrapper: every document read, write and round trip is reported to the ledger."""
+
+    def collection(self, *args, **kwargs):
+        return AccountedQuery(self._target.collection(*args, **kwargs), self._ledger, collection=args[0] if args else '')
+
+    def document(self, *args, **kwargs):
+        return AccountedDocument(self._target.document(*args, **kwargs), self._ledger)
+
+    def batch(self, *args, **kwargs):
+        return AccountedBatch(self._target.batch(*args, **kwargs), self._ledger)
+
+    def transaction(self, *args, **kwargs):
+        return AccountedTransaction(self._target.transaction(*args, **kwargs), self._ledger)
+
+    def get_all(self, references, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        references = [_unwrap(reference) for reference in references]
+        snapshots = list(self._target.get_all(references, *args, **kwargs))
+        self._ledger.record(reads=max(len(references), 1), round_trips=1)
+        return iter(snapshots)
+
+
+class AsyncAccountedDocument(AccountedDocument):
+    """AccountedDocument for the AsyncClient: the same counts, recorded once the awaited call completes."""
+
+    async def get(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        snapshot = await self._target.get(*args, **kwargs)
+        self._ledger.record(reads=1, round_trips=1)
+        return snapshot
+
+    async def _write(self, method, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        result = await getattr(self._target, method)(*args, **kwargs)
+        self._ledger.record(writes=1, round_trips=1)
+        return result
+
+    def collection(self, *args, **kwargs):
+        return AsyncAccountedQuery(self._target.collection(*args, **kwargs), self._ledger, collection=args[0] if args else '')
+
+
+class AsyncAccountedQuery(AccountedQuery):
+    async def stream(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        self._ledger.record_query(self._collection, self._limited)
+        count = 0
+        try:
+            async for snapshot in self._target.stream(*args, **kwargs):
+                count += 1
+                yield snapshot
+        finally:
+            self._ledger.record(reads=max(count, 1))
+
+    async def get(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        self._ledger.record_query(self._collection, self._limited)
+        snapshots = await self._target.get(*args, **kwargs)
+        self._ledger.record(reads=max(len(snapshots), 1))
+        return snapshots
+
+    def document(self, *args, **kwargs):
+        return AsyncAccountedDocument(self._target.document(*args, **kwargs), self._ledger)
+
+    async def add(self, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        update_time, reference = await self._target.add(*args, **kwargs)
+        self._ledger.record(writes=1, round_trips=1)
+        return update_time, AsyncAccountedDocument(reference, self._ledger)
+
+
+class AsyncAccountedBatch(AccountedBatch):
+    async def commit(self, *args, **kwargs):
+        result = await self._target.commit(*args, **kwargs)
+        self._ledger.record(round_trips=1)
+        return result
+
+
+class AsyncAccountedTransaction(AsyncAccountedBatch):
+    """Transaction passed to firestore.async_transactional, which awaits its _begin/_commit."""
+
+    async def get(self, ref_or_query, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        result = await self._target.get(_unwrap(ref_or_query), *args, **kwargs)
+        if isinstance(ref_or_query, AsyncAccountedDocument):
+            self._ledger.record(reads=1, round_trips=1)
+            return result
+        if isinstance(ref_or_query, AsyncAccountedQuery):
+            self._ledger.record_query(ref_or_query._collection, ref_or_query._limited)
+        snapshots = [snapshot async for snapshot in result]
+        self._ledger.record(reads=max(len(snapshots), 1))
+
+        async def replay():
+            for snapshot in snapshots:
+                yield snapshot
+        return replay()
+
+    async def _begin(self, *args, **kwargs):
+        self._ledger.record(round_trips=1)
+        return await self._target._begin(*args, **kwargs)
+
+    async def _commit(self, *args, **kwargs):
+        self._ledger.record(round_trips=1)
+        return await self._target._commit(*args, **kwargs)
+
+
+class AsyncAccountedClient(AccountedClient):
+    """AccountedClient for google.cloud.firestore.AsyncClient, used by the async checkout."""
+
+    def collection(self, *args, **kwargs):
+        return AsyncAccountedQuery(self._target.collection(*args, **kwargs), self._ledger, collection=args[0] if args else '')
+
+    def document(self, *args, **kwargs):
+        return AsyncAccountedDocument(self._target.document(*args, **kwargs), self._ledger)
+
+    def batch(self, *args, **kwargs):
+        return AsyncAccountedBatch(self._target.batch(*args, **kwargs), self._ledger)
+
+    def transaction(self, *args, **kwargs):
+        return AsyncAccountedTransaction(self._target.transaction(*args, **kwargs), self._ledger)
+
+    async def get_all(self, references, *args, **kwargs):
+        args, kwargs = _unwrap_args(args, kwargs)
+        references = [_unwrap(reference) for reference in references]
+        try:
+            async for snapshot in self._target.get_all(references, *args, **kwargs):
+                yield snapshot
+        finally:
+            self._ledger.record(reads=max(len(references), 1), round_trips=1)
+
+
+class FirestoreAccounting:
+    """
+    Counts billed Firestore operations per request and per route.
+
+    wrap(client) returns a proxy that reports document reads, writes and query round trips here
+    (wrap_async() does the same for the async checkout's AsyncClient).
+    Totals per route are exported on /metrics (freshmo_firestore_*); a query streamed without a
+    limit() is logged once per route and collection and counted as unbounded. Work done outside a
+    request (the product listener, the Telegram worker) is booked under route "background".
+
+    FIRESTORE_READ_BUDGET (and per-route FIRESTORE_READ_BUDGETS, a JSON object keyed by URL rule)
+    caps the documents a request may read. Over budget is logged and counted; with
+    FIRESTORE_ENFORCE_READ_BUDGET on, the request raises ReadBudgetExceeded instead, which makes
+    a test client call fail. FIRESTORE_LOG_USAGE prints a one-line summary for every request.
+    """
+
+    def __init__(self, app=None):
+        self.read_budget = None
+        self.route_budgets = {}
+        self.enforce = False
+        self.log_usage = False
+        self._lock = threading.Lock()
+        self._totals = {}  # route -> {'reads', 'writes', 'round_trips', 'requests' that used Firestore}
+        self._unbounded = {}  # (route, collection) -> count
+        self._over_budget = {}  # route -> count
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.read_budget = app.config.get('FIRESTORE_READ_BUDGET')
+        budgets = app.config.get('FIRESTORE_READ_BUDGETS') or {}
+        self.route_budgets = json.loads(budgets) if isinstance(budgets, str) else dict(budgets)
+        self.enforce = app.config.get('FIRESTORE_ENFORCE_READ_BUDGET', False)
+        self.log_usage = app.config.get('FIRESTORE_LOG_USAGE', False)
+        app.firestore_accounting = self
+        app.after_request(self._finish_request)
+        metrics = getattr(app, 'metrics', None)
+        if metrics is not None:
+            metrics.register_collector(self.metric_lines)
+
+    def wrap(self, client):
+        if client is None or isinstance(client, AccountedClient):
+            return client
+        return AccountedClient(client, self)
+
+    def wrap_async(self, client):
+        """wrap() for a google.cloud.firestore.AsyncClient."""
+        if client is None or isinstance(client, AccountedClient):
+            return client
+        return AsyncAccountedClient(client, self)
+
+    # --- Recording ---
+    def usage(self):
+        """Counters for the current request (empty outside a request)."""
+        if not has_request_context():
+            return {}
+        if '_firestore_usage' not in g:
+            g._firestore_usage = {'reads': 0, 'writes': 0, 'round_trips': 0, 'unbounded': []}
+        return g._firestore_usage
+
+    def record(self, reads=0, writes=0, round_trips=0):
+        usage = self.usage()
+        if usage:
+            usage['reads'] += reads
+            usage['writes'] += writes
+            usage['round_trips'] += round_trips
+        route = current_route()
+        with self._lock:
+            totals = self._totals.setdefault(route, {'reads': 0, 'writes': 0, 'round_trips': 0, 'requests': 0})
+            totals['reads'] += reads
+            totals['writes'] += writes
+            totals['round_trips'] += round_trips
+
+    def record_query(self, collection, limited):
+        self.record(round_trips=1)
+        if limited:
+            return
+        usage = self.usage()
+        if usage:
+            usage['unbounded'].append(collection)
+        key = (current_route(), collection)
+        with self._lock:
+            first = key not in self._unbounded
+            self._unbounded[key] = self._unbounded.get(key, 0) + 1
+        if first:
+            print(f"⚠️ Unbounded Firestore query: '{collection}' streamed without limit() in {key[0]}. Every document is a billed read.")
+
+    def budget_for(self, route):
+        return self.route_budgets.get(route, self.read_budget)
+
+    def _finish_request(self, response):
+        usage = g.pop('_firestore_usage', None)
+        if not usage:
+            return response
+        route = current_route()
+        with self._lock:
+            self._totals[route]['requests'] += 1
+        summary = (f"{request.method} {route}: {usage['reads']} reads, {usage['writes']} writes, "
+                   f"{usage['round_trips']} round trips")
+        if self.log_usage:
+            print(f"📊 Firestore {summary}")
+        budget = self.budget_for(route)
+        if budget is not None and usage['reads'] > int(budget):
+            with self._lock:
+                self._over_budget[route] = self._over_budget.get(route, 0) + 1
+            message = f"Firestore read budget exceeded ({budget}) by {summary}"
+            if self.enforce:
+                raise ReadBudgetExceeded(message)
+            print(f"🔥 {message}")
+        return response
+
+    # --- Exposition ---
+    def stats(self):
+        with self._lock:
+            return {
+                'routes': {route: dict(totals) for route, totals in self._totals.items()},
+                'unbounded_queries': {f"{route} {collection}": count for (route, collection), count in self._unbounded.items()},
+                'over_budget': dict(self._over_budget),
+            }
+
+    def metric_lines(self):
+        with self._lock:
+            totals = sorted((route, dict(values)) for route, values in self._totals.items())
+            unbounded = sorted(self._unbounded.items())
+            over_budget = sorted(self._over_budget.items())
+        lines = []
+        for key, help_text in (('reads', "Billed Firestore document reads by route."),
+                               ('writes', "Billed Firestore document writes by route."),
+                               ('round_trips', "Firestore RPCs (gets, queries, commits) by route.")):
+            lines += format_counter(f"freshmo_firestore_{key}_total", help_text,
+                                    [({'route': route}, values[key]) for route, values in totals])
+        lines += format_counter('freshmo_firestore_unbounded_queries_total', "Queries streamed without limit().",
+                                [({'route': route, 'collection': collection}, count) for (route, collection), count in unbounded])
+        lines += format_counter('freshmo_firestore_read_budget_exceeded_total', "Requests that read more documents than their budget.",
+                                [({'route': route}, count) for route, count in over_budget])
+        return lines
@@ -1,59 +1,203 @@
-from firebase_admin import firestore
-from flask import current_app
+import copy
+import threading
+import time
+import weakref
+from collections import OrderedDict
+
+from flask import current_app, has_app_context
+
+DOCUMENT_ID = '__name__'  # Field path Firestore orders and pages by document ID with
+# Fields a product listing shows; pass as `fields` to skip descriptions, feature lists and the like
+LISTING_FIELDS = ('name', 'category', 'price_excl_vat', 'image_url')
+_MISSING = object()
+
+_default_client = None
+_client_lock = threading.Lock()
+_caches = weakref.WeakKeyDictionary()  # Firestore client -> ReadThroughCache shared by its services
+_caches_lock = threading.Lock()
+
+
+def shared_client():
+    """
+    The Firestore client every FirestoreService uses: the app's (accounted) client inside a Flask
+    app context, otherwise the default Firebase app's client, created once per process.
+    """
+    global _default_client
+    if has_app_context():
+        db = getattr(current_app, 'db', None)
+        if db is not None:
+            return db
+    with _client_lock:
+        if _default_client is None:
+            from firebase_admin import firestore  # Kept out of module import for cold starts
+            _default_client = firestore.client()
+        return _default_client
+
+
+def _mask(fields):
+    """Field mask as a hashable cache-key part (None means whole documents)."""
+    return tuple(sorted(set(fields))) if fields else None
+
+
+def _with_id(snapshot):
+    if not snapshot.exists:
+        return None
+    data = snapshot.to_dict()
+    data['id'] = snapshot.id  # Add document ID to the data
+    return data
+
+
+class ReadThroughCache:
+    """
+    Product reads kept in memory for ttl_seconds, keyed by (kind, ..., field mask).
+    Values are deep-copied in and out, so a caller that edits a product or list it was handed
+    cannot change what other requests read.
+    """
+
+    def __init__(self, ttl_seconds=60, max_entries=512):
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        """Cached value for key, or _MISSING."""
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None and time.time() - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                value = entry[0]
+            else:
+                self.misses += 1
+                return _MISSING
+        return copy.deepcopy(value)  # Outside the lock: copying a long listing should not block other readers
+
+    def put(self, key, value):
+        value = copy.deepcopy(value)
+        with self._lock:
+            self._entries[key] = (value, time.time())
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def invalidate_product(self, product_id):
+        """Drops every cached read of product_id and every cached listing."""
+        with self._lock:
+            for key in [key for key in self._entries if key[0] == 'list' or key[1] == product_id]:
+                del self._entries[key]
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+            }
+
 
 class FirestoreService:
-    def __init__(self):
-        # Ensure Firebase app is initialized before getting the client
-        if not hasattr(current_app, 'db'):
-            # This should ideally be handled during app creation, but as a fallback
-            # or for direct script execution, ensure db is accessible.
-            # In a Flask app context, current_app.db should already be set.
-            # For this service, we'll assume current_app.db is available.
-            pass
-        self.db = firestore.client()
-
-    def get_products(self):
-        """Fetches all products from Firestore."""
-        products_ref = self.db.collection('products')
-        docs = products_ref.stream()
-        products = []
-        for doc in docs:
-            product_data = doc.to_dict()
-            product_data['id'] = doc.id # Add document ID to the data
-            products.append(product_data)
+    """
+    Product and order access on the shared Firestore client (see shared_client()).
+
+    Product reads take an optional field mask (`fields`, e.g. LISTING_FIELDS) so Firestore only
+    sends those fields, and go through a read-through cache shared by every service on the same
+    client. add_product/update_product/delete_product invalidate it; other processes pick up
+    changes within cache_ttl seconds. Order methods are not cached.
+    """
+
+    def __init__(self, db=None, cache_ttl=60):
+        self.db = db if db is not None else shared_client()
+        with _caches_lock:
+            self.cache = _caches.get(self.db)
+            if self.cache is None:
+                self.cache = _caches[self.db] = ReadThroughCache(ttl_seconds=cache_ttl)
+
+    # --- Products ---
+    def get_products(self, fields=None, limit=None, after=None):
+        """
+        Fetches products ordered by ID. `fields` limits each document to those fields; `limit` and
+        `after` (the last product ID of the previous page) page through the collection.
+        """
+        key = ('list', None, _mask(fields), limit, after)
+        cached = self.cache.get(key)
+        if cached is not _MISSING:
+            return cached
+        query = self.db.collection('products').order_by(DOCUMENT_ID)
+        if fields:
+            query = query.select(list(fields))
+        if after:
+            query = query.start_after({DOCUMENT_ID: after})
+        if limit:
+            query = query.limit(limit)
+        products = [_with_id(doc) for doc in query.stream()]
+        self.cache.put(key, products)
         return products
 
-    def get_product_by_id(self, product_id):
-        """Fetches a single product by its ID."""
-        product_ref = self.db.collection('products').document(product_id)
-        doc = product_ref.get()
-        if doc.exists:
-            product_data = doc.to_dict()
-            product_data['id'] = doc.id
-            return product_data
-        return None
+    def get_product_by_id(self, product_id, fields=None):
+        """Fetches a single product by its ID (None if it does not exist)."""
+        key = ('product', product_id, _mask(fields))
+        cached = self.cache.get(key)
+        if cached is not _MISSING:
+            return cached
+        product = _with_id(self.db.collection('products').document(product_id).get(field_paths=fields))
+        self.cache.put(key, product)
+        return product
+
+    def get_products_by_ids(self, product_ids, fields=None):
+        """
+        Fetches several products in one batched read: {product_id: product} for the IDs that exist.
+        Only IDs not already cached are read from Firestore.
+        """
+        mask = _mask(fields)
+        products, missing = {}, []
+        for product_id in dict.fromkeys(product_ids):
+            cached = self.cache.get(('product', product_id, mask))
+            if cached is _MISSING:
+                missing.append(product_id)
+            elif cached is not None:
+                products[product_id] = cached
+        if missing:
+            refs = [self.db.collection('products').document(product_id) for product_id in missing]
+            for snapshot in self.db.get_all(refs, field_paths=fields):
+                product = _with_id(snapshot)
+                self.cache.put(('product', snapshot.id, mask), product)
+                if product is not None:
+                    products[snapshot.id] = product
+        return {product_id: products[product_id] for product_id in product_ids if product_id in products}
 
     def add_product(self, product_data):
         """Adds a new product to Firestore."""
         products_ref = self.db.collection('products')
+        product_data = dict(product_data)
         # Use a specific ID if provided, otherwise let Firestore generate one
         if 'id' in product_data:
             doc_id = product_data.pop('id')
             products_ref.document(doc_id).set(product_data)
-            return doc_id
         else:
-            doc_ref = products_ref.add(product_data)
-            return doc_ref[1].id # Returns the ID of the new document
+            doc_id = products_ref.add(product_data)[1].id
+        self.cache.invalidate_product(doc_id)
+        return doc_id
 
     def update_product(self, product_id, updates):
         """Updates an existing product in Firestore."""
-        product_ref = self.db.collection('products').document(product_id)
-        product_ref.update(updates)
+        self.db.collection('products').document(product_id).update(updates)
+        self.cache.invalidate_product(product_id)
 
     def delete_product(self, product_id):
         """Deletes a product from Firestore."""
         self.db.collection('products').document(product_id).delete()
+        self.cache.invalidate_product(product_id)
 
+    # --- Orders ---
     def add_order(self, order_data):
         """Adds a new order to Firestore."""
         orders_ref = self.db.collection('orders')
@@ -0,0 +1,207 @@
+import threading
+import time
+from urllib.parse import urlsplit
+import requests
+from requests.adapters import HTTPAdapter
+
+# Prometheus-style latency buckets in seconds
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+# RequestExceptions raised before anything is sent (a bad URL or header from our own config):
+# they say nothing about the upstream's health
+LOCAL_REQUEST_ERRORS = (
+    requests.exceptions.URLRequired, requests.exceptions.MissingSchema, requests.exceptions.InvalidSchema,
+    requests.exceptions.InvalidURL, requests.exceptions.InvalidHeader,
+)
+
+
+class CircuitOpenError(requests.exceptions.RequestException):
+    """Raised instead of calling an upstream whose circuit breaker is open."""
+
+
+class CircuitBreaker:
+    """
+    Classic closed -> open -> half-open breaker.
+
+    After failure_threshold consecutive failures the circuit opens and calls fail fast for
+    reset_timeout seconds. Then a single trial call is let through: success closes the
+    circuit, failure opens it again.
+    """
+
+    CLOSED, OPEN, HALF_OPEN = 'closed', 'open', 'half_open'
+
+    def __init__(self, failure_threshold=5, reset_timeout=30.0):
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self.state = self.CLOSED
+        self.consecutive_failures = 0
+        self._opened_at = 0.0
+        self._lock = threading.Lock()
+
+    def allow_request(self):
+        with self._lock:
+            if self.state == self.CLOSED:
+                return True
+            if self.state == self.OPEN and time.monotonic() - self._opened_at >= self.reset_timeout:
+                self.state = self.HALF_OPEN
+                return True  # Let one trial request through
+            return False
+
+    def record_success(self):
+        with self._lock:
+            self.state = self.CLOSED
+            self.consecutive_failures = 0
+
+    def release_trial(self):
+        """Ends a half-open trial call that failed for a local reason: the next call becomes the trial."""
+        with self._lock:
+            if self.state == self.HALF_OPEN:
+                self.state = self.OPEN  # _opened_at is already past reset_timeout
+
+    def record_failure(self):
+        with self._lock:
+            self.consecutive_failures += 1
+            if self.state == self.HALF_OPEN or self.consecutive_failures >= self.failure_threshold:
+                if self.state != self.OPEN:
+                    print(f"Circuit opened after {self.consecutive_failures} consecutive failures. ⚡")
+                self.state = self.OPEN
+                self._opened_at = time.monotonic()
+
+
+class HostStats:
+    """Latency histogram and error counts for one upstream host."""
+
+    def __init__(self):
+        self.bucket_counts = [0] * len(LATENCY_BUCKETS)
+        self.count = 0
+        self.total_seconds = 0.0
+        self.errors = 0
+        self.rejected = 0  # Calls short-circuited by an open breaker
+        self._lock = threading.Lock()
+
+    def observe(self, seconds, error=False):
+        with self._lock:
+            self.count += 1
+            self.total_seconds += seconds
+            if error:
+                self.errors += 1
+            for i, bound in enumerate(LATENCY_BUCKETS):
+                if seconds <= bound:
+                    self.bucket_counts[i] += 1
+                    break
+
+    def snapshot(self):
+        with self._lock:
+            # Cumulative counts, as in a Prometheus histogram
+            cumulative, running = {}, 0
+            for bound, count in zip(LATENCY_BUCKETS, self.bucket_counts):
+                running += count
+                cumulative[bound] = running
+            cumulative['+Inf'] = self.count
+            return {
+                'count': self.count,
+                'sum_seconds': round(self.total_seconds, 6),
+                'errors': self.errors,
+                'rejected': self.rejected,
+                'buckets': cumulative,
+            }
+
+
+class OutboundClient:
+    """
+    One shared client for every outbound HTTP call.
+
+    Keeps a pooled keep-alive requests.Session per host (so repeat calls skip TCP/TLS setup),
+    applies separate connect/read timeouts, guards each host with a CircuitBreaker, and
+    records per-host latency/error histograms.
+    """
+
+    def __init__(self, connect_timeout=3.05, read_timeout=5.0, pool_maxsize=10,
+                 failure_threshold=5, reset_timeout=30.0):
+        self.timeout = (connect_timeout, read_timeout)
+        self.pool_maxsize = pool_maxsize
+        self.failure_threshold = failure_threshold
+        self.reset_timeout = reset_timeout
+        self._sessions = {}
+        self._breakers = {}
+        self._stats = {}
+        self._lock = threading.Lock()
+
+    def _host_state(self, host):
+        with self._lock:
+            if host not in self._sessions:
+                session = requests.Session()
+                adapter = HTTPAdapter(pool_connections=1, pool_maxsize=self.pool_maxsize)
+                session.mount('http://', adapter)
+                session.mount('https://', adapter)
+                self._sessions[host] = session
+            return (self._sessions[host],) + self._guard(host)
+
+    def guard(self, host):
+        """The host's (CircuitBreaker, HostStats); shared with AsyncOutboundClient so both report one circuit per host."""
+        with self._lock:
+            return self._guard(host)
+
+    def _guard(self, host):
+        if host not in self._breakers:
+            self._breakers[host] = CircuitBreaker(self.failure_threshold, self.reset_timeout)
+            self._stats[host] = HostStats()
+        return self._breakers[host], self._stats[host]
+
+    def request(self, method, url, **kwargs):
+        """
+        Sends a request through the host's pooled session.
+        Raises CircuitOpenError (a RequestException) without calling out if the host's circuit is open.
+        """
+        host = urlsplit(url).netloc
+        session, breaker, stats = self._host_state(host)
+        if not breaker.allow_request():
+            with stats._lock:
+                stats.rejected += 1
+            raise CircuitOpenError(f"Circuit open for {host}; skipping call")
+
+        kwargs.setdefault('timeout', self.timeout)
+        started = time.perf_counter()
+        try:
+            response = session.request(method, url, **kwargs)
+        except LOCAL_REQUEST_ERRORS:
+            breaker.release_trial()
+            raise
+        except requests.exceptions.RequestException:
+            stats.observe(time.perf_counter() - started, error=True)
+            breaker.record_failure()
+            raise
+        except BaseException:
+            # Not the upstream's fault (a bug, KeyboardInterrupt, SystemExit), but a half-open
+            # trial must still be settled or the circuit would refuse every later call
+            breaker.release_trial()
+            raise
+
+        # 5xx means the upstream is unhealthy; 4xx is our problem and should not trip the breaker
+        upstream_error = response.status_code >= 500
+        stats.observe(time.perf_counter() - started, error=upstream_error or response.status_code >= 400)
+        if upstream_error:
+            breaker.record_failure()
+        else:
+            breaker.record_success()
+        return response
+
+    def get(self, url, **kwargs):
+        return self.request('GET', url, **kwargs)
+
+    def post(self, url, **kwargs):
+        return self.request('POST', url, **kwargs)
+
+    def stats(self):
+        """Per-host latency histograms, error counts and circuit state."""
+        with self._lock:
+            hosts = list(self._stats)
+        return {
+            host: dict(self._stats[host].snapshot(), circuit=self._breakers[host].state)
+            for host in hosts
+        }
+
+    def close(self):
+        with self._lock:
+            for session in self._sessions.values():
+                session.close()
+            self._sessions.clear()
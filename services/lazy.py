@@ -0,0 +1,35 @@
+import threading
+
+
+class Lazy:
+    """
+    Holds an expensive object that is built by factory() on first use.
+
+    get() is thread-safe and calls the factory at most once (double-checked locking), so concurrent
+    first requests share one instance. If the factory raises, nothing is cached and the next get()
+    tries again. set() replaces the value outright, e.g. with a fake client in benchmarks.
+    """
+
+    def __init__(self, factory):
+        self._factory = factory
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._value = None
+
+    @property
+    def loaded(self):
+        return self._loaded
+
+    def get(self):
+        if self._loaded:
+            return self._value
+        with self._lock:
+            if not self._loaded:
+                self._value = self._factory()
+                self._loaded = True
+        return self._value
+
+    def set(self, value):
+        with self._lock:
+            self._value = value
+            self._loaded = True
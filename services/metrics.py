@@ -0,0 +1,265 @@
+import contextlib
+import functools
+import hmac
+import threading
+import time
+from bisect import bisect_left
+from flask import Response, abort, g, has_request_context, request
+
+# Seconds; the same spread works for page renders, Firestore round trips and upstream APIs
+DEFAULT_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNMATCHED_ROUTE = 'unmatched'  # 404s are grouped so random URLs cannot create new series
+BACKGROUND_ROUTE = 'background'  # Work done outside a request (listeners, the Telegram worker)
+
+
+class Histogram:
+    """Bucketed latency counts. Not locked itself: RequestMetrics guards every histogram with one lock."""
+
+    __slots__ = ('bucket_counts', 'count', 'sum')
+
+    def __init__(self, size):
+        self.bucket_counts = [0] * size
+        self.count = 0
+        self.sum = 0.0
+
+    def observe(self, seconds, bucket_index):
+        if bucket_index < len(self.bucket_counts):
+            self.bucket_counts[bucket_index] += 1
+        self.count += 1
+        self.sum += seconds
+
+    def cumulative(self):
+        running, counts = 0, []
+        for count in self.bucket_counts:
+            running += count
+            counts.append(running)
+        return counts
+
+
+def _escape(value):
+    return str(value).replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _labels(**labels):
+    return '{' + ','.join(f'{key}="{_escape(value)}"' for key, value in labels.items()) + '}' if labels else ''
+
+
+def _format_bound(bound):
+    return '+Inf' if bound == '+Inf' else repr(float(bound))
+
+
+def current_route():
+    """Label for the current request: its URL rule, 'unmatched' for 404s, 'background' outside a request."""
+    if not has_request_context():
+        return BACKGROUND_ROUTE
+    return request.url_rule.rule if request.url_rule is not None else UNMATCHED_ROUTE
+
+
+def format_counter(name, help_text, rows):
+    """Prometheus lines for a counter; rows are (labels dict, value) pairs."""
+    return [f"# HELP {name} {help_text}", f"# TYPE {name} counter"] + [f"{name}{_labels(**labels)} {value}" for labels, value in rows]
+
+
+class RequestMetrics:
+    """
+    In-process request and span timing, exposed at /metrics in the Prometheus text format.
+
+    Every request is timed per URL rule and counted by status. Code inside a request can time a
+    span (a Firestore call, an upstream API, template rendering) with metrics.span('name'); spans
+    are histogrammed per route, and a span that raises counts as an error. Outbound HTTP histograms
+    from app.http and any stats() registered with register_stats() (page cache, notifier, quote
+    cache) are exported alongside. Recording is a perf_counter() pair, a bisect and one short lock,
+    so it is cheap enough to leave on in production; set METRICS_ENABLED=0 to turn it off.
+    /metrics requires "Authorization: Bearer <METRICS_TOKEN>" and is a 404 while no token is set,
+    like the order export.
+    """
+
+    def __init__(self, app=None, buckets=DEFAULT_BUCKETS):
+        self.buckets = tuple(buckets)
+        self.enabled = True
+        self.token = None
+        self.started_at = time.time()
+        self._lock = threading.Lock()
+        self._requests = {}  # (method, route) -> Histogram
+        self._statuses = {}  # (method, route, status) -> count
+        self._spans = {}  # (route, span) -> Histogram
+        self._span_errors = {}  # (route, span) -> count
+        self._stats = []  # (prefix, stats callable, names of counters)
+        self._collectors = []  # Callables returning ready-made exposition lines
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('METRICS_ENABLED', True)
+        self.token = app.config.get('METRICS_TOKEN')
+        app.metrics = self
+        if not self.enabled:
+            return
+        app.before_request(self._start_request)
+        app.after_request(self._finish_request)
+        app.jinja_env.template_class = _timed_template_class(self, app.jinja_env.template_class)
+        app.add_url_rule('/metrics', endpoint='metrics', view_func=self.serve)
+
+    # --- Recording ---
+    def _observe(self, table, key, seconds):
+        index = bisect_left(self.buckets, seconds)
+        with self._lock:
+            histogram = table.get(key)
+            if histogram is None:
+                histogram = table[key] = Histogram(len(self.buckets))
+            histogram.observe(seconds, index)
+
+    def _start_request(self):
+        g._metrics_started = time.perf_counter()
+
+    def _finish_request(self, response):
+        started = g.pop('_metrics_started', None)
+        if started is not None:
+            route = current_route()
+            self._observe(self._requests, (request.method, route), time.perf_counter() - started)
+            key = (request.method, route, response.status_code)
+            with self._lock:
+                self._statuses[key] = self._statuses.get(key, 0) + 1
+        return response
+
+    def observe_span(self, name, seconds, error=False):
+        key = (current_route(), name)
+        self._observe(self._spans, key, seconds)
+        if error:
+            with self._lock:
+                self._span_errors[key] = self._span_errors.get(key, 0) + 1
+
+    @contextlib.contextmanager
+    def span(self, name):
+        """Times the enclosed block as span `name` of the current route."""
+        if not self.enabled:
+            yield
+            return
+        started = time.perf_counter()
+        try:
+            yield
+        except BaseException:
+            self.observe_span(name, time.perf_counter() - started, error=True)
+            raise
+        self.observe_span(name, time.perf_counter() - started)
+
+    def timed(self, name):
+        """Decorator form of span(): every call of the function is timed as span `name`."""
+        def decorator(fn):
+            @functools.wraps(fn)
+            def wrapper(*args, **kwargs):
+                with self.span(name):
+                    return fn(*args, **kwargs)
+            return wrapper
+        return decorator
+
+    def register_stats(self, prefix, stats, counters=()):
+        """Exports every numeric value of stats() as freshmo_<prefix>_<key>; keys in counters become _total counters."""
+        self._stats.append((prefix, stats, frozenset(counters)))
+
+    def register_collector(self, collector):
+        """Adds collector() -- a list of Prometheus text lines -- to every /metrics response."""
+        self._collectors.append(collector)
+
+    # --- Exposition ---
+    def _histogram_lines(self, name, help_text, table, label_names):
+        lines = [f"# HELP {name} {help_text}", f"# TYPE {name} histogram"]
+        with self._lock:
+            rows = [(key, histogram.cumulative(), histogram.count, histogram.sum) for key, histogram in sorted(table.items())]
+        for key, cumulative, count, total in rows:
+            labels = dict(zip(label_names, key))
+            for bound, running in zip(self.buckets, cumulative):
+                lines.append(f"{name}_bucket{_labels(**labels, le=_format_bound(bound))} {running}")
+            lines.append(f"{name}_bucket{_labels(**labels, le='+Inf')} {count}")
+            lines.append(f"{name}_sum{_labels(**labels)} {total:.6f}")
+            lines.append(f"{name}_count{_labels(**labels)} {count}")
+        return lines
+
+    def _counter_lines(self, name, help_text, table, label_names):
+        with self._lock:
+            rows = sorted(table.items())
+        return format_counter(name, help_text, [(dict(zip(label_names, key)), value) for key, value in rows])
+
+    def _upstream_lines(self):
+        """Per-host histograms kept by the outbound HTTP client (only once it has been created)."""
+        lazy_http = getattr(self.app, 'lazy_http', None)
+        if lazy_http is None or not lazy_http.loaded or not hasattr(self.app.http, 'stats'):
+            return []
+        hosts = self.app.http.stats()
+        name = 'freshmo_upstream_request_duration_seconds'
+        lines = [f"# HELP {name} Outbound HTTP request latency by host.", f"# TYPE {name} histogram"]
+        for host, stats in sorted(hosts.items()):
+            for bound, running in stats['buckets'].items():
+                lines.append(f"{name}_bucket{_labels(host=host, le=_format_bound(bound))} {running}")
+            lines.append(f"{name}_sum{_labels(host=host)} {stats['sum_seconds']}")
+            lines.append(f"{name}_count{_labels(host=host)} {stats['count']}")
+        for metric, key, kind, help_text in (
+            ('freshmo_upstream_errors_total', 'errors', 'counter', 'Outbound HTTP calls that failed or returned an error status.'),
+            ('freshmo_upstream_rejected_total', 'rejected', 'counter', 'Outbound HTTP calls skipped by an open circuit breaker.'),
+        ):
+            lines += [f"# HELP {metric} {help_text}", f"# TYPE {metric} {kind}"]
+            lines += [f"{metric}{_labels(host=host)} {stats[key]}" for host, stats in sorted(hosts.items())]
+        lines += ["# HELP freshmo_upstream_circuit_open 1 while the host's circuit breaker is open.",
+                  "# TYPE freshmo_upstream_circuit_open gauge"]
+        lines += [f"freshmo_upstream_circuit_open{_labels(host=host)} {int(stats['circuit'] == 'open')}"
+                  for host, stats in sorted(hosts.items())]
+        return lines
+
+    def _stats_lines(self):
+        lines = []
+        for prefix, stats, counters in self._stats:
+            try:
+                values = stats()
+            except Exception as e:
+                print(f"Could not collect {prefix} stats for /metrics: {e} 😞")
+                continue
+            for key, value in values.items():
+                if isinstance(value, bool) or not isinstance(value, (int, float)):
+                    continue
+                kind = 'counter' if key in counters else 'gauge'
+                name = f"freshmo_{prefix}_{key}" + ('_total' if kind == 'counter' else '')
+                lines += [f"# TYPE {name} {kind}", f"{name} {value}"]
+        return lines
+
+    def render(self):
+        lines = ["# HELP freshmo_process_start_time_seconds Unix time the app was created.",
+                 "# TYPE freshmo_process_start_time_seconds gauge",
+                 f"freshmo_process_start_time_seconds {self.started_at:.3f}"]
+        lines += self._histogram_lines('freshmo_request_duration_seconds', "Request latency by route.",
+                                       self._requests, ('method', 'route'))
+        lines += self._counter_lines('freshmo_requests_total', "Responses by route and status.",
+                                     self._statuses, ('method', 'route', 'status'))
+        lines += self._histogram_lines('freshmo_span_duration_seconds', "Time spent in Firestore, upstream and render spans by route.",
+                                       self._spans, ('route', 'span'))
+        lines += self._counter_lines('freshmo_span_errors_total', "Spans that raised, by route.",
+                                     self._span_errors, ('route', 'span'))
+        lines += self._upstream_lines()
+        lines += self._stats_lines()
+        for collector in self._collectors:
+            lines += collector()
+        return '\n'.join(lines) + '\n'
+
+    def serve(self):
+        if not self.token:
+            abort(404)
+        supplied = request.headers.get('Authorization', '')
+        if not hmac.compare_digest(supplied.encode(), f"Bearer {self.token}".encode()):
+            abort(401)
+        return Response(self.render(), mimetype=None, content_type=PROMETHEUS_CONTENT_TYPE,
+                        headers={'Cache-Control': 'no-store'})
+
+
+def _timed_template_class(metrics, base):
+    """Template class whose top-level render() is recorded as the 'jinja.render' span."""
+
+    class TimedTemplate(base):
+        def render(self, *args, **kwargs):
+            started = time.perf_counter()
+            try:
+                return super().render(*args, **kwargs)
+            finally:
+                metrics.observe_span('jinja.render', time.perf_counter() - started)
+
+    return TimedTemplate
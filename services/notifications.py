@@ -0,0 +1,215 @@
+import atexit
+import queue
+import threading
+import time
+from collections import deque
+
+# Telegram rejects messages longer than this
+TELEGRAM_MAX_MESSAGE_LENGTH = 4096
+DIGEST_SEPARATOR = "\n\n════════════════════\n\n"
+
+_STOP = object()
+
+
+class TelegramNotifier:
+    """
+    Sends Telegram messages from a background thread so request handlers only enqueue.
+
+    - Failed sends are retried with exponential backoff (honouring Telegram's retry_after on 429).
+    - Sends are spaced at least min_interval seconds apart to stay under the per-chat rate limit
+      (roughly 1 msg/s for private chats, 20 msg/min for groups).
+    - When the queue backs up past digest_threshold, queued messages are coalesced into one digest.
+
+    With synchronous=True, enqueue() sends on the calling thread and returns once Telegram has
+    answered (or the retries ran out), as the shop did before the worker. That is the mode for
+    serverless hosts (Vercel), which freeze threads once the response is sent: a queued message
+    could sit there until the instance is reclaimed and be lost.
+    """
+
+    def __init__(self, api_url, chat_id, min_interval=None, max_retries=5, backoff_base=1.0, backoff_max=60.0,
+                 digest_threshold=5, max_digest_size=10, timeout=None, http_client=None, synchronous=False):
+        self.api_url = api_url
+        self.chat_id = chat_id
+        if min_interval is None:
+            # Negative chat ids are groups, which Telegram limits to 20 messages per minute
+            min_interval = 3.0 if str(chat_id).startswith('-') else 1.0
+        self.min_interval = min_interval
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.digest_threshold = digest_threshold
+        self.max_digest_size = max_digest_size
+        self.timeout = timeout  # None = the HTTP client's default connect/read timeouts
+        self.http_client = http_client
+        self.synchronous = synchronous
+
+        self._queue = queue.Queue()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._send_lock = threading.Lock()  # Keeps synchronous sends apart for the rate limit
+        self._last_send = 0.0
+        self._latencies = deque(maxlen=100)  # Seconds per successful send, most recent last
+        self.dead_letters = deque(maxlen=100)  # Messages that exhausted their retries
+        self.sent = 0
+        self.failed = 0
+        self.retries = 0
+        self.digests = 0
+        atexit.register(self.stop)
+
+    # --- Request path ---
+    def enqueue(self, message_text, parse_mode='Markdown'):
+        """Queues a message for delivery and returns immediately (sends it first when synchronous)."""
+        if self.synchronous:
+            with self._send_lock:
+                try:
+                    self._deliver(message_text, parse_mode)
+                except Exception as e:
+                    print(f"Telegram send error: {e} 😢")
+            return
+        self._ensure_worker()
+        self._queue.put((message_text, parse_mode, time.time()))
+
+    def flush(self, timeout=None):
+        """Blocks until every queued message has been handled (sent or given up on)."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while self._queue.unfinished_tasks:
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=10):
+        """Flushes pending messages and stops the worker thread."""
+        if self._thread and self._thread.is_alive():
+            self.flush(timeout)
+            self._queue.put(_STOP)
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Queue depth and delivery counters for monitoring."""
+        latencies = list(self._latencies)
+        return {
+            'queue_depth': self._queue.qsize(),
+            'sent': self.sent,
+            'failed': self.failed,
+            'retries': self.retries,
+            'digests': self.digests,
+            'last_send_ms': round(latencies[-1] * 1000, 1) if latencies else None,
+            'avg_send_ms': round(sum(latencies) / len(latencies) * 1000, 1) if latencies else None,
+        }
+
+    # --- Worker ---
+    def _ensure_worker(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name='telegram-notifier', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            item = self._queue.get()
+            if item is _STOP:
+                self._queue.task_done()
+                return
+            batch = [item]
+            # Coalesce a backlog into a single digest instead of sending message by message
+            if self._queue.qsize() + 1 >= self.digest_threshold:
+                while len(batch) < self.max_digest_size:
+                    try:
+                        next_item = self._queue.get_nowait()
+                    except queue.Empty:
+                        break
+                    if next_item is _STOP:
+                        self._queue.put(_STOP)
+                        self._queue.task_done()
+                        break
+                    batch.append(next_item)
+            try:
+                for text, parse_mode in self._build_messages(batch):
+                    self._deliver(text, parse_mode)
+            except Exception as e:
+                print(f"Telegram worker error: {e} 😢")
+            finally:
+                for _ in batch:
+                    self._queue.task_done()
+
+    def _build_messages(self, batch):
+        if len(batch) == 1:
+            text, parse_mode, _ = batch[0]
+            return [(text, parse_mode)]
+
+        self.digests += 1
+        parse_mode = batch[0][1] if all(item[1] == batch[0][1] for item in batch) else None
+        header = f"🗂️ Digest of {len(batch)} notifications\n\n"
+        messages, current = [], header
+        for text, _, _ in batch:
+            chunk = text if current == header else DIGEST_SEPARATOR + text
+            if len(current) + len(chunk) > TELEGRAM_MAX_MESSAGE_LENGTH and current != header:
+                messages.append((current, parse_mode))
+                current, chunk = header, text
+            current += chunk
+        messages.append((current[:TELEGRAM_MAX_MESSAGE_LENGTH], parse_mode))
+        return messages
+
+    def _deliver(self, text, parse_mode):
+        import requests  # Loaded by the worker on first send rather than at app import
+
+        payload = {'chat_id': self.chat_id, 'text': text}
+        if parse_mode:
+            payload['parse_mode'] = parse_mode
+
+        for attempt in range(self.max_retries + 1):
+            # Stay under the per-chat rate limit
+            wait = self._last_send + self.min_interval - time.monotonic()
+            if wait > 0:
+                time.sleep(wait)
+
+            retry_after = None
+            started = time.monotonic()
+            try:
+                response = self._post(payload)
+                self._last_send = time.monotonic()
+                if response.status_code == 429:
+                    retry_after = response.json().get('parameters', {}).get('retry_after')
+                    raise requests.exceptions.HTTPError(f"429 Too Many Requests (retry after {retry_after}s)")
+                if response.status_code == 400 and 'parse_mode' in payload:
+                    # Usually unbalanced Markdown in customer input: resend as plain text
+                    print(f"Telegram rejected Markdown ({response.text}); resending as plain text.")
+                    payload.pop('parse_mode')
+                    self.retries += 1
+                    continue
+                if 400 <= response.status_code < 500:
+                    # Bad token, unknown chat, etc. Retrying will not help.
+                    self._give_up(text, f"{response.status_code} {response.text}", attempt)
+                    return False
+                response.raise_for_status()
+                self._latencies.append(time.monotonic() - started)
+                self.sent += 1
+                print("Telegram notification sent successfully! 🎉")
+                return True
+            except requests.exceptions.RequestException as e:
+                self._last_send = time.monotonic()
+                if attempt >= self.max_retries:
+                    self._give_up(text, e, attempt)
+                    return False
+                self.retries += 1
+                delay = retry_after if retry_after else min(self.backoff_max, self.backoff_base * (2 ** attempt))
+                print(f"Telegram send failed ({e}); retrying in {delay:.1f}s ⏳")
+                time.sleep(delay)
+        return False
+
+    def _give_up(self, text, error, attempt):
+        self.failed += 1
+        self.dead_letters.append(text)
+        print(f"Failed to send Telegram notification after {attempt + 1} attempts: {error} 😢")
+
+    def _post(self, payload):
+        kwargs = {'timeout': self.timeout} if self.timeout else {}
+        # http_client may be a zero-argument callable, so a lazily built client is only created when needed
+        http_client = self.http_client() if callable(self.http_client) else self.http_client
+        if http_client:
+            return http_client.post(self.api_url, json=payload, **kwargs)
+        import requests
+        return requests.post(self.api_url, json=payload, timeout=self.timeout or 5)
@@ -0,0 +1,99 @@
+import csv
+import io
+import json
+from datetime import date, timedelta
+
+# Spreadsheet columns for CSV exports; NDJSON exports carry the whole order document
+CSV_COLUMNS = (
+    'id', 'order_number', 'timestamp', 'status', 'customer_name', 'customer_phone', 'delivery_type', 'address',
+    'payment_method', 'items', 'subtotal_excl_vat', 'total_vat_amount', 'delivery_charge', 'grand_total_incl_vat',
+    'special_note',
+)
+FORMATS = {'csv': 'text/csv; charset=utf-8', 'ndjson': 'application/x-ndjson'}
+
+
+def parse_day(value, field):
+    """'YYYY-MM-DD' -> date; raises ValueError naming the field."""
+    try:
+        return date.fromisoformat(value)
+    except (TypeError, ValueError):
+        raise ValueError(f"{field} must be a date like 2025-01-31")
+
+
+def iter_orders(db, since=None, until=None, status=None, after=None, page_size=500, on_page=None):
+    """
+    Yields (doc_id, order) for orders placed on or after `since` and up to and including `until` (dates),
+    oldest first, optionally only those with `status`. Filters run in Firestore; results are read one
+    page of page_size at a time with limit() + start_after(), so memory stays flat however many orders
+    there are. `after` resumes after that document ID (checked before anything is yielded, so a bad
+    cursor raises ValueError straight away); on_page(last_doc_id) is called after each page.
+    """
+    from firebase_admin import firestore
+
+    query = db.collection('orders')
+    if status:
+        query = query.where(filter=firestore.FieldFilter('status', '==', status))
+    # Order timestamps are ISO strings, so a date range is a string range
+    if since:
+        query = query.where(filter=firestore.FieldFilter('timestamp', '>=', since.isoformat()))
+    if until:
+        query = query.where(filter=firestore.FieldFilter('timestamp', '<', (until + timedelta(days=1)).isoformat()))
+    query = query.order_by('timestamp')
+
+    cursor = None
+    if after:
+        if '/' in after:
+            raise ValueError(f"Cursor {after!r} is not an order ID")
+        cursor = db.collection('orders').document(after).get()
+        if not cursor.exists:
+            raise ValueError(f"Cursor {after!r} does not match an order")
+    return _pages(query, cursor, page_size, on_page)
+
+
+def _pages(query, cursor, page_size, on_page):
+    while True:
+        page = query.limit(page_size)
+        if cursor is not None:
+            page = page.start_after(cursor)
+        snapshots = list(page.stream())
+        for snapshot in snapshots:
+            yield snapshot.id, snapshot.to_dict()
+        if snapshots:
+            cursor = snapshots[-1]
+            if on_page is not None:
+                on_page(cursor.id)
+        if len(snapshots) < page_size:
+            return
+
+
+def csv_row(doc_id, order):
+    customer = order.get('customer_details') or {}
+    items = '; '.join(f"{item.get('quantity')}x {item.get('name')}" for item in order.get('cart_items') or [])
+    values = {
+        'id': doc_id, 'customer_name': customer.get('name'), 'customer_phone': customer.get('phone'),
+        'delivery_type': customer.get('delivery_type'), 'address': customer.get('address'), 'items': items,
+    }
+    return [values[column] if column in values else order.get(column) for column in CSV_COLUMNS]
+
+
+def format_orders(orders, fmt, header=True):
+    """Turns (doc_id, order) pairs into CSV or NDJSON text chunks, one order per chunk."""
+    if fmt == 'ndjson':
+        for doc_id, order in orders:
+            yield json.dumps(dict(order, id=doc_id), default=str, ensure_ascii=False) + '\n'
+        return
+    buffer = io.StringIO()
+    writer = csv.writer(buffer)
+
+    def take():
+        text = buffer.getvalue()
+        buffer.seek(0)
+        buffer.truncate()
+        return text
+
+    if header:
+        writer.writerow(CSV_COLUMNS)
+        yield take()
+    for doc_id, order in orders:
+        writer.writerow(csv_row(doc_id, order))
+        yield take()
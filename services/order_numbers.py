@@ -0,0 +1,176 @@
+import asyncio
+import threading
+
+# The counter lives in its own tiny document so allocating a number never touches 'orders'.
+COUNTER_COLLECTION = 'counters'
+COUNTER_DOCUMENT = 'orders'
+
+
+def _reserve_block_in(transaction, counter_ref, block_size, seed=None):
+    """
+    Atomically advances the order counter by block_size and returns the first reserved number.
+    Returns None if the counter document does not exist yet and no seed was supplied.
+    """
+    return _advance_counter(transaction, counter_ref, counter_ref.get(transaction=transaction), block_size, seed)
+
+
+async def _reserve_block_in_async(transaction, counter_ref, block_size, seed=None):
+    """_reserve_block_in for the AsyncClient."""
+    return _advance_counter(transaction, counter_ref, await counter_ref.get(transaction=transaction), block_size, seed)
+
+
+def _advance_counter(transaction, counter_ref, snapshot, block_size, seed):
+    from firebase_admin import firestore
+
+    if snapshot.exists:
+        last_order_number = int(snapshot.to_dict().get('last_order_number', 0))
+    elif seed is not None:
+        last_order_number = seed
+    else:
+        return None
+
+    transaction.set(counter_ref, {
+        'last_order_number': last_order_number + block_size,
+        'updated_at': firestore.SERVER_TIMESTAMP
+    })
+    return last_order_number + 1
+
+
+def _reserve_block(transaction, counter_ref, block_size, seed=None):
+    """_reserve_block_in run as a retrying Firestore transaction. firebase_admin is imported on first use."""
+    from firebase_admin import firestore
+    return firestore.transactional(_reserve_block_in)(transaction, counter_ref, block_size, seed)
+
+
+async def _reserve_block_async(transaction, counter_ref, block_size, seed=None):
+    """_reserve_block_in_async run as a retrying transaction of the AsyncClient."""
+    from google.cloud.firestore import async_transactional
+    return await async_transactional(_reserve_block_in_async)(transaction, counter_ref, block_size, seed)
+
+
+def scan_max_order_number(db):
+    """
+    Finds the highest order_number by walking the whole 'orders' collection.
+    This is O(number of orders) and is only used once, to seed a missing counter document.
+    """
+    max_order_number = 0
+    for order_doc in db.collection('orders').stream():
+        order_data = order_doc.to_dict()
+        if 'order_number' in order_data:
+            try:
+                max_order_number = max(max_order_number, int(order_data['order_number']))
+            except ValueError:
+                # Handle cases where order_number might not be a valid integer
+                continue
+    return max_order_number
+
+
+async def scan_max_order_number_async(db):
+    """scan_max_order_number for the AsyncClient."""
+    max_order_number = 0
+    async for order_doc in db.collection('orders').stream():
+        order_data = order_doc.to_dict()
+        if 'order_number' in order_data:
+            try:
+                max_order_number = max(max_order_number, int(order_data['order_number']))
+            except ValueError:
+                continue
+    return max_order_number
+
+
+class OrderNumberAllocator:
+    """
+    Hands out unique, increasing order numbers.
+
+    Each worker leases a block of numbers from a Firestore counter document in one transaction
+    and serves checkouts from that block in memory, so only one checkout per block pays a
+    Firestore round trip. Numbers are unique across workers but may have gaps (an unused
+    block tail is lost when a worker shuts down).
+
+    allocate_async() is the same for the async checkout, through the AsyncClient from get_async_db.
+    A process uses one or the other: they share the leased block but not a lock.
+    """
+
+    def __init__(self, get_db, block_size=10, get_async_db=None):
+        self._get_db = get_db  # Callable returning the Firestore client (or None)
+        self._get_async_db = get_async_db  # Callable returning the AsyncClient (or None)
+        self.block_size = max(1, int(block_size))
+        self._lock = threading.Lock()
+        self._async_lock = None  # asyncio.Lock, created on the event loop by the first allocate_async()
+        self._next_number = 0  # Next number to hand out from the leased block
+        self._block_end = 0  # First number past the leased block
+        self.last_order_number = 0  # Highest number handed out by this process
+
+    def next_order_number(self):
+        """Returns the next order number as a zero-padded string, e.g. '0042'."""
+        return self.allocate()[0]
+
+    def allocate(self):
+        """
+        Returns (order_number, leased). leased is True when the number came from a Firestore block and is
+        unique across workers; numbers from the in-memory fallback (Firestore unreachable) are not.
+        """
+        with self._lock:
+            leased = False
+            db = self._get_db()
+            if db:
+                try:
+                    if self._next_number >= self._block_end:
+                        self._next_number = self._lease_block(db)
+                        self._block_end = self._next_number + self.block_size
+                    number = self._next_number
+                    self._next_number += 1
+                    leased = True
+                except Exception as e:
+                    print(f"Error generating order number from Firestore: {e} 😢. Falling back to in-memory simulation.")
+                    number = self.last_order_number + 1
+            else:
+                # In-memory order number simulation
+                number = self.last_order_number + 1
+
+            return self._issue(number, leased)
+
+    async def allocate_async(self):
+        """allocate() for coroutines: while one checkout waits on a lease, the event loop serves the others."""
+        if self._async_lock is None:
+            self._async_lock = asyncio.Lock()
+        async with self._async_lock:
+            leased = False
+            db = self._get_async_db() if self._get_async_db else None
+            if db:
+                try:
+                    if self._next_number >= self._block_end:
+                        self._next_number = await self._lease_block_async(db)
+                        self._block_end = self._next_number + self.block_size
+                    number = self._next_number
+                    self._next_number += 1
+                    leased = True
+                except Exception as e:
+                    print(f"Error generating order number from Firestore: {e} 😢. Falling back to in-memory simulation.")
+                    number = self.last_order_number + 1
+            else:
+                number = self.last_order_number + 1
+            return self._issue(number, leased)
+
+    def _issue(self, number, leased):
+        self.last_order_number = max(self.last_order_number, number)
+        return f"{number:04d}", leased
+
+    def _lease_block(self, db):
+        counter_ref = db.collection(COUNTER_COLLECTION).document(COUNTER_DOCUMENT)
+        start = _reserve_block(db.transaction(), counter_ref, self.block_size)
+        if start is None:
+            # First run against an existing order history: seed the counter from the current maximum.
+            seed = scan_max_order_number(db)
+            print(f"Seeding order counter at {seed} from existing orders. 🌱")
+            start = _reserve_block(db.transaction(), counter_ref, self.block_size, seed)
+        return start
+
+    async def _lease_block_async(self, db):
+        counter_ref = db.collection(COUNTER_COLLECTION).document(COUNTER_DOCUMENT)
+        start = await _reserve_block_async(db.transaction(), counter_ref, self.block_size)
+        if start is None:
+            seed = await scan_max_order_number_async(db)
+            print(f"Seeding order counter at {seed} from existing orders. 🌱")
+            start = await _reserve_block_async(db.transaction(), counter_ref, self.block_size, seed)
+        return start
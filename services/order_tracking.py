@@ -0,0 +1,136 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+
+# Fields of an order shown to someone who gives both its order number and the phone it was placed
+# with: no name, address or note.
+_SUMMARY_FIELDS = ('order_number', 'status', 'timestamp', 'payment_method', 'delivery_charge', 'grand_total_incl_vat')
+_MISSING = object()
+
+
+def normalize_phone(phone):
+    """
+    Reduces a South African phone number to its national digits so every spelling shares one key.
+    e.g. "+27 71 234 5678", "071-234-5678" and "27712345678" -> "0712345678"
+    """
+    digits = re.sub(r'\D+', '', phone or '')
+    if digits.startswith('27') and len(digits) == 11:
+        digits = '0' + digits[2:]
+    return digits
+
+
+def index_fields(order_data):
+    """Lookup fields stored on every new order: the normalised 'customer_phone' a tracking lookup must match."""
+    phone = normalize_phone((order_data.get('customer_details') or {}).get('phone'))
+    return {'customer_phone': phone} if phone else {}
+
+
+def summarize_order(order_data):
+    summary = {field: order_data.get(field) for field in _SUMMARY_FIELDS}
+    summary['delivery_type'] = (order_data.get('customer_details') or {}).get('delivery_type')
+    summary['items'] = [{'name': item.get('name'), 'quantity': item.get('quantity')}
+                        for item in order_data.get('cart_items') or []]
+    return summary
+
+
+def _phone_matches(order_data, phone):
+    stored = order_data.get('customer_phone') or normalize_phone((order_data.get('customer_details') or {}).get('phone'))
+    return stored == phone
+
+
+class OrderTracker:
+    """
+    Order status lookups by order number plus the phone number the order was placed with.
+
+    Order numbers are sequential, so a number alone is easy to guess; a lookup only returns an
+    order whose phone matches as well, and a wrong phone looks exactly like an unknown number.
+    New orders are stored under their order number as document ID, so tracking one is a document
+    get. Orders written before that (auto-generated IDs) are found with an equality query on
+    'order_number' limited to one document. Results, including "not found", are kept in a small
+    LRU for ttl_seconds so refreshing the tracking page does not read Firestore again; remember()
+    puts a just-placed order in the cache, since the write journal may not have written it yet.
+    """
+
+    def __init__(self, get_db, ttl_seconds=30, max_entries=1024):
+        self._get_db = get_db  # Callable returning the Firestore client (or None)
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self._entries = OrderedDict()  # key -> (value, stored_at)
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def document_id(order_number, leased):
+        """Document ID for a new order: its number when unique across workers, else an auto ID (None)."""
+        return order_number if leased else None
+
+    # --- Lookups ---
+    def find(self, order_number, phone):
+        """Summary of the order with this number if it was placed with this phone number, else None."""
+        order_number = (order_number or '').strip().lstrip('#')
+        phone = normalize_phone(phone)
+        if not order_number.isdigit() or not phone:
+            return None  # Order numbers are digits; anything else could name another Firestore path
+        order_number = f"{int(order_number):04d}"  # "42" and "0042" are the same order
+        order = self._cached(('number', order_number), lambda: self._load_by_number(order_number))
+        if order is None or not _phone_matches(order, phone):
+            return None
+        return summarize_order(order)
+
+    def remember(self, order_data):
+        """Caches a just-placed order so it can be tracked before its journaled write reaches Firestore."""
+        with self._lock:
+            self._store(('number', order_data['order_number']), order_data)
+
+    def _load_by_number(self, order_number):
+        from firebase_admin import firestore  # Only needed once a lookup reaches Firestore
+
+        db = self._get_db()
+        if not db:
+            return None
+        snapshot = db.collection('orders').document(order_number).get()
+        if snapshot.exists:
+            return snapshot.to_dict()
+        # Orders placed before order numbers became document IDs
+        query = db.collection('orders').where(filter=firestore.FieldFilter('order_number', '==', order_number)).limit(1)
+        for snapshot in query.stream():
+            return snapshot.to_dict()
+        return None
+
+    # --- Cache ---
+    def _cached(self, key, load):
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return entry[0]
+            self.misses += 1
+        value = load()
+        with self._lock:
+            self._store(key, value)
+        return value
+
+    def _store(self, key, value):
+        self._entries[key] = (value, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Hit/miss counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+            }
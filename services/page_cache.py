@@ -0,0 +1,137 @@
+import functools
+import glob
+import hashlib
+import os
+import threading
+from collections import OrderedDict
+from datetime import datetime
+from flask import current_app, make_response, request
+
+# Build outputs that change the rendered HTML (hashed URLs, srcsets, font links)
+_BUILD_MANIFESTS = ('dist/manifest.json', 'derived/images.json', 'fonts/fonts.json')
+
+
+class PageCache:
+    """
+    Full-response cache for GET pages whose HTML depends only on the deploy and the catalog.
+
+    Entries are keyed by path + query string, a fingerprint of the templates and build manifests,
+    an optional per-view version (e.g. the catalog version) and the footer year. The ETag is derived
+    from that key, so a matching If-None-Match is answered with 304 before anything is rendered,
+    even by a worker that has never rendered the page. Requests for which bypass() returns True
+    (flashed messages, a non-empty cart) are rendered normally and never stored.
+    """
+
+    def __init__(self, app=None, max_entries=256, bypass=None):
+        self.max_entries = max_entries
+        self.bypass = bypass
+        self.enabled = True
+        self._entries = OrderedDict()  # key -> (etag, body, mimetype), least recently used first
+        self._lock = threading.Lock()
+        self._template_version = None
+        self._template_stamp = None
+        self.hits = self.misses = self.not_modified = self.bypassed = 0
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        self.enabled = app.config.get('PAGE_CACHE_ENABLED', True)
+        self.max_entries = app.config.get('PAGE_CACHE_MAX_ENTRIES', self.max_entries)
+        app.page_cache = self
+
+    # --- Versioning ---
+    def _source_files(self):
+        files = sorted(glob.glob(os.path.join(self.app.root_path, self.app.template_folder, '**', '*'), recursive=True))
+        files += [os.path.join(self.app.static_folder, name) for name in _BUILD_MANIFESTS]
+        return [path for path in files if os.path.isfile(path)]
+
+    def template_version(self):
+        """Fingerprint of every template and build manifest. Re-checked per request only when templates auto-reload."""
+        if self._template_version is not None and not self.app.jinja_env.auto_reload:
+            return self._template_version
+        files = self._source_files()
+        stamp = tuple((path, os.stat(path).st_mtime_ns) for path in files)
+        if stamp != self._template_stamp:
+            digest = hashlib.sha256()
+            for path in files:
+                digest.update(path.encode())
+                with open(path, 'rb') as f:
+                    digest.update(f.read())
+            self._template_version = digest.hexdigest()[:16]
+            self._template_stamp = stamp
+        return self._template_version
+
+    def key_for(self, version=''):
+        return '|'.join((request.full_path, self.template_version(), str(version), str(datetime.now().year)))
+
+    @staticmethod
+    def etag_for(key):
+        return hashlib.sha256(key.encode()).hexdigest()[:32]
+
+    # --- Serving ---
+    def serve(self, view, args, kwargs, version=None):
+        if not self.enabled or request.method != 'GET' or (self.bypass is not None and self.bypass()):
+            with self._lock:
+                self.bypassed += 1
+            return view(*args, **kwargs)
+
+        key = self.key_for(version() if version else '')
+        etag = self.etag_for(key)
+        if request.if_none_match.contains(etag):
+            with self._lock:
+                self.not_modified += 1
+            return self._finish(make_response('', 304), etag)
+
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is not None:
+                self._entries.move_to_end(key)
+                self.hits += 1
+            else:
+                self.misses += 1
+        if entry is not None:
+            _, body, mimetype = entry
+            return self._finish(make_response(body, 200, {'Content-Type': mimetype}), etag)
+
+        response = make_response(view(*args, **kwargs))
+        if response.status_code != 200 or response.direct_passthrough:
+            return response
+        with self._lock:
+            self._entries[key] = (etag, response.get_data(), response.headers.get('Content-Type'))
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return self._finish(response, etag)
+
+    @staticmethod
+    def _finish(response, etag):
+        response.set_etag(etag)
+        # Browsers may keep the page but must revalidate, which costs a 304 and no rendering
+        response.cache_control.no_cache = True
+        return response
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        with self._lock:
+            return {'entries': len(self._entries), 'hits': self.hits, 'misses': self.misses,
+                    'not_modified': self.not_modified, 'bypassed': self.bypassed}
+
+
+def cached_page(version=None):
+    """
+    Serves a GET view through current_app.page_cache. version is an optional callable whose value is
+    part of the cache key (e.g. lambda: current_app.catalog.version). Without a page cache the view runs as-is.
+    """
+    def decorator(view):
+        @functools.wraps(view)
+        def wrapper(*args, **kwargs):
+            cache = getattr(current_app, 'page_cache', None)
+            if cache is None:
+                return view(*args, **kwargs)
+            return cache.serve(view, args, kwargs, version=version)
+        return wrapper
+    return decorator
@@ -0,0 +1,92 @@
+from dataclasses import dataclass, replace
+from decimal import Decimal, ROUND_HALF_UP
+
+
+def to_cents(amount):
+    """Converts a rand amount (float/str/Decimal) to integer cents, rounding half up."""
+    return int((Decimal(str(amount)) * 100).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def to_rands(cents):
+    """Integer cents -> float rands, for templates, Firestore documents and Telegram messages."""
+    return cents / 100
+
+
+def vat_basis_points(vat_rate):
+    """0.15 -> 1500, so VAT can be applied with integer arithmetic."""
+    return int((Decimal(str(vat_rate)) * 10000).quantize(Decimal('1'), rounding=ROUND_HALF_UP))
+
+
+def unit_vat_cents(price_excl_vat_cents, vat_bp):
+    """VAT on one unit, rounded half up to the cent."""
+    return (price_excl_vat_cents * vat_bp + 5000) // 10000
+
+
+@dataclass(frozen=True)
+class CartTotals:
+    """Priced cart: display lines plus totals, all derived from integer cents."""
+    lines: tuple
+    subtotal_excl_vat_cents: int = 0
+    vat_cents: int = 0
+    delivery_cents: int = 0
+
+    @property
+    def subtotal_excl_vat(self):
+        return to_rands(self.subtotal_excl_vat_cents)
+
+    @property
+    def total_vat_amount(self):
+        return to_rands(self.vat_cents)
+
+    @property
+    def delivery_charge(self):
+        return to_rands(self.delivery_cents)
+
+    @property
+    def grand_total_incl_vat(self):
+        return to_rands(self.subtotal_excl_vat_cents + self.vat_cents + self.delivery_cents)
+
+    def with_delivery(self, delivery_charge):
+        """Same cart with a delivery charge (in rands, VAT inclusive) added; lines are not re-priced."""
+        return replace(self, delivery_cents=to_cents(delivery_charge or 0))
+
+
+def price_cart(items, catalog, delivery_charge=0.0):
+    """
+    Prices stored cart lines ({'id', 'quantity', optional 'color'}) against the catalog in one pass.
+
+    Prices always come from the catalog, never from the stored line, so every view (cart, checkout,
+    Firestore order, Telegram message) shows the same numbers. Lines for products no longer in the
+    catalog are dropped.
+    """
+    lines = []
+    subtotal_cents = vat_cents = 0
+    for item in items:
+        product = catalog.get(item['id'])
+        if product is None:
+            continue
+        quantity = int(item['quantity'])
+        excl = product.price_excl_vat_cents
+        vat = product.vat_cents
+        line_excl = excl * quantity
+        line_vat = vat * quantity
+        subtotal_cents += line_excl
+        vat_cents += line_vat
+
+        color = item.get('color')
+        line = {
+            'id': product.id,
+            'name': f"{product.name} ({color.capitalize()})" if color else product.name,
+            'quantity': quantity,
+            'price_excl_vat_per_unit': to_rands(excl),
+            'vat_amount_per_unit': to_rands(vat),
+            'price_incl_vat_per_unit': to_rands(excl + vat),
+            'total_excl_vat': to_rands(line_excl),
+            'total_vat_amount': to_rands(line_vat),
+            'total_incl_vat': to_rands(line_excl + line_vat),
+        }
+        if color:
+            line['color'] = color
+        lines.append(line)
+
+    return CartTotals(tuple(lines), subtotal_cents, vat_cents, to_cents(delivery_charge or 0))
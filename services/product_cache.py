@@ -0,0 +1,191 @@
+import hashlib
+import json
+import threading
+import time
+
+
+def describe_category(category):
+    """Description shown for a product category on the shop pages."""
+    # A more robust solution would be to have a 'categories' collection in Firestore.
+    if category == "Mouthwash Sachets":
+        return "Freshmo's signature on-the-go mouthwash sachets."
+    elif category == "Oral Care Accessories":
+        return "Eco-friendly accessories for a complete oral care routine."
+    elif category == "Guest Amenities":
+        return "Convenient oral care and beverage solutions for hospitality."
+    elif category == "Coming Soon": # For future products
+        return "Exciting new products on the horizon!"
+    return f"Explore our {category} selection!"
+
+
+def group_products(docs):
+    """Groups product snapshots by category, ordered by category then name."""
+    products = []
+    for doc in docs:
+        product = doc.to_dict()
+        product['id'] = doc.id # Ensure the document ID is included
+        products.append(product)
+    products.sort(key=lambda p: (str(p.get('category', 'Uncategorized')), str(p.get('name', ''))))
+
+    menu_data = {}
+    for product in products:
+        category = product.get('category', 'Uncategorized')
+        if category not in menu_data:
+            menu_data[category] = {"description": describe_category(category), "items": []}
+        menu_data[category]["items"].append(product)
+    return menu_data
+
+
+class ProductCache:
+    """
+    In-process copy of the Firestore 'products' collection, grouped by category.
+
+    Loaded once, then kept fresh by a Firestore on_snapshot listener. If the listener cannot be
+    started (or dies), a background poller refreshes every poll_interval seconds instead.
+    Reads never block after the first load: if Firestore is unreachable the last good copy keeps
+    being served (stale-while-revalidate). start() does the first load on a background thread, for
+    callers that have something else to serve meanwhile; snapshot() waits for it.
+
+    `version` is a hash of the catalog content (None before the first load), so every worker holding
+    the same products reports the same version and HTTP caches can key on it. on_change(products)
+    is called with the product dicts (document ID as 'id') each time the content changes.
+    The returned menu data is shared between requests and must be treated as read-only.
+    """
+
+    def __init__(self, get_db, collection='products', poll_interval=60.0, use_listener=True, on_change=None):
+        self._get_db = get_db
+        self.collection = collection
+        self.poll_interval = poll_interval
+        self.use_listener = use_listener
+        self.on_change = on_change
+        self.version = None
+        self.loaded_at = None  # time.time() of the last successful load
+        self.last_error = None
+        self._menu_data = {}
+        self._fingerprint = None
+        self._lock = threading.Lock()
+        self._start_lock = threading.Lock()
+        self._started = False
+        self._starter = None  # Background thread running the first load (see start())
+        self._next_start = 0.0  # time.monotonic() before which start() does not retry a failed first load
+        self._watch = None
+        self._poller = None
+        self._stop = threading.Event()
+
+    # --- Readers ---
+    def snapshot(self):
+        """Returns (version, menu_data) as one consistent pair."""
+        self._ensure_started()
+        with self._lock:
+            return self.version, self._menu_data
+
+    def get_products(self):
+        return self.snapshot()[1]
+
+    @property
+    def is_stale(self):
+        """True if the last refresh attempt failed and older data is being served."""
+        return self.last_error is not None
+
+    # --- Loading ---
+    def refresh(self):
+        """Reloads the whole collection from Firestore. Keeps serving the old copy on failure."""
+        try:
+            docs = list(self._get_db().collection(self.collection).stream())
+        except Exception as e:
+            self.last_error = str(e)
+            print(f"Product cache refresh failed, serving stale data (version {self.version}): {e} 😢")
+            return False
+        self._apply(docs)
+        return True
+
+    def _apply(self, docs):
+        menu_data = group_products(docs)
+        fingerprint = hashlib.sha1(json.dumps(menu_data, sort_keys=True, default=str).encode()).hexdigest()
+        with self._lock:
+            changed = fingerprint != self._fingerprint
+            if changed:
+                self._menu_data = menu_data
+                self._fingerprint = fingerprint
+                self.version = fingerprint[:12]
+            self.loaded_at = time.time()
+            self.last_error = None
+        if changed and self.on_change is not None:
+            self.on_change([product for category in menu_data.values() for product in category['items']])
+
+    def _on_snapshot(self, docs, changes, read_time):
+        # The listener hands us the full, current result set: no extra reads needed
+        try:
+            self._apply(docs)
+        except Exception as e:
+            print(f"Error applying product snapshot: {e} 😢")
+
+    def start(self):
+        """Begins the first load and listening on a background thread; returns at once. Cheap to call per request."""
+        if self._started or time.monotonic() < self._next_start:
+            return
+        with self._start_lock:
+            if self._started or (self._starter is not None and self._starter.is_alive()):
+                return
+            self._starter = threading.Thread(target=self._start_in_background, name='product-cache-start', daemon=True)
+            self._starter.start()
+
+    def _start_in_background(self):
+        try:
+            if self._get_db() is None:
+                raise RuntimeError("Firestore is not available")
+            self._ensure_started()
+        except Exception as e:
+            self.last_error = str(e)
+            self._next_start = time.monotonic() + self.poll_interval
+            print(f"Product cache could not load from Firestore, retrying in {self.poll_interval:g}s: {e} 😢")
+
+    def _ensure_started(self):
+        if self._started:
+            return
+        with self._start_lock:
+            if self._started:
+                return
+            # The first load; a failure propagates (to snapshot()'s caller, or to start()'s thread,
+            # which retries later) because there is nothing stale to fall back on yet.
+            if not self._subscribe():
+                docs = list(self._get_db().collection(self.collection).stream())
+                self._apply(docs)
+            self._poller = threading.Thread(target=self._poll, name='product-cache-poller', daemon=True)
+            self._poller.start()
+            self._started = True
+
+    def _subscribe(self):
+        if not self.use_listener:
+            return False
+        try:
+            self._watch = self._get_db().collection(self.collection).on_snapshot(self._on_snapshot)
+        except Exception as e:
+            print(f"Product snapshot listener unavailable, falling back to polling: {e}")
+            self._watch = None
+            return False
+        # Wait briefly for the listener's initial snapshot so the first request is served from it
+        deadline = time.monotonic() + 10
+        while self.loaded_at is None and time.monotonic() < deadline:
+            time.sleep(0.01)
+        return self.loaded_at is not None
+
+    def _listener_active(self):
+        return self._watch is not None and getattr(self._watch, 'is_active', True)
+
+    def _poll(self):
+        while not self._stop.wait(self.poll_interval):
+            if self._listener_active():
+                continue
+            # Listener missing or dead: poll, and try to get a listener back
+            if self.refresh() and self.use_listener:
+                self._subscribe()
+
+    def close(self):
+        self._stop.set()
+        if self._watch is not None:
+            try:
+                self._watch.unsubscribe()
+            except Exception:
+                pass
+            self._watch = None
@@ -0,0 +1,83 @@
+import json
+import os
+from flask import url_for
+from markupsafe import Markup, escape
+
+DERIVED_DIRNAME = 'derived'
+MANIFEST_NAME = 'images.json'
+
+# <source> order matters: the browser takes the first type it supports
+_SOURCE_TYPES = (('avif', 'image/avif'), ('webp', 'image/webp'))
+
+
+class ResponsiveImages:
+    """
+    Renders images built by build_images.py as <picture> elements.
+
+    Registers a `responsive_image(filename, alt, sizes=...)` Jinja global. For images in
+    static/derived/images.json it emits AVIF/WebP <source>s and a JPEG <img> with srcset/sizes,
+    intrinsic width/height (no layout shift), lazy loading and a blurred inline placeholder.
+    Images without derivatives (no build, or a product image that is not under static/images)
+    get a plain lazy <img> pointing at the original file.
+    """
+
+    def __init__(self, app=None):
+        self.images = {}
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        manifest_path = os.path.join(app.static_folder, DERIVED_DIRNAME, MANIFEST_NAME)
+        app.responsive_images = self
+        app.jinja_env.globals['responsive_image'] = self.render
+        if not os.path.exists(manifest_path):
+            print("No responsive image manifest found; serving original images. Run build_images.py to build derivatives.")
+            return
+        try:
+            with open(manifest_path) as f:
+                self.images = json.load(f)['images']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load responsive image manifest: {e} 😞. Serving original images.")
+
+    @staticmethod
+    def _srcset(variants):
+        return ', '.join(f"{url_for('static', filename=path)} {width}w" for width, path in variants)
+
+    def render(self, filename, alt='', sizes='100vw', class_='', loading='lazy', fallback=None, **attrs):
+        """
+        filename is relative to static/ (e.g. 'images/image1.jpg').
+        sizes should describe the rendered width so the browser can pick the smallest adequate file.
+        loading='eager' is meant for above-the-fold images; fallback is a static file shown if loading fails.
+        """
+        entry = self.images.get(filename)
+        img_attrs = {'alt': alt, 'class': class_ or None, 'loading': loading, 'decoding': 'async'}
+        if fallback:
+            fallback_url = url_for('static', filename=fallback)
+            img_attrs['onerror'] = f"this.onerror=null;this.srcset='';this.src='{fallback_url}';"
+        img_attrs.update(attrs)
+
+        if entry is None:
+            img_attrs = {'src': url_for('static', filename=filename), **img_attrs}
+            return Markup(f"<img{_attributes(img_attrs)}>")
+
+        variants = entry['variants']
+        jpeg = variants['jpeg']
+        img_attrs = {
+            'src': url_for('static', filename=jpeg[-1][1]),
+            'srcset': self._srcset(jpeg),
+            'sizes': sizes,
+            'width': entry['width'],
+            'height': entry['height'],
+            **img_attrs,
+            'style': f"background-image:url('{entry['placeholder']}');background-size:cover;background-position:center;"
+                     + (img_attrs.get('style') or ''),
+        }
+        sources = ''.join(
+            f"<source type=\"{mime}\"{_attributes({'srcset': self._srcset(variants[fmt]), 'sizes': sizes})}>"
+            for fmt, mime in _SOURCE_TYPES if variants.get(fmt)
+        )
+        return Markup(f"<picture>{sources}<img{_attributes(img_attrs)}></picture>")
+
+
+def _attributes(attrs):
+    return ''.join(f' {name}="{escape(value)}"' for name, value in attrs.items() if value is not None)
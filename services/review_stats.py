@@ -0,0 +1,219 @@
+import re
+import threading
+import time
+from collections import OrderedDict
+from datetime import datetime, timezone
+
+STATS_COLLECTION = 'review_stats'
+OVERALL_KEY = '_overall'  # Every review also counts here; product keys never start with '_'
+REVIEW_EXCERPT_LENGTH = 500  # Characters of a review kept in an aggregate's 'latest' list
+_MISSING = object()
+
+
+def stats_key(product):
+    """Aggregate document ID for a product name, e.g. "Strawberry Mint Box (30 Sachets)" -> "strawberry-mint-box-30-sachets"."""
+    return re.sub(r'[^a-z0-9]+', '-', (product or '').lower()).strip('-')[:100] or None
+
+
+def _iso(value):
+    """Review time as a UTC ISO string, so aggregates sort and serialise the same whatever the source."""
+    if isinstance(value, datetime):
+        value = value if value.tzinfo else value.replace(tzinfo=timezone.utc)
+        return value.astimezone(timezone.utc).isoformat(timespec='seconds')
+    return None
+
+
+def empty_aggregate(product=None):
+    return {'product': product, 'count': 0, 'sum': 0, 'histogram': {str(stars): 0 for stars in range(1, 6)}, 'latest': []}
+
+
+def add_review(aggregate, review_id, review, latest_limit, reviewed_at=None):
+    """Folds one review into an aggregate. Reviews without a 1-5 rating are skipped. Returns True if counted."""
+    try:
+        rating = int(review.get('rating'))
+    except (TypeError, ValueError):
+        return False
+    if not 1 <= rating <= 5:
+        return False
+    aggregate['count'] += 1
+    aggregate['sum'] += rating
+    aggregate['histogram'][str(rating)] = aggregate['histogram'].get(str(rating), 0) + 1
+    entry = {
+        'id': review_id,
+        'rating': rating,
+        'review': (review.get('review') or '')[:REVIEW_EXCERPT_LENGTH],
+        'name': review.get('name') or None,
+        'product': review.get('product') or None,
+        'reviewed_at': _iso(reviewed_at or review.get('timestamp')),
+    }
+    latest = [entry] + [item for item in aggregate['latest'] if item.get('id') != review_id]
+    latest.sort(key=lambda item: item.get('reviewed_at') or '', reverse=True)  # Stable: ties keep the new review first
+    aggregate['latest'] = latest[:latest_limit]
+    return True
+
+
+def summarize(aggregate):
+    """Aggregate as shown on the page: adds the average rating, drops Firestore bookkeeping."""
+    if not aggregate or not aggregate.get('count'):
+        return None
+    summary = {key: aggregate.get(key) for key in ('product', 'count', 'sum', 'histogram', 'latest')}
+    summary['average'] = round(aggregate['sum'] / aggregate['count'], 2)
+    return summary
+
+
+class ReviewStats:
+    """
+    Per-product rating aggregates (count, sum, star histogram, latest reviews) kept in
+    'review_stats', one document per product plus one for all reviews.
+
+    The write journal hands new reviews to commit_reviews(), which writes them and updates their
+    aggregates in one transaction. A review document that already exists is not counted again,
+    so a replayed journal batch does not inflate the numbers. Pages read a summary through
+    summary(): one document read on a miss, then served from memory for ttl_seconds (and
+    refreshed straight away in the worker that committed a review). rebuild() recomputes every
+    aggregate from the reviews collection, page by page.
+    """
+
+    def __init__(self, get_db, latest_limit=5, ttl_seconds=300, max_entries=256):
+        self._get_db = get_db  # Callable returning the Firestore client (or None)
+        self.latest_limit = latest_limit
+        self.ttl_seconds = ttl_seconds
+        self.max_entries = max_entries
+        self.hits = 0
+        self.misses = 0
+        self.committed = 0
+        self._entries = OrderedDict()  # key -> (aggregate or None, stored_at)
+        self._lock = threading.Lock()
+
+    # --- Readers ---
+    def summary(self, product=None):
+        """Rating summary for a product (all reviews if product is None), or None if it has no reviews."""
+        key = stats_key(product) if product else OVERALL_KEY
+        if key is None:
+            return None
+        now = time.time()
+        with self._lock:
+            entry = self._entries.get(key, _MISSING)
+            if entry is not _MISSING and now - entry[1] < self.ttl_seconds:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return summarize(entry[0])
+            self.misses += 1
+        try:
+            aggregate = self._load(key)
+        except Exception as e:
+            print(f"Could not load review summary '{key}': {e} 😢")
+            return summarize(entry[0]) if entry is not _MISSING else None  # Stale beats nothing
+        with self._lock:
+            self._store(key, aggregate)
+        return summarize(aggregate)
+
+    def _load(self, key):
+        db = self._get_db()
+        if not db:
+            return None
+        snapshot = db.collection(STATS_COLLECTION).document(key).get()
+        return snapshot.to_dict() if snapshot.exists else None
+
+    # --- Writers ---
+    def commit_reviews(self, db, entries):
+        """Journal committer for 'reviews': writes [(doc_id, data)] and their aggregates in one transaction."""
+        from firebase_admin import firestore  # Only needed once reviews reach Firestore
+
+        review_refs = [db.collection('reviews').document(doc_id) for doc_id, _ in entries]
+        keys = sorted({OVERALL_KEY} | {stats_key(data.get('product')) for _, data in entries} - {None})
+        stats_refs = [db.collection(STATS_COLLECTION).document(key) for key in keys]
+        committed_at = datetime.now(timezone.utc)
+
+        @firestore.transactional
+        def apply(transaction):
+            # All reads come before the writes, as Firestore transactions require
+            existing = {snapshot.id for snapshot in db.get_all(review_refs, transaction=transaction) if snapshot.exists}
+            aggregates = {snapshot.id: snapshot.to_dict() if snapshot.exists else None
+                          for snapshot in db.get_all(stats_refs, transaction=transaction)}
+            aggregates = {key: aggregates.get(key) or empty_aggregate(None if key == OVERALL_KEY else product_for(key))
+                          for key in keys}
+            changed = set()
+            for (doc_id, data), ref in zip(entries, review_refs):
+                transaction.set(ref, data)
+                if doc_id in existing:
+                    continue  # Already written and counted by an earlier attempt
+                for key in (OVERALL_KEY, stats_key(data.get('product'))):
+                    if key and add_review(aggregates[key], doc_id, data, self.latest_limit, committed_at):
+                        changed.add(key)
+            for key, ref in zip(keys, stats_refs):
+                if key in changed:
+                    aggregates[key].pop('updated_at', None)
+                    transaction.set(ref, dict(aggregates[key], updated_at=firestore.SERVER_TIMESTAMP))
+            return {key: aggregates[key] for key in changed}
+
+        def product_for(key):
+            return next((data.get('product') for _, data in entries if stats_key(data.get('product')) == key), None)
+
+        changed = apply(db.transaction())
+        with self._lock:
+            for key, aggregate in changed.items():
+                self._store(key, aggregate)
+            self.committed += len(entries)
+
+    def rebuild(self, page_size=300):
+        """
+        Recomputes every aggregate from the reviews collection, reading it in pages of page_size.
+        Reviews committed while this runs can be missed; run it when the shop is quiet.
+        Returns (reviews scanned, aggregates written).
+        """
+        db = self._get_db()
+        if not db:
+            raise RuntimeError("Firestore is not available")
+        aggregates = {OVERALL_KEY: empty_aggregate()}
+        scanned, last = 0, None
+        while True:
+            query = db.collection('reviews').limit(page_size)
+            if last is not None:
+                query = query.start_after(last)
+            snapshots = list(query.stream())
+            if not snapshots:
+                break
+            for snapshot in snapshots:
+                review = snapshot.to_dict()
+                add_review(aggregates[OVERALL_KEY], snapshot.id, review, self.latest_limit)
+                key = stats_key(review.get('product'))
+                if key:
+                    add_review(aggregates.setdefault(key, empty_aggregate(review.get('product'))),
+                               snapshot.id, review, self.latest_limit)
+            scanned += len(snapshots)
+            last = snapshots[-1]
+
+        from firebase_admin import firestore
+
+        items = list(aggregates.items())
+        for start in range(0, len(items), 400):
+            batch = db.batch()
+            for key, aggregate in items[start:start + 400]:
+                batch.set(db.collection(STATS_COLLECTION).document(key), dict(aggregate, updated_at=firestore.SERVER_TIMESTAMP))
+            batch.commit()
+        self.clear()
+        return scanned, len(items)
+
+    # --- Cache ---
+    def _store(self, key, aggregate):
+        self._entries[key] = (aggregate, time.time())
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+    def stats(self):
+        """Cache counters for monitoring."""
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                'hits': self.hits,
+                'misses': self.misses,
+                'hit_rate': round(self.hits / lookups, 4) if lookups else 0.0,
+                'entries': len(self._entries),
+                'committed': self.committed,
+            }
@@ -0,0 +1,95 @@
+import json
+import mimetypes
+import os
+import re
+from flask import abort, request, send_from_directory
+
+ONE_YEAR = 365 * 24 * 3600
+DIST_DIRNAME = 'dist'
+MANIFEST_NAME = 'manifest.json'
+_HASH_PATTERN = re.compile(r'\.([0-9a-f]{8,64})\.[^./]+$')
+
+# Preferred order when the browser accepts several encodings
+_ENCODINGS = (('br', '.br'), ('gzip', '.gz'))
+
+
+class StaticAssets:
+    """
+    Serves the fingerprinted build produced by build_static.py.
+
+    When static/dist/manifest.json exists, url_for('static', filename=...) is rewritten to the
+    hashed file, and hashed files are served with a strong content-hash ETag, one-year immutable
+    Cache-Control and a precompressed br/gzip variant when the browser accepts it.
+    Without a manifest nothing changes and the plain /static files are used.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = {}
+        self.dist_dir = None
+        self._served = set()
+        self._variants = set()
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.dist_dir = os.path.join(app.static_folder, DIST_DIRNAME)
+        manifest_path = os.path.join(self.dist_dir, MANIFEST_NAME)
+        app.static_assets = self
+        if not os.path.exists(manifest_path):
+            print("No static asset manifest found; serving unhashed static files. Run build_static.py to enable fingerprinting.")
+            return
+        try:
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)['files']
+        except (OSError, ValueError, KeyError) as e:
+            print(f"Could not load static asset manifest: {e} 😞. Serving unhashed static files.")
+            return
+
+        prefix = DIST_DIRNAME + '/'
+        self._served = {path[len(prefix):] for path in self.manifest.values()}
+        for name in self._served:
+            for _, suffix in _ENCODINGS:
+                if os.path.exists(os.path.join(self.dist_dir, name + suffix)):
+                    self._variants.add(name + suffix)
+
+        app.url_defaults(self._rewrite_static_url)
+        # More specific than /static/<path:filename>, so the router picks it for hashed files
+        app.add_url_rule(f"{app.static_url_path}/{DIST_DIRNAME}/<path:filename>", endpoint='hashed_static', view_func=self.serve)
+
+    def _rewrite_static_url(self, endpoint, values):
+        if endpoint == 'static':
+            filename = values.get('filename')
+            if filename in self.manifest:
+                values['filename'] = self.manifest[filename]
+
+    def resolve(self, filename):
+        """Public URL path (relative to /static/) for a logical static filename."""
+        return self.manifest.get(filename, filename)
+
+    def serve(self, filename):
+        if filename not in self._served:
+            abort(404)
+
+        match = _HASH_PATTERN.search(filename)
+        digest = match.group(1) if match else None
+        mimetype = mimetypes.guess_type(filename)[0] or 'application/octet-stream'
+
+        served_name, encoding, suffix = filename, None, ''
+        for candidate, candidate_suffix in _ENCODINGS:
+            if request.accept_encodings[candidate] and filename + candidate_suffix in self._variants:
+                served_name, encoding, suffix = filename + candidate_suffix, candidate, candidate_suffix
+                break
+
+        response = send_from_directory(
+            self.dist_dir, served_name,
+            mimetype=mimetype,
+            max_age=ONE_YEAR,
+            etag=f"{digest}{suffix}" if digest else True,  # Each encoding is a different representation
+            conditional=True
+        )
+        if encoding:
+            response.headers['Content-Encoding'] = encoding
+        response.vary.add('Accept-Encoding')
+        response.cache_control.public = True
+        response.cache_control.immutable = True
+        return response
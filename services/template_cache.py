@@ -0,0 +1,72 @@
+import os
+import time
+from jinja2 import FileSystemBytecodeCache, TemplateSyntaxError
+
+CACHE_DIRNAME = 'jinja_cache'
+
+
+class DeployableBytecodeCache(FileSystemBytecodeCache):
+    """
+    Jinja bytecode cache that can be built on one machine and used on another.
+
+    Jinja keys cache files on the template's absolute path, which differs between the build machine
+    and the deployment (e.g. /var/task on Vercel); here the key is the template name only. Each file
+    still records a checksum of the template source and the Python version, so an edited template or
+    a different interpreter simply recompiles. Writing is best-effort: on a read-only deployment the
+    shipped files are read and new bytecode is only kept in memory.
+    """
+
+    def get_cache_key(self, name, filename=None):
+        return super().get_cache_key(name)
+
+    def dump_bytecode(self, bucket):
+        try:
+            super().dump_bytecode(bucket)
+        except OSError:
+            pass
+
+
+class TemplateCache:
+    """
+    Cuts template parse/compile time out of the first requests served by a new worker.
+
+    When the bytecode directory (jinja_cache/, or JINJA_BYTECODE_CACHE_DIR) exists, templates are
+    loaded from the bytecode written there by build_templates.py instead of being parsed and compiled.
+    With PRECOMPILE_TEMPLATES enabled every template in templates/ is loaded at startup, so no request
+    pays for it; without a bytecode cache that moves the full compile cost into create_app().
+    """
+
+    def __init__(self, app=None):
+        self.bytecode_cache = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        self.app = app
+        app.template_cache = self
+        directory = app.config.get('JINJA_BYTECODE_CACHE_DIR') or os.path.join(app.root_path, CACHE_DIRNAME)
+        if os.path.isdir(directory):
+            self.bytecode_cache = DeployableBytecodeCache(directory, pattern='%s.cache')
+            app.jinja_env.bytecode_cache = self.bytecode_cache
+        else:
+            print("No template bytecode cache found; templates are compiled on first use. Run build_templates.py to build it.")
+        if app.config.get('PRECOMPILE_TEMPLATES'):
+            self.precompile()
+
+    def template_names(self):
+        return self.app.jinja_env.list_templates()
+
+    def precompile(self):
+        """Loads (and compiles, or reads from bytecode) every template. Returns (count, seconds, errors)."""
+        started = time.perf_counter()
+        count, errors = 0, []
+        for name in self.template_names():
+            try:
+                self.app.jinja_env.get_template(name)
+                count += 1
+            except TemplateSyntaxError as e:
+                errors.append(f"{name}:{e.lineno}: {e.message}")
+                print(f"Could not compile template {name}: {e} 😞")
+        elapsed = time.perf_counter() - started
+        print(f"Precompiled {count} templates in {elapsed * 1000:.0f} ms.")
+        return count, elapsed, errors
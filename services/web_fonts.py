@@ -0,0 +1,59 @@
+import json
+import os
+from flask import url_for
+from markupsafe import Markup, escape
+
+FONTS_DIRNAME = 'fonts'
+MANIFEST_NAME = 'fonts.json'
+GOOGLE_FONTS_URL = 'https://fonts.googleapis.com/css2?family=Inter:wght@400;600;700&display=swap'
+GOOGLE_FONTS_FILES_ORIGIN = 'https://fonts.gstatic.com'
+
+
+class WebFonts:
+    """
+    Template helpers for the self-hosted fonts and icon sprite built by build_fonts.py.
+
+    font_links() renders preload hints plus @font-face rules for the subsetted Inter files listed in
+    static/fonts/fonts.json, or, until a subset has been built, the Google Fonts stylesheet as before
+    (with a preconnect to the font-file host so the files are not held up by a second handshake).
+    icon(name) references a symbol in templates/partials/icon_sprite.svg, which base.html inlines.
+    """
+
+    def __init__(self, app=None):
+        self.manifest = None
+        if app is not None:
+            self.init_app(app)
+
+    def init_app(self, app):
+        app.web_fonts = self
+        app.jinja_env.globals['font_links'] = self.font_links
+        app.jinja_env.globals['icon'] = icon
+        manifest_path = os.path.join(app.static_folder, FONTS_DIRNAME, MANIFEST_NAME)
+        if not os.path.exists(manifest_path):
+            print("No web font manifest found; using Google Fonts. Run build_fonts.py to self-host subsetted Inter.")
+            return
+        try:
+            with open(manifest_path) as f:
+                self.manifest = json.load(f)
+        except (OSError, ValueError) as e:
+            print(f"Could not load web font manifest: {e} 😞. Using Google Fonts.")
+
+    def font_links(self):
+        if not self.manifest:
+            return Markup(f'<link rel="preconnect" href="{GOOGLE_FONTS_FILES_ORIGIN}" crossorigin>\n    '
+                          f'<link href="{escape(GOOGLE_FONTS_URL)}" rel="stylesheet">')
+        family = self.manifest['family']
+        links, rules = [], []
+        for face in self.manifest['faces']:
+            url = url_for('static', filename=face['file'])
+            # crossorigin is required on font preloads even for same-origin files, or the browser fetches twice
+            links.append(f'<link rel="preload" href="{url}" as="font" type="font/woff2" crossorigin>')
+            rules.append(f"@font-face{{font-family:'{family}';font-style:{face['style']};font-weight:{face['weight']};"
+                         f"font-display:swap;src:url('{url}') format('woff2');unicode-range:{self.manifest['unicode_range']}}}")
+        return Markup('\n    '.join(links) + f"\n    <style>{''.join(rules)}</style>")
+
+
+def icon(name, class_='icon', label=None):
+    """Inline <svg> that uses the sprite symbol #icon-<name>. Decorative unless a label is given."""
+    accessibility = f'role="img" aria-label="{escape(label)}"' if label else 'aria-hidden="true"'
+    return Markup(f'<svg class="{escape(class_)}" {accessibility} focusable="false"><use href="#icon-{escape(name)}"></use></svg>')
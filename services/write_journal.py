@@ -0,0 +1,362 @@
+import asyncio
+import atexit
+import json
+import secrets
+import sqlite3
+import threading
+import time
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS pending_writes (
+    id INTEGER PRIMARY KEY AUTOINCREMENT,
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    server_timestamps TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL DEFAULT 0,
+    last_error TEXT
+);
+CREATE TABLE IF NOT EXISTS dead_letter_writes (
+    id INTEGER PRIMARY KEY,
+    collection TEXT NOT NULL,
+    doc_id TEXT NOT NULL,
+    payload TEXT NOT NULL,
+    server_timestamps TEXT NOT NULL,
+    created_at REAL NOT NULL,
+    attempts INTEGER NOT NULL,
+    last_error TEXT,
+    dead_at REAL NOT NULL
+)
+"""
+FIRESTORE_MAX_BATCH = 500  # Firestore's limit on writes per batch
+
+
+def new_document_id():
+    """20 URL-safe characters, like a Firestore auto-ID, chosen before the write so replays are idempotent."""
+    return secrets.token_urlsafe(15)
+
+
+class WriteJournal:
+    """
+    Write-behind journal for Firestore document creation (orders, reviews, contact requests).
+
+    append() stores the document in a local SQLite file in WAL mode and returns as soon as the row
+    is committed to disk; a background committer then writes journaled documents to Firestore in
+    batches (group commit: appends arriving within group_window seconds share one batch). Each
+    entry gets its document ID when it is journaled and is written with set(), so a batch that is
+    replayed after a crash, an outage or by a second worker overwrites the same document instead of
+    duplicating it. Rows are deleted only after their batch commits; anything left over is replayed
+    when the app next starts. Firestore being unavailable (app.db is None or raising) just leaves
+    rows pending and retries with backoff.
+
+    The guarantee only holds where the file outlives the process and the committer keeps running
+    between requests. On serverless hosts (Vercel: per-instance /tmp, threads frozen after the
+    response) pass no path. Without a path, or if the journal file cannot be opened, append()
+    writes straight to Firestore, as checkout did before: with create(), so a document ID that is
+    already taken (say, a fallback order number) gets a fresh auto-ID instead of overwriting.
+
+    A document Firestore rejects on its own is retried on later rounds; after max_attempts rejections
+    it is moved to the dead_letter_writes table of the same file and logged, for someone to inspect.
+
+    committers maps a collection to fn(db, [(doc_id, data)]), which commits that collection's
+    documents itself instead of the shared batch, for writes that must update other documents in
+    the same transaction (review aggregates). fn must be safe to call again with documents it has
+    already committed.
+
+    append_async() is append() for the async checkout: a direct write goes through the AsyncClient
+    from get_async_db, and the journal insert (an fsync) runs on a worker thread.
+    """
+
+    def __init__(self, path, get_db, batch_size=100, group_window=0.02, retry_interval=1.0, max_backoff=60.0,
+                 synchronous='FULL', committers=None, max_attempts=10, get_async_db=None):
+        self.path = path
+        self._get_db = get_db  # Callable returning the Firestore client (or None)
+        self._get_async_db = get_async_db  # Callable returning the AsyncClient (or None), for append_async()
+        self.batch_size = max(1, min(int(batch_size), FIRESTORE_MAX_BATCH))
+        self.group_window = group_window
+        self.retry_interval = retry_interval
+        self.max_backoff = max_backoff
+        self.max_attempts = max(1, int(max_attempts))
+        self._lock = threading.Lock()  # Serialises use of the SQLite connection
+        self._wake = threading.Event()
+        self._stopping = threading.Event()
+        self._thread = None
+        self._start_lock = threading.Lock()
+        self._failures = 0  # Consecutive rounds in which nothing could be committed
+        self._warned_offline = False
+        self.appended = 0
+        self.flushed = 0
+        self.batches = 0
+        self.failed_batches = 0
+        self.direct_writes = 0
+        self._flush_latencies = []
+        self._committers = dict(committers or {})  # collection -> fn(db, [(doc_id, data)])
+        self._conn = None
+        if not path:
+            return  # Journal disabled: append() writes straight to Firestore
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False, isolation_level=None, timeout=5.0)
+            self._conn.execute('PRAGMA journal_mode=WAL')
+            # FULL fsyncs the WAL on every append; NORMAL survives a crashed process but not a power cut
+            self._conn.execute(f"PRAGMA synchronous={'NORMAL' if str(synchronous).upper() == 'NORMAL' else 'FULL'}")
+            self._conn.executescript(_SCHEMA)
+            pending = self.pending_count()
+        except sqlite3.Error as e:
+            print(f"Write journal unavailable ({path}): {e} 😞. Writing to Firestore directly.")
+            self._conn = None
+            return
+        atexit.register(self.stop)
+        if pending:
+            print(f"Replaying {pending} journaled writes to Firestore. 🔁")
+            self._ensure_committer()
+
+    @property
+    def available(self):
+        return self._conn is not None
+
+    # --- Request path ---
+    def append(self, collection, data, doc_id=None, server_timestamps=()):
+        """
+        Durably records a document to be created in `collection` and returns its document ID.
+        Fields named in server_timestamps are set to Firestore's server time when the document is written.
+        """
+        doc_id = doc_id or new_document_id()
+        if self._conn is None:
+            return self._write_direct(collection, doc_id, data, server_timestamps)
+        payload = json.dumps(data)
+        with self._lock:
+            self._conn.execute(
+                'INSERT INTO pending_writes (collection, doc_id, payload, server_timestamps, created_at) VALUES (?, ?, ?, ?, ?)',
+                (collection, doc_id, payload, json.dumps(list(server_timestamps)), time.time()))
+            self.appended += 1
+        self._ensure_committer()
+        self._wake.set()
+        return doc_id
+
+    async def append_async(self, collection, data, doc_id=None, server_timestamps=()):
+        """append() for coroutines; the event loop is never blocked on SQLite or Firestore."""
+        doc_id = doc_id or new_document_id()
+        if self._conn is not None or collection in self._committers or self._get_async_db is None:
+            return await asyncio.to_thread(self.append, collection, data, doc_id, server_timestamps)
+        db = self._get_async_db()
+        if not db:
+            print(f"⚠️ Firestore not available and no write journal: {collection}/{doc_id} was not saved. 😞")
+            return doc_id
+        doc_id = await self._create_async(db, collection, doc_id, self._with_server_timestamps(data, server_timestamps))
+        self.direct_writes += 1
+        return doc_id
+
+    def _write_direct(self, collection, doc_id, data, server_timestamps):
+        db = self._get_db()
+        if not db:
+            print(f"⚠️ Firestore not available and no write journal: {collection}/{doc_id} was not saved. 😞")
+            return doc_id
+        data = self._with_server_timestamps(data, server_timestamps)
+        if collection in self._committers:
+            self._committers[collection](db, [(doc_id, data)])
+        else:
+            doc_id = self._create(db, collection, doc_id, data)
+        self.direct_writes += 1
+        return doc_id
+
+    @staticmethod
+    def _create(db, collection, doc_id, data):
+        """Creates the document, never overwriting one: on an ID clash it is stored under a new auto-ID."""
+        from google.api_core.exceptions import AlreadyExists  # Ships with firebase_admin; deferred like it
+
+        try:
+            db.collection(collection).document(doc_id).create(data)
+            return doc_id
+        except AlreadyExists:
+            doc_ref = db.collection(collection).document()
+            print(f"⚠️ {collection}/{doc_id} already exists; saving this one as {collection}/{doc_ref.id} instead.")
+            doc_ref.create(data)
+            return doc_ref.id
+
+    @staticmethod
+    async def _create_async(db, collection, doc_id, data):
+        """_create() for the AsyncClient."""
+        from google.api_core.exceptions import AlreadyExists
+
+        try:
+            await db.collection(collection).document(doc_id).create(data)
+            return doc_id
+        except AlreadyExists:
+            doc_ref = db.collection(collection).document()
+            print(f"⚠️ {collection}/{doc_id} already exists; saving this one as {collection}/{doc_ref.id} instead.")
+            await doc_ref.create(data)
+            return doc_ref.id
+
+    @staticmethod
+    def _with_server_timestamps(data, fields):
+        if not fields:
+            return data
+        from firebase_admin import firestore  # Only needed once documents actually reach Firestore
+
+        return dict(data, **{field: firestore.SERVER_TIMESTAMP for field in fields})
+
+    # --- Committer ---
+    def _ensure_committer(self):
+        if self._thread and self._thread.is_alive():
+            return
+        with self._start_lock:
+            if not (self._thread and self._thread.is_alive()):
+                self._thread = threading.Thread(target=self._run, name='write-journal', daemon=True)
+                self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wake.wait(self.retry_interval)
+            self._wake.clear()
+            if self.group_window and not self._stopping.is_set():
+                time.sleep(self.group_window)  # Let concurrent checkouts join this batch
+            while self.flush_once():
+                pass
+            if self._failures:
+                backoff = min(self.max_backoff, self.retry_interval * (2 ** min(self._failures, 10)))
+                self._stopping.wait(backoff)
+            if self._stopping.is_set():
+                return
+
+    def flush_once(self):
+        """Commits up to batch_size journaled writes. Returns True if rows were committed and more may be waiting."""
+        with self._lock:
+            rows = self._conn.execute(
+                'SELECT id, collection, doc_id, payload, server_timestamps FROM pending_writes '
+                'ORDER BY attempts, id LIMIT ?', (self.batch_size,)).fetchall()
+        if not rows:
+            self._failures = 0
+            return False
+        try:
+            db = self._get_db()
+        except Exception as e:
+            db = None
+            print(f"Could not connect to Firestore for journaled writes: {e} 😢")
+        if not db:
+            if not self._warned_offline:
+                print(f"Firestore unavailable; {self.pending_count()} journaled writes are waiting. ⏳")
+                self._warned_offline = True
+            self._failures += 1
+            return False
+
+        started = time.perf_counter()
+        try:
+            self._commit(db, rows)
+            committed = [row[0] for row in rows]
+        except Exception as e:
+            self.failed_batches += 1
+            print(f"Journal batch of {len(rows)} failed ({e}); retrying documents one by one. 😢")
+            committed = self._commit_individually(db, rows)
+        if committed:
+            with self._lock:
+                self._conn.executemany('DELETE FROM pending_writes WHERE id = ?', [(row_id,) for row_id in committed])
+                self.flushed += len(committed)
+            self.batches += 1
+            self._flush_latencies = (self._flush_latencies + [time.perf_counter() - started])[-100:]
+            self._failures = 0
+            self._warned_offline = False
+            return len(committed) == len(rows)
+        self._failures += 1
+        return False
+
+    def _commit(self, db, rows):
+        batch, batched, custom = db.batch(), 0, {}
+        for _, collection, doc_id, payload, server_timestamps in rows:
+            data = self._with_server_timestamps(json.loads(payload), json.loads(server_timestamps))
+            if collection in self._committers:
+                custom.setdefault(collection, []).append((doc_id, data))
+            else:
+                batch.set(db.collection(collection).document(doc_id), data)
+                batched += 1
+        if batched:
+            batch.commit()
+        for collection, entries in custom.items():
+            self._committers[collection](db, entries)
+
+    def _commit_individually(self, db, rows):
+        """Isolates a document Firestore rejects so it cannot hold back the rest; it sorts last on later rounds."""
+        committed = []
+        for row in rows:
+            try:
+                self._commit(db, [row])
+                committed.append(row[0])
+            except Exception as e:
+                with self._lock:
+                    self._conn.execute('UPDATE pending_writes SET attempts = attempts + 1, last_error = ? WHERE id = ?',
+                                       (str(e)[:500], row[0]))
+                    attempts = self._conn.execute('SELECT attempts FROM pending_writes WHERE id = ?', (row[0],)).fetchone()[0]
+                    if attempts >= self.max_attempts:
+                        self._dead_letter(row[0])
+                if attempts >= self.max_attempts:
+                    print(f"⚠️ {row[1]}/{row[2]} was rejected {attempts} times ({e}); moved to dead_letter_writes "
+                          f"in {self.path}. 😞")
+        return committed
+
+    def _dead_letter(self, row_id):
+        """Moves a pending row to dead_letter_writes (called with the lock held)."""
+        self._conn.execute('BEGIN')
+        try:
+            self._conn.execute(
+                'INSERT INTO dead_letter_writes (id, collection, doc_id, payload, server_timestamps, created_at, attempts, last_error, dead_at) '
+                'SELECT id, collection, doc_id, payload, server_timestamps, created_at, attempts, last_error, ? '
+                'FROM pending_writes WHERE id = ?', (time.time(), row_id))
+            self._conn.execute('DELETE FROM pending_writes WHERE id = ?', (row_id,))
+            self._conn.execute('COMMIT')
+        except BaseException:
+            self._conn.execute('ROLLBACK')
+            raise
+
+    def dead_letter_count(self):
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM dead_letter_writes').fetchone()[0]
+
+    # --- Management ---
+    def pending_count(self):
+        if self._conn is None:
+            return 0
+        with self._lock:
+            return self._conn.execute('SELECT COUNT(*) FROM pending_writes').fetchone()[0]
+
+    def flush(self, timeout=None):
+        """Wakes the committer and waits until the journal is empty. Returns True if it emptied in time."""
+        if self._conn is None:
+            return True
+        deadline = None if timeout is None else time.monotonic() + timeout
+        self._ensure_committer()
+        while self.pending_count():
+            if deadline is not None and time.monotonic() >= deadline:
+                return False
+            self._wake.set()
+            time.sleep(0.01)
+        return True
+
+    def stop(self, timeout=5):
+        """Final flush attempt, then stops the committer. Unflushed rows stay on disk for the next start."""
+        if self._conn is None:
+            return
+        self._stopping.set()
+        self._wake.set()
+        if self._thread and self._thread.is_alive():
+            self._thread.join(timeout)
+
+    def stats(self):
+        """Journal depth and committer counters for monitoring."""
+        oldest = None
+        if self._conn is not None:
+            with self._lock:
+                oldest = self._conn.execute('SELECT MIN(created_at) FROM pending_writes').fetchone()[0]
+        latencies = self._flush_latencies
+        return {
+            'pending': self.pending_count(),
+            'oldest_pending_age_seconds': round(time.time() - oldest, 3) if oldest else 0,
+            'appended': self.appended,
+            'flushed': self.flushed,
+            'batches': self.batches,
+            'failed_batches': self.failed_batches,
+            'direct_writes': self.direct_writes,
+            'dead_letter': self.dead_letter_count(),
+            'avg_batch_ms': round(sum(latencies) / len(latencies) * 1000, 2) if latencies else None,
+        }